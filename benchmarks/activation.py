@@ -0,0 +1,67 @@
+"""Compare ``update_game`` with and without enemy activation regions as levels grow.
+
+Run from the repository root::
+
+    python -m benchmarks.activation --copies 10 100 1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Optional
+
+import pygame
+
+from benchmarks.common import tiled_level
+from src.game import activation
+from src.game import main as game
+from src.game.sim import KeyState
+
+RIGHT = KeyState(frozenset({pygame.K_RIGHT}))
+
+
+def _time_steps(data: dict, steps: int, manager: Optional[activation.ActivationManager]) -> float:
+    """Return the mean ``update_game`` time in microseconds while the player runs right."""
+
+    player, platforms, enemies, _, world_size, checkpoint_rect, checkpoint_respawn, energy_orbs = game.load_level(data)
+    start = time.perf_counter()
+    for _ in range(steps):
+        game.update_game(
+            player,
+            platforms,
+            enemies,
+            world_size,
+            game.FIXED_DT,
+            False,
+            energy_orbs,
+            checkpoint_rect,
+            False,
+            checkpoint_respawn,
+            pressed_keys=RIGHT,
+            activation_manager=manager,
+        )
+    return (time.perf_counter() - start) / steps * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--copies", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--steps", type=int, default=600, help="simulation steps to time")
+    parser.add_argument("--radius", type=int, default=activation.ACTIVATION_RADIUS)
+    args = parser.parse_args()
+
+    print(f"{'enemies':>8} {'all us':>9} {'active us':>10} {'awake':>6} {'asleep':>7}")
+    for copies in args.copies:
+        data = tiled_level(copies)
+        every_enemy = _time_steps(data, args.steps, None)
+        manager = activation.ActivationManager(args.radius)
+        nearby = _time_steps(data, args.steps, manager)
+        print(
+            f"{len(data['enemies']):>8} {every_enemy:>9.0f} {nearby:>10.0f}"
+            f" {len(manager.awake):>6} {manager.sleeping:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Compare linear scans with ``ActorIndex`` queries for attacks, contacts and pickups.
+
+Run from the repository root::
+
+    python -m benchmarks.actor_index --copies 10 100 1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Callable, List
+
+import pygame
+
+from benchmarks.common import tiled_level
+from src.game import entities, spatial
+
+
+def _time_us(call: Callable[[], object], repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        call()
+    return (time.perf_counter() - start) / repeats * 1e6
+
+
+def _queries(enemies: List[entities.Enemy], orbs: List[entities.EnergyOrb], area: pygame.Rect) -> Callable[[], object]:
+    """One step worth of lookups: the attack hitbox, then contact and pickup around the player."""
+
+    def run() -> object:
+        hits = spatial.overlapping(enemies, area.inflate(130, 24))
+        return hits, spatial.overlapping(enemies, area), spatial.overlapping(orbs, area)
+
+    return run
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--copies", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeats", type=int, default=2000, help="lookups timed per case")
+    parser.add_argument("--moves", type=int, default=200, help="steps of enemy movement timed per case")
+    args = parser.parse_args()
+
+    print(f"{'objects':>8} {'scan us':>8} {'index us':>9} {'relocate us':>12}")
+    for copies in args.copies:
+        data = tiled_level(copies)
+        enemies = [entities.Enemy(e["x"], e["y"], (e["min_x"], e["max_x"])) for e in data["enemies"]]
+        orbs = [entities.EnergyOrb.from_center(o["x"], o["y"]) for o in data["energy_orbs"]]
+        area = pygame.Rect(*data["player_start"], 40, 60)
+        scan = _time_us(_queries(enemies, orbs, area), args.repeats)
+
+        enemy_index = spatial.ActorIndex(enemies)
+        indexed = _time_us(_queries(enemy_index, spatial.ActorIndex(orbs), area), args.repeats)
+
+        # Cost of keeping the grid current while every enemy walks two pixels per step.
+        def move_all() -> None:
+            for enemy in enemy_index:
+                enemy.rect.x += 2 * enemy.direction
+                enemy_index.relocate(enemy)
+
+        relocate = _time_us(move_all, args.moves) / max(1, len(enemies))
+        print(f"{len(enemies) + len(orbs):>8} {scan:>8.1f} {indexed:>9.1f} {relocate:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Compare decoding each sprite on first use with the atlas built from, and read back from, the disk cache.
+
+Run from the repository root::
+
+    python -m benchmarks.assets --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import pygame
+
+from benchmarks import common  # noqa: F401  (selects the dummy SDL drivers)
+from src.game import assets
+
+
+def _per_sprite() -> None:
+    # What each entity class used to do: decode, convert, scale, then flip.
+    for spec in assets.SPRITES:
+        image = pygame.image.load(str(assets.default_assets_dir() / spec.name)).convert_alpha()
+        pygame.transform.flip(pygame.transform.scale(image, spec.size), True, False)
+
+
+def _atlas(cache_dir: Path, cold: bool) -> None:
+    manager = assets.AssetManager(cache_dir=cache_dir)
+    if cold:
+        manager.cache_path().unlink(missing_ok=True)
+    for spec in manager.specs:
+        manager.sprite(spec.name, spec.size, True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    pygame.display.init()
+    pygame.display.set_mode((320, 240))
+    with tempfile.TemporaryDirectory() as directory:
+        cache_dir = Path(directory)
+        cases = (
+            ("per-sprite decode", _per_sprite),
+            ("atlas, cold cache", lambda: _atlas(cache_dir, cold=True)),
+            ("atlas, warm cache", lambda: _atlas(cache_dir, cold=False)),
+        )
+        for label, load in cases:
+            times = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                load()
+                times.append((time.perf_counter() - start) * 1000)
+            print(f"{label:18} {statistics.median(times):8.2f} ms")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""Measure how batch playtesting throughput scales with the number of worker processes.
+
+Run from the repository root::
+
+    python -m benchmarks.batch --runs 64 --max-time 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+
+from src.game import batch
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=64)
+    parser.add_argument("--max-time", type=float, default=20.0, help="simulated seconds per run")
+    parser.add_argument(
+        "--workers", type=int, nargs="+", help="worker counts to time (default: powers of two up to the core count)"
+    )
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    counts = args.workers or sorted({1 << power for power in range(cores.bit_length())} | {cores})
+    config = batch.BatchConfig(max_time=args.max_time, auto_restart=True)
+    baseline = None
+    print(f"{'workers':>8} {'runs/s':>8} {'scaling':>8} {'efficiency':>11}")
+    for workers in counts:
+        start = time.perf_counter()
+        summary = batch.run_batch(config, args.runs, workers=workers)
+        rate = summary.runs / (time.perf_counter() - start)
+        baseline = baseline or rate
+        print(f"{workers:>8} {rate:>8.2f} {rate / baseline:>7.2f}x {rate / baseline / workers:>10.0%}")
+
+
+if __name__ == "__main__":
+    main()
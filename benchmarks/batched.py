@@ -0,0 +1,47 @@
+"""Measure agent steps per second of the batched environment for several batch sizes.
+
+Run from the repository root::
+
+    python -m benchmarks.batched --worlds 64 1024 8192 --steps 600
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from src.game import replay
+from src.game.batched import BatchedGame
+
+ACTIONS = np.array(
+    [replay.RIGHT, replay.RIGHT | replay.JUMP, replay.RIGHT | replay.ATTACK, replay.LEFT, replay.JUMP, 0],
+    dtype=np.uint8,
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--worlds", type=int, nargs="+", default=[64, 1024, 8192])
+    parser.add_argument("--steps", type=int, default=600, help="steps per batch size")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'worlds':>8} {'steps/s':>12} {'steps/min':>14} {'episodes':>9}")
+    for worlds in args.worlds:
+        game = BatchedGame(worlds)
+        game.reset()
+        episodes = 0
+        actions = ACTIONS[rng.integers(0, len(ACTIONS), size=(args.steps, worlds))]
+        start = time.perf_counter()
+        for step_actions in actions:
+            _, _, dones = game.step(step_actions)
+            episodes += int(dones.sum())
+        rate = worlds * args.steps / (time.perf_counter() - start)
+        print(f"{worlds:>8} {rate:>12,.0f} {rate * 60:>14,.0f} {episodes:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Compare ``Entity.move_and_collide`` with and without the platform broadphase.
+
+Run from the repository root::
+
+    python -m benchmarks.collision --platforms 10000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from benchmarks.common import tiled_level
+from src.game import entities, spatial
+
+
+def _time_collisions(platforms, level, steps: int) -> float:
+    movers = [entities.Enemy(e["x"], e["y"], (e["min_x"], e["max_x"])) for e in level["enemies"][:50]]
+    dt = 1 / 60
+    start = time.perf_counter()
+    for _ in range(steps):
+        for mover in movers:
+            mover.update(platforms, dt)
+    return (time.perf_counter() - start) / (steps * len(movers))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--platforms", type=int, default=10_000, help="approximate platform count")
+    parser.add_argument("--steps", type=int, default=20, help="simulation steps per measurement")
+    args = parser.parse_args()
+
+    per_copy = len(tiled_level(1)["platforms"])
+    level = tiled_level(max(1, args.platforms // per_copy))
+    platforms = [entities.Platform.from_dimensions(*rect) for rect in level["platforms"]]
+
+    start = time.perf_counter()
+    index = spatial.PlatformIndex(platforms)
+    build = time.perf_counter() - start
+
+    linear = _time_collisions(platforms, level, args.steps)
+    indexed = _time_collisions(index, level, args.steps)
+    print(f"platforms:        {len(platforms)}")
+    print(f"index build:      {build * 1000:.1f} ms")
+    print(f"linear scan:      {linear * 1e6:.1f} us per entity update")
+    print(f"grid broadphase:  {indexed * 1e6:.1f} us per entity update")
+    print(f"speedup:          {linear / indexed:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Helpers shared by the benchmark scripts."""
+
+from __future__ import annotations
+
+import os
+from typing import Dict, List
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from src.game.levels import level1  # noqa: E402
+
+
+def tiled_level(copies: int) -> Dict[str, object]:
+    """Return ``level1`` repeated ``copies`` times side by side.
+
+    Platforms, enemies (with their patrol ranges) and energy orbs are shifted by the
+    level width for each copy; the finish zone is moved to the last copy.
+    """
+
+    data = level1.load_level()
+    width, height = data["world_size"]
+    platforms: List[tuple] = []
+    enemies: List[dict] = []
+    orbs: List[dict] = []
+    for copy in range(copies):
+        shift = copy * width
+        platforms.extend((x + shift, y, w, h) for x, y, w, h in data["platforms"])
+        enemies.extend(
+            {**enemy, "x": enemy["x"] + shift, "min_x": enemy["min_x"] + shift, "max_x": enemy["max_x"] + shift}
+            for enemy in data["enemies"]
+        )
+        orbs.extend({**orb, "x": orb["x"] + shift} for orb in data["energy_orbs"])
+    fx, fy, fw, fh = data["finish_zone"]
+    return {
+        **data,
+        "platforms": platforms,
+        "enemies": enemies,
+        "energy_orbs": orbs,
+        "finish_zone": (fx + (copies - 1) * width, fy, fw, fh),
+        "world_size": (width * copies, height),
+    }
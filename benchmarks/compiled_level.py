@@ -0,0 +1,57 @@
+"""Compare loading level data with opening a compiled, memory-mapped level.
+
+The eager path is ``main.load_level`` on data already in memory (as when a
+level module is imported); the compiled path maps the ``.advl`` file and builds
+the platform broadphase from the mapped buffer. Run from the repository root::
+
+    python -m benchmarks.compiled_level --copies 1000 10000 42000
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.common import tiled_level
+from src.game import main as game
+from src.game.levels import compiled
+
+
+def _time_ms(call) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = call()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--copies", type=int, nargs="+", default=[1000, 10000, 42000])
+    parser.add_argument("--skip-eager", action="store_true", help="only time the compiled path")
+    args = parser.parse_args()
+
+    print(
+        f"{'platforms':>10} {'file MB':>8} {'eager ms':>9} {'compile ms':>11}"
+        f" {'open ms':>8} {'index ms':>9} {'objects ms':>11}"
+    )
+    for copies in args.copies:
+        data = tiled_level(copies)
+        eager_ms = float("nan") if args.skip_eager else _time_ms(lambda: game.load_level(data))[0]
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "level.advl"
+            compile_ms, _ = _time_ms(lambda: compiled.compile_level(data, path))
+            open_ms, level = _time_ms(lambda: compiled.CompiledLevel(path))
+            index_ms, _ = _time_ms(level.platform_index)
+            # The rest of the game objects: enemies and orbs are instantiated, the index is reused.
+            objects_ms, _ = _time_ms(lambda: game.load_compiled_level(level))
+            size_mb = path.stat().st_size / 1e6
+            level.close()
+        print(
+            f"{len(data['platforms']):>10} {size_mb:>8.1f} {eager_ms:>9.0f} {compile_ms:>11.0f}"
+            f" {open_ms:>8.2f} {index_ms:>9.0f} {objects_ms:>11.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Compare full redraws with dirty-rectangle updates while the camera holds still or scrolls.
+
+Run from the repository root::
+
+    python -m benchmarks.dirty_rects --frames 600
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import pygame
+
+from benchmarks import common  # noqa: F401  (selects the dummy SDL drivers)
+from src.game import main as game
+from src.game import rendering
+
+
+class _Keys(dict):
+    def __getitem__(self, key: int) -> bool:
+        return self.get(key, False)
+
+
+def _measure(screen, font, frames: int, scrolling: bool, dirty: bool) -> tuple[float, float]:
+    """Return the draw-and-present time per frame and the share of the screen presented."""
+
+    player, platforms, enemies, finish_rect, world_size, checkpoint_rect, respawn, energy_orbs = game.load_level()
+    layer = game.build_static_layer(world_size, platforms, checkpoint_rect, finish_rect)
+    cache = rendering.ResourceCache()
+    regions_tracker = rendering.DirtyRegions() if dirty else None
+    keys = _Keys({pygame.K_RIGHT: scrolling})
+    screen_area = screen.get_width() * screen.get_height()
+    reached = False
+    elapsed = 0.0
+    presented = 0
+    for frame in range(frames):
+        if frame % 60 == 0:
+            player.attack_timer = 0.0
+            game.perform_attack(player, enemies)
+        for _ in range(2):
+            reached, _ = game.update_game(
+                player, platforms, enemies, world_size, game.FIXED_DT, False, energy_orbs, checkpoint_rect,
+                reached, respawn, pressed_keys=keys,
+            )
+        if player.is_dead or player.rect.colliderect(finish_rect):
+            player.respawn(respawn)
+        camera = game.compute_camera(player.rect, world_size, screen.get_size())
+        scene = (player, platforms, enemies, finish_rect, camera, "playing", font, energy_orbs, checkpoint_rect)
+
+        start = time.perf_counter()
+        regions = None
+        if regions_tracker is not None:
+            sprites = game.sprite_regions(player, enemies, energy_orbs, camera, screen.get_size())
+            regions = regions_tracker.update(screen.get_size(), camera, "playing", sprites)
+        if regions is None:
+            game.draw(screen, *scene, 1.0, layer, cache)
+            pygame.display.flip()
+            presented += screen_area
+        else:
+            game.draw_regions(regions, screen, *scene, 1.0, layer, cache)
+            pygame.display.update(regions)
+            presented += sum(rect.width * rect.height for rect in regions)
+        elapsed += time.perf_counter() - start
+    return elapsed / frames * 1000, presented / (frames * screen_area)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=600)
+    args = parser.parse_args()
+
+    pygame.display.init()
+    pygame.font.init()
+    screen = pygame.display.set_mode(game.SCREEN_SIZE)
+    font = pygame.font.Font(None, 32)
+    print(f"{'camera':10} {'mode':6} {'ms/frame':>9} {'presented':>10}")
+    for scrolling in (False, True):
+        for dirty in (False, True):
+            frame_ms, share = _measure(screen, font, args.frames, scrolling, dirty)
+            camera = "scrolling" if scrolling else "still"
+            print(f"{camera:10} {'dirty' if dirty else 'full':6} {frame_ms:9.3f} {share:10.1%}")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
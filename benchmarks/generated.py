@@ -0,0 +1,70 @@
+"""Measure the procedural level generator: throughput, compile time and memory.
+
+For each size the level is generated once to count its objects, then streamed
+into a compiled ``.advl`` file. Memory is compared on one size between
+compiling the stream and building the lists of :func:`load_level`. Run from the
+repository root::
+
+    python -m benchmarks.generated --sections 1000 10000 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from benchmarks import common  # noqa: F401  (selects the dummy SDL drivers)
+from src.game.levels import compiled, generated
+
+
+def _peak_mb(call) -> float:
+    tracemalloc.start()
+    try:
+        call()
+        return tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sections", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--memory-sections", type=int, default=5000, help="size of the memory comparison")
+    args = parser.parse_args()
+
+    print(
+        f"{'sections':>9} {'platforms':>10} {'enemies':>8} {'orbs':>8}"
+        f" {'objects/s':>10} {'compile s':>10} {'file MB':>8}"
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "generated.advl"
+        for sections in args.sections:
+            level = generated.GeneratedLevel(args.seed, sections)
+            start = time.perf_counter()
+            counts = [0, 0, 0]
+            for section in level.iter_sections():
+                counts[0] += len(section.platforms)
+                counts[1] += len(section.enemies)
+                counts[2] += len(section.energy_orbs)
+            rate = sum(counts) / (time.perf_counter() - start)
+            start = time.perf_counter()
+            compiled.compile_level(level.level_data(), path)
+            compile_seconds = time.perf_counter() - start
+            print(
+                f"{sections:>9} {counts[0]:>10} {counts[1]:>8} {counts[2]:>8} {rate:>10.0f}"
+                f" {compile_seconds:>10.2f} {path.stat().st_size / 1e6:>8.1f}"
+            )
+
+        sections = args.memory_sections
+        level = generated.GeneratedLevel(args.seed, sections)
+        streamed = _peak_mb(lambda: compiled.compile_level(level.level_data(), path))
+        lists = _peak_mb(lambda: generated.load_level(args.seed, sections))
+        print(f"peak memory for {sections} sections: streamed {streamed:.1f} MB, as lists {lists:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
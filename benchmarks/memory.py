@@ -0,0 +1,63 @@
+"""Measure the memory held by platforms and entities as levels grow.
+
+Platforms are measured three ways: a list of dict-backed objects (how they were
+stored before ``__slots__``), a list of slotted :class:`~src.game.entities.Platform`
+and a :class:`~src.game.spatial.PlatformIndex` built from the raw rectangles,
+which keeps them in shared integer arrays. Run from the repository root::
+
+    python -m benchmarks.memory --copies 100 1000 40000  # up to about a million platforms
+"""
+
+from __future__ import annotations
+
+import argparse
+import tracemalloc
+from typing import Callable, Tuple
+
+import pygame
+
+from benchmarks.common import tiled_level
+from src.game import entities, spatial
+
+
+class _DictPlatform:
+    """A platform with a per-instance ``__dict__``, for comparison."""
+
+    def __init__(self, rect: pygame.Rect) -> None:
+        self.rect = rect
+
+
+def _allocated(build: Callable[[], object]) -> Tuple[float, object]:
+    """Return the megabytes still allocated by ``build`` and what it returned."""
+
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current / 1e6, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--copies", type=int, nargs="+", default=[100, 1000, 10000])
+    args = parser.parse_args()
+
+    print(f"{'platforms':>10} {'dict MB':>8} {'slots MB':>9} {'arrays MB':>10} {'enemies':>8} {'enemy MB':>9}")
+    for copies in args.copies:
+        data = tiled_level(copies)
+        rects = data["platforms"]
+        as_dicts, _ = _allocated(lambda: [_DictPlatform(pygame.Rect(r)) for r in rects])
+        slotted, _ = _allocated(lambda: [entities.Platform(pygame.Rect(r)) for r in rects])
+        arrays, index = _allocated(lambda: spatial.PlatformIndex.from_rects(rects))
+        assert len(index) == len(rects)
+        enemy_mb, enemies = _allocated(
+            lambda: [entities.Enemy(e["x"], e["y"], (e["min_x"], e["max_x"])) for e in data["enemies"]]
+        )
+        print(
+            f"{len(rects):>10} {as_dicts:>8.1f} {slotted:>9.1f} {arrays:>10.1f}"
+            f" {len(enemies):>8} {enemy_mb:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
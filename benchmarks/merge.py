@@ -0,0 +1,89 @@
+"""Measure how far level platforms merge into collision boxes and what it saves per collision test.
+
+Run from the repository root::
+
+    python -m benchmarks.merge --tiles 200000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from typing import List, Tuple
+
+from benchmarks.common import tiled_level
+from src.game import entities, spatial
+from src.game.levels import collision
+
+TILE = 32
+
+
+def tile_terrain(tiles: int, seed: int = 0) -> Tuple[List[Tuple[int, int, int, int]], List[int]]:
+    """A generated ground of ``TILE``-pixel square tiles: columns of random height, one rect per tile.
+
+    Returns the rects and the ground height of every column, in pixels from the top.
+    """
+
+    rng = random.Random(seed)
+    rects: List[Tuple[int, int, int, int]] = []
+    tops: List[int] = []
+    height = 4
+    column = 0
+    while len(rects) < tiles:
+        if rng.random() < 0.2:
+            height = max(1, min(12, height + rng.choice((-1, 1))))
+        top = 1000 - height * TILE
+        rects.extend((column * TILE, top + row * TILE, TILE, TILE) for row in range(height))
+        tops.append(top)
+        column += 1
+    return rects, tops
+
+
+def _time_collisions(platforms, movers: List[entities.Enemy], steps: int) -> float:
+    dt = 1 / 60
+    start = time.perf_counter()
+    for _ in range(steps):
+        for mover in movers:
+            mover.update(platforms, dt)
+    return (time.perf_counter() - start) / (steps * len(movers))
+
+
+def _measure(label: str, rects, movers_at, steps: int) -> None:
+    geometry = collision.build(rects)
+    report = geometry.report()
+    raw = spatial.PlatformIndex.from_rects(rects)
+    merged = spatial.PlatformIndex.from_rects(geometry.rects)
+    times = [_time_collisions(index, movers_at(), steps) for index in (raw, merged)]
+    print(
+        f"{label:14} {report['platforms']:>9} {report['collision_boxes']:>9} {report['reduction']:>9.1%}"
+        f" {report['merge_ms']:>9.1f} {times[0] * 1e6:>9.1f} {times[1] * 1e6:>9.1f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tiles", type=int, default=200_000, help="tiles of the generated terrain")
+    parser.add_argument("--copies", type=int, default=100, help="copies of level 1 laid side by side")
+    parser.add_argument("--steps", type=int, default=20, help="simulation steps per collision measurement")
+    args = parser.parse_args()
+
+    print(f"{'level':14} {'platforms':>9} {'boxes':>9} {'reduction':>9} {'merge ms':>9} {'raw us':>9} {'merged us':>9}")
+    level = tiled_level(args.copies)
+
+    def level_movers() -> List[entities.Enemy]:
+        return [entities.Enemy(e["x"], e["y"], (e["min_x"], e["max_x"])) for e in level["enemies"][:50]]
+
+    _measure(f"level1 x{args.copies}", level["platforms"], level_movers, args.steps)
+
+    rects, tops = tile_terrain(args.tiles)
+
+    def terrain_movers() -> List[entities.Enemy]:
+        columns = range(0, len(tops), max(1, len(tops) // 50))
+        return [entities.Enemy(c * TILE, tops[c] - 50, (c * TILE - 300, c * TILE + 300)) for c in columns]
+
+    _measure("tile terrain", rects, terrain_movers, args.steps)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Measure ``draw`` frame time and surface allocations with and without the render cache.
+
+Run from the repository root::
+
+    python -m benchmarks.render_cache --frames 600
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import pygame
+
+from benchmarks import common  # noqa: F401  (selects the dummy SDL drivers)
+from src.game import main as game
+from src.game import rendering
+
+
+def _measure(screen, font, cache, frames: int, state: str) -> tuple[float, float]:
+    player, platforms, enemies, finish_rect, world_size, checkpoint_rect, _, energy_orbs = game.load_level()
+    layer = game.build_static_layer(world_size, platforms, checkpoint_rect, finish_rect)
+    camera = game.compute_camera(player.rect, world_size, screen.get_size())
+    allocated = 0
+    elapsed = 0.0
+    for frame in range(frames):
+        if frame % 30 == 0:
+            player.attack_timer = 0.0
+            player.attack(enemies)
+        player.attack_indicator_timer = max(0.0, player.attack_indicator_timer - 1 / 60)
+        start = time.perf_counter()
+        stats = game.draw(
+            screen, player, platforms, enemies, finish_rect, camera, state, font, energy_orbs, checkpoint_rect,
+            1.0, layer, cache,
+        )
+        elapsed += time.perf_counter() - start
+        # Ignore the warm-up second while the cache fills.
+        if frame >= 60:
+            allocated += stats.surfaces_allocated
+    measured = max(1, frames - 60)
+    return elapsed / frames * 1000, allocated / measured
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=600)
+    args = parser.parse_args()
+
+    pygame.display.init()
+    pygame.font.init()
+    screen = pygame.display.set_mode(game.SCREEN_SIZE)
+    font = pygame.font.Font(None, 32)
+    for state in ("playing", "game_over"):
+        for label, cache in (("uncached", None), ("cached", rendering.ResourceCache())):
+            frame_ms, allocations = _measure(screen, font, cache, args.frames, state)
+            print(f"{state:10} {label:9} {frame_ms:6.3f} ms/frame  {allocations:5.2f} surfaces allocated/frame")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
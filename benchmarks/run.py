@@ -0,0 +1,244 @@
+"""Benchmark suite for the simulation and rendering hot paths.
+
+Times ``Entity.move_and_collide``, ``Player.update``, ``Enemy.update``,
+``update_game``, ``compute_camera`` and ``draw`` on copies of level 1 placed side
+by side (1x to 1000x its platforms and enemies). Rendering goes to an offscreen
+window through the SDL dummy video driver. Run from the repository root::
+
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --baseline bench.json  # exit status 1 on regressions
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import pygame
+
+from benchmarks.common import tiled_level
+from src.game import entities
+from src.game import main as game
+from src.game import rendering
+from src.game.sim import KeyState
+
+DEFAULT_SCALES = (1, 10, 100, 1000)
+DT = game.FIXED_DT
+RIGHT = KeyState(frozenset({pygame.K_RIGHT}))
+
+
+def percentile(sorted_samples: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of already sorted samples."""
+
+    index = min(len(sorted_samples) - 1, max(0, round(fraction * (len(sorted_samples) - 1))))
+    return sorted_samples[index]
+
+
+def measure(call: Callable[[], object], samples: int, warmup: int) -> Dict[str, float]:
+    """Time ``call`` ``samples`` times and summarize the latencies in microseconds."""
+
+    for _ in range(warmup):
+        call()
+    timings: List[float] = []
+    clock = time.perf_counter_ns
+    for _ in range(samples):
+        start = clock()
+        call()
+        timings.append((clock() - start) / 1000.0)
+    timings.sort()
+    mean = sum(timings) / len(timings)
+    return {
+        "samples": len(timings),
+        "mean_us": round(mean, 3),
+        "p50_us": round(percentile(timings, 0.50), 3),
+        "p90_us": round(percentile(timings, 0.90), 3),
+        "p99_us": round(percentile(timings, 0.99), 3),
+        "max_us": round(timings[-1], 3),
+        "fps_equivalent": round(1e6 / mean, 1) if mean > 0 else None,
+    }
+
+
+def _cases(scale: int, screen: pygame.Surface, font: pygame.font.Font) -> Dict[str, Callable[[], object]]:
+    """Build the benchmarked callables for a level ``scale`` times the size of level 1."""
+
+    data = tiled_level(scale)
+    (
+        player,
+        platforms,
+        enemies,
+        finish_rect,
+        world_size,
+        checkpoint_rect,
+        checkpoint_respawn,
+        energy_orbs,
+    ) = game.load_level(data)
+    start = player.rect.topleft
+
+    mover = entities.Entity(*start, 40, 60)
+
+    def move_and_collide() -> None:
+        if mover.rect.x > world_size[0] or mover.rect.top > world_size[1]:
+            mover.rect.topleft = start
+        mover.velocity.update(220, mover.velocity.y)
+        mover.apply_gravity(DT)
+        mover.move_and_collide(platforms, DT)
+
+    def player_update() -> None:
+        if player.rect.top > world_size[1]:
+            player.respawn(start)
+        player.update(RIGHT, False, platforms, DT)
+
+    def enemy_update() -> None:
+        for enemy in enemies:
+            enemy.update(platforms, DT)
+
+    # update_game works on its own copy of the level so it cannot disturb the cases above.
+    world = list(game.load_level(data))
+
+    def update_game() -> None:
+        world_player = world[0]
+        if world_player.rect.top > world_size[1] or world_player.is_dead:
+            world_player.respawn(start)
+        game.update_game(
+            world_player,
+            world[1],
+            world[2],
+            world[4],
+            DT,
+            False,
+            world[7],
+            world[5],
+            False,
+            world[6],
+            pressed_keys=RIGHT,
+        )
+
+    def compute_camera() -> None:
+        game.compute_camera(player.rect, world_size, screen.get_size())
+
+    static_layer = game.build_static_layer(world_size, platforms, checkpoint_rect, finish_rect)
+    cache = rendering.ResourceCache()
+
+    def draw() -> None:
+        camera = game.compute_camera(player.rect, world_size, screen.get_size())
+        game.draw(
+            screen,
+            player,
+            platforms,
+            enemies,
+            finish_rect,
+            camera,
+            "playing",
+            font,
+            energy_orbs,
+            checkpoint_rect,
+            1.0,
+            static_layer,
+            cache,
+        )
+
+    return {
+        "Entity.move_and_collide": move_and_collide,
+        "Player.update": player_update,
+        "Enemy.update (all enemies)": enemy_update,
+        "update_game": update_game,
+        "compute_camera": compute_camera,
+        "draw": draw,
+    }
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        result = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def run_suite(scales: List[int], samples: int, warmup: int) -> dict:
+    pygame.display.init()
+    pygame.font.init()
+    screen = pygame.display.set_mode(game.SCREEN_SIZE)
+    font = pygame.font.Font(None, 32)
+
+    results: Dict[str, Dict[str, dict]] = {}
+    for scale in scales:
+        level = tiled_level(scale)
+        key = f"{scale}x"
+        results[key] = {
+            "platforms": len(level["platforms"]),
+            "enemies": len(level["enemies"]),
+            "cases": {},
+        }
+        for name, call in _cases(scale, screen, font).items():
+            stats = measure(call, samples, warmup)
+            results[key]["cases"][name] = stats
+            print(
+                f"{key:>6} {name:28} p50 {stats['p50_us']:10.1f} us  p99 {stats['p99_us']:10.1f} us"
+                f"  {stats['fps_equivalent'] or 0:10.1f} fps eq.",
+                flush=True,
+            )
+    pygame.quit()
+    return {
+        "meta": {
+            "python": sys.version.split()[0],
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "revision": _git_revision(),
+            "samples": samples,
+        },
+        "results": results,
+    }
+
+
+def compare(report: dict, baseline: dict, threshold: float) -> List[str]:
+    """Return a description of every case whose p50 regressed by more than ``threshold``."""
+
+    regressions = []
+    for scale, level in report["results"].items():
+        previous_level = baseline.get("results", {}).get(scale)
+        if not previous_level:
+            continue
+        for name, stats in level["cases"].items():
+            previous = previous_level["cases"].get(name)
+            if not previous or previous["p50_us"] <= 0:
+                continue
+            change = stats["p50_us"] / previous["p50_us"] - 1.0
+            if change > threshold:
+                regressions.append(
+                    f"{scale} {name}: p50 {previous['p50_us']:.1f} -> {stats['p50_us']:.1f} us (+{change:.0%})"
+                )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=list(DEFAULT_SCALES), help="level multipliers")
+    parser.add_argument("--samples", type=int, default=200, help="timed calls per case")
+    parser.add_argument("--warmup", type=int, default=20, help="untimed calls per case")
+    parser.add_argument("--output", type=Path, help="write the JSON report to this file")
+    parser.add_argument("--baseline", type=Path, help="JSON report of a previous run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed p50 slowdown before failing")
+    args = parser.parse_args(argv)
+
+    report = run_suite(args.scales, args.samples, args.warmup)
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    if args.baseline:
+        regressions = compare(report, json.loads(args.baseline.read_text(encoding="utf-8")), args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+"""Compare reloading a level with restoring a snapshot, and time per-frame captures.
+
+Run from the repository root::
+
+    python -m benchmarks.snapshot --copies 1 10 100 1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Callable
+
+from benchmarks.common import tiled_level
+from src.game import activation, snapshot, timers
+from src.game import main as game
+
+
+def _time_us(call: Callable[[], object], repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        call()
+    return (time.perf_counter() - start) / repeats * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--copies", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'enemies':>8} {'reload ms':>10} {'restore ms':>11} {'capture ms':>11} {'KB/frame':>9}")
+    for copies in args.copies:
+        data = tiled_level(copies)
+        reload = _time_us(lambda: game.load_level(data), args.repeats) / 1000
+
+        player, _, enemies, _, _, _, _, energy_orbs = game.load_level(data)
+        manager = activation.ActivationManager()
+        manager.sync(enemies)
+        world = snapshot.WorldState(player, enemies, energy_orbs, timers.Scheduler(), manager)
+        buffer = world.buffer()
+        world.capture(buffer, False, player.rect.topleft)
+        restore = _time_us(lambda: world.restore(buffer), args.repeats) / 1000
+        capture = _time_us(lambda: world.capture(buffer, False, player.rect.topleft), args.repeats) / 1000
+        print(f"{len(enemies):>8} {reload:>10.2f} {restore:>11.2f} {capture:>11.2f} {world.size * 8 / 1024:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
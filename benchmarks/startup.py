@@ -0,0 +1,72 @@
+"""Measure the game's startup phases and time to first frame in fresh interpreters.
+
+Run from the repository root::
+
+    python -m benchmarks.startup --runs 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+from src.game import startup
+
+# Starts the game, quits on the second frame and prints the startup timeline as JSON.
+_CHILD = """
+import json
+from src.game import main, startup
+import pygame
+
+_get = pygame.event.get
+frames = []
+
+def get(*args, **kwargs):
+    frames.append(None)
+    return [pygame.event.Event(pygame.QUIT)] if len(frames) > 1 else _get(*args, **kwargs)
+
+pygame.event.get = get
+main.main([])
+print(json.dumps(startup.timeline.report()))
+"""
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy", PYGAME_HIDE_SUPPORT_PROMPT="1")
+    phases: Dict[str, List[float]] = {}
+    first_frame: List[float] = []
+    process: List[float] = []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, "-c", _CHILD], env=env, capture_output=True, text=True, check=True
+        ).stdout
+        process.append((time.perf_counter() - start) * 1000)
+        report = json.loads(output.strip().splitlines()[-1])
+        for name, milliseconds in report["phases_ms"].items():
+            phases.setdefault(name, []).append(milliseconds)
+        first_frame.append(report["time_to_first_frame_ms"])
+
+    print(f"{'phase':20} {'median ms':>10}")
+    for name, values in phases.items():
+        print(f"{name:20} {statistics.median(values):10.1f}")
+    ttff = statistics.median(first_frame)
+    print(
+        f"{'time to first frame':20} {ttff:10.1f}"
+        f"  (first import to first frame of play, target {startup.FIRST_FRAME_TARGET_MS:.0f} ms)"
+    )
+    print(f"{'whole process':20} {statistics.median(process):10.1f}  (interpreter start to exit)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Compare eager level loading with the chunked streaming loader as worlds grow.
+
+Run from the repository root::
+
+    python -m benchmarks.streaming --copies 10 100 1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.common import tiled_level
+from src.game import main as game
+from src.game.levels import chunked
+
+
+def _measure(load) -> tuple[float, float, object]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = load()
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed * 1000, current / 1e6, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--copies", type=int, nargs="+", default=[10, 100, 1000])
+    args = parser.parse_args()
+
+    print(f"{'world px':>10} {'eager ms':>9} {'eager MB':>9} {'stream ms':>10} {'stream MB':>10}")
+    for copies in args.copies:
+        data = tiled_level(copies)
+        eager_ms, eager_mb, _ = _measure(lambda: game.load_level(data))
+        with tempfile.TemporaryDirectory() as directory:
+            chunked.write_chunked(data, Path(directory))
+
+            def load_streamed():
+                stream = chunked.StreamingLevel(Path(directory), background=False)
+                return stream, game.load_streamed_level(stream)
+
+            stream_ms, stream_mb, (stream, _) = _measure(load_streamed)
+            stream.close()
+        print(f"{data['world_size'][0]:>10} {eager_ms:>9.1f} {eager_mb:>9.2f} {stream_ms:>10.1f} {stream_mb:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
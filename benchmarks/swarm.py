@@ -0,0 +1,53 @@
+"""Compare per-object ``Enemy.update`` with the NumPy ``EnemySwarm`` backend.
+
+Run from the repository root::
+
+    python -m benchmarks.swarm --copies 300
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from benchmarks.common import tiled_level
+from src.game import entities, spatial, swarm
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--copies", type=int, default=300, help="copies of level 1 placed side by side")
+    parser.add_argument("--steps", type=int, default=120, help="simulation steps to time")
+    args = parser.parse_args()
+
+    level = tiled_level(args.copies)
+    platforms = spatial.PlatformIndex([entities.Platform.from_dimensions(*rect) for rect in level["platforms"]])
+
+    def build():
+        return [entities.Enemy(e["x"], e["y"], (e["min_x"], e["max_x"])) for e in level["enemies"]]
+
+    dt = 1 / 120
+    enemies = build()
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        for enemy in enemies:
+            enemy.update(platforms, dt)
+    per_object = (time.perf_counter() - start) / args.steps
+
+    group = swarm.EnemySwarm(build(), platforms)
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        group.update(dt)
+    vectorized = (time.perf_counter() - start) / args.steps
+
+    mismatches = sum(
+        enemy.rect.topleft != (int(group.left[row]), int(group.top[row])) for row, enemy in enumerate(enemies)
+    )
+    print(f"enemies:       {len(enemies)}  platforms: {len(platforms)}")
+    print(f"Enemy.update:  {per_object * 1000:.2f} ms per step")
+    print(f"EnemySwarm:    {vectorized * 1000:.2f} ms per step")
+    print(f"speedup:       {per_object / vectorized:.1f}x  (mismatched positions: {mismatches})")
+
+
+if __name__ == "__main__":
+    main()
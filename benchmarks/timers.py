@@ -0,0 +1,58 @@
+"""Compare polling every energy orb with scheduling their respawns.
+
+Each case collects a share of the orbs, then times the steps that follow: the
+polled version calls ``EnergyOrb.update`` on every orb, the scheduled version
+only advances a :class:`~src.game.timers.Scheduler`. Run from the repository root::
+
+    python -m benchmarks.timers --orbs 1000 10000 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from typing import List, Optional
+
+from src.game import entities, timers
+
+DT = 1 / 120
+
+
+def _orbs(count: int, collected: float, scheduler: Optional[timers.Scheduler]) -> List[entities.EnergyOrb]:
+    rng = random.Random(count)
+    orbs = [entities.EnergyOrb.from_center(index * 64, 300) for index in range(count)]
+    for orb in orbs:
+        if rng.random() < collected:
+            orb.collect(scheduler)
+    return orbs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orbs", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--collected", type=float, default=0.1, help="share of orbs waiting to respawn")
+    parser.add_argument("--steps", type=int, default=720, help="steps timed, enough for every respawn to fire")
+    args = parser.parse_args()
+
+    print(f"{'orbs':>8} {'polled us':>10} {'scheduled us':>13} {'respawned':>10}")
+    for count in args.orbs:
+        orbs = _orbs(count, args.collected, None)
+        start = time.perf_counter()
+        for _ in range(args.steps):
+            for orb in orbs:
+                orb.update(DT)
+        polled = (time.perf_counter() - start) / args.steps * 1e6
+
+        scheduler = timers.Scheduler()
+        _orbs(count, args.collected, scheduler)
+        fired = 0
+        start = time.perf_counter()
+        for _ in range(args.steps):
+            fired += scheduler.advance(DT)
+        scheduled = (time.perf_counter() - start) / args.steps * 1e6
+        print(f"{count:>8} {polled:>10.1f} {scheduled:>13.2f} {fired:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""Enemy activation regions: only enemies near the camera are simulated.
+
+:class:`ActivationManager` splits the enemies of a level into awake ones,
+updated every step, and sleeping ones, kept in coarse columns of the world and
+not touched at all. An enemy falls asleep when it leaves the activation area (the
+camera view grown by ``radius`` on every side) and wakes when its patrol route
+enters it again; a grounded enemy is then moved to where its patrol would have
+taken it in the meantime (:meth:`Enemy.fast_forward`). A step therefore costs
+time proportional to the enemies near the player, not to the whole level.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Sequence
+
+import pygame
+
+from .entities import Enemy, Platform
+
+ACTIVATION_RADIUS = 480  # pixels around the camera view where enemies stay awake
+COLUMN_WIDTH = 512  # width of the world columns indexing sleeping enemies
+
+
+def _patrol_area(enemy: Enemy) -> pygame.Rect:
+    """Return the area an enemy can cover while patrolling from its current height."""
+
+    left = min(enemy.patrol_range[0], enemy.rect.left)
+    right = max(enemy.patrol_range[1], enemy.rect.right)
+    return pygame.Rect(left, enemy.rect.top, right - left, enemy.rect.height)
+
+
+def _blocked(platforms: Sequence[Platform], rect: pygame.Rect) -> bool:
+    query = getattr(platforms, "query", None)
+    candidates = (platforms[index] for index in query(rect)) if query else iter(platforms)
+    return any(platform.rect.colliderect(rect) for platform in candidates)
+
+
+class _Sleeper:
+    __slots__ = ("enemy", "since", "fast_forward")
+
+    def __init__(self, enemy: Enemy, since: float) -> None:
+        self.reset(enemy, since)
+
+    def reset(self, enemy: Enemy, since: float) -> None:
+        self.enemy = enemy
+        self.since = since
+        # Airborne enemies are frozen instead: their landing spot is not known in closed form.
+        self.fast_forward = enemy.on_ground
+
+
+class ActivationManager:
+    """Put enemies far from the camera to sleep and wake them when it comes back.
+
+    Call :meth:`update` once per simulation step with the level's enemy list; it
+    returns the enemies to simulate. The manager follows the list it was given:
+    a new list (a reloaded level) is picked up automatically, while changes made to
+    the same list by something else than an attack, such as a streamed level
+    loading chunks, must be reported with :meth:`sync`.
+    """
+
+    def __init__(self, radius: int = ACTIVATION_RADIUS, column_width: int = COLUMN_WIDTH) -> None:
+        self.radius = radius
+        self.column_width = column_width
+        self.time = 0.0
+        self._enemies: Optional[List[Enemy]] = None
+        self._awake: List[Enemy] = []
+        self._sleeping: Dict[int, _Sleeper] = {}
+        # Sleeping enemies indexed by every column their patrol area covers.
+        self._columns: Dict[int, List[_Sleeper]] = {}
+        # Latest sleeper record of each enemy, reused by restore once the columns are emptied.
+        self._records: Dict[int, _Sleeper] = {}
+
+    @property
+    def awake(self) -> List[Enemy]:
+        return self._awake
+
+    @property
+    def sleeping(self) -> int:
+        return len(self._sleeping)
+
+    def sync(self, enemies: List[Enemy]) -> None:
+        """Forget every sleeper and treat all of ``enemies`` as awake."""
+
+        self._enemies = enemies
+        self._awake = list(enemies)
+        self._sleeping.clear()
+        self._columns.clear()
+        self._records.clear()
+
+    def asleep_since(self, enemy: Enemy) -> Optional[float]:
+        """Return the time ``enemy`` fell asleep, or ``None`` if it is awake."""
+
+        sleeper = self._sleeping.get(id(enemy))
+        return sleeper.since if sleeper is not None else None
+
+    def restore(self, enemies: List[Enemy], time: float, roster: Sequence[Enemy], since: Sequence[float]) -> None:
+        """Reset the clock to ``time``; ``roster[i]`` is asleep since ``since[i]`` if not negative, awake otherwise.
+
+        Used when a saved world state is restored (see :mod:`src.game.snapshot`).
+        The existing sleeper records and column lists are refilled in place.
+        """
+
+        if enemies is not self._enemies:
+            self.sync(enemies)
+        self.time = time
+        self._sleeping.clear()
+        for sleepers in self._columns.values():
+            sleepers.clear()
+        for position, enemy in enumerate(roster):
+            if since[position] >= 0:
+                self._put_to_sleep(enemy, since[position], self._records.get(id(enemy)))
+        awake = self._awake
+        awake.clear()
+        awake.extend(enemy for enemy in enemies if id(enemy) not in self._sleeping)
+
+    def update(
+        self, enemies: List[Enemy], view: pygame.Rect, platforms: Sequence[Platform], dt: float
+    ) -> List[Enemy]:
+        """Advance the clock by ``dt``, move enemies in or out of sleep and return the awake ones."""
+
+        if enemies is not self._enemies:
+            self.sync(enemies)
+        self.time += dt
+        area = view.inflate(2 * self.radius, 2 * self.radius)
+
+        awake: List[Enemy] = []
+        for enemy in self._awake:
+            if enemy.health <= 0:
+                continue  # defeated and removed from the level
+            if area.colliderect(_patrol_area(enemy)):
+                awake.append(enemy)
+            else:
+                self._put_to_sleep(enemy)
+
+        width = self.column_width
+        for column in range(area.left // width, (area.right - 1) // width + 1):
+            sleepers = self._columns.get(column)
+            if not sleepers:
+                continue
+            remaining = []
+            for sleeper in sleepers:
+                if self._sleeping.get(id(sleeper.enemy)) is not sleeper:
+                    continue  # already woken through another column
+                if area.colliderect(_patrol_area(sleeper.enemy)):
+                    self._wake(sleeper, platforms)
+                    awake.append(sleeper.enemy)
+                else:
+                    remaining.append(sleeper)
+            if remaining:
+                self._columns[column] = remaining
+            else:
+                del self._columns[column]
+
+        self._awake = awake
+        return awake
+
+    def _put_to_sleep(self, enemy: Enemy, since: Optional[float] = None, record: Optional[_Sleeper] = None) -> None:
+        since = self.time if since is None else since
+        # A record is only reused when no column list can still hold it (see restore).
+        if record is None:
+            sleeper = self._records[id(enemy)] = _Sleeper(enemy, since)
+        else:
+            sleeper = record
+            sleeper.reset(enemy, since)
+        self._sleeping[id(enemy)] = sleeper
+        patrol = _patrol_area(enemy)
+        width = self.column_width
+        for column in range(patrol.left // width, (patrol.right - 1) // width + 1):
+            self._columns.setdefault(column, []).append(sleeper)
+
+    def _wake(self, sleeper: _Sleeper, platforms: Sequence[Platform]) -> None:
+        del self._sleeping[id(sleeper.enemy)]
+        enemy = sleeper.enemy
+        if not sleeper.fast_forward:
+            return
+        left, direction = enemy.rect.left, enemy.direction
+        enemy.fast_forward(self.time - sleeper.since)
+        if _blocked(platforms, enemy.rect):
+            # The route is not clear after all; resume from where the enemy fell asleep.
+            enemy.rect.left = left
+            enemy.direction = enemy.facing = direction
+            enemy.velocity.x = enemy.speed * direction
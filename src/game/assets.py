@@ -0,0 +1,271 @@
+"""Sprite atlas built from the PNG assets and cached on disk, scaled and flipped.
+
+The sprites in ``assets/`` are large images drawn at the size of an entity's
+hitbox, facing either way. :class:`AssetManager` decodes, scales and flips them
+all once, packs the results into a single atlas surface and writes its raw
+pixels to a cache file named after a hash of the source images and the sprite
+sizes. Later starts read that file back instead of decoding the PNGs; changing
+an image or a hitbox size changes the hash, so a stale atlas is never used.
+
+The game warms the atlas in a background thread while the level loads, so
+drawing never decodes or scales anything::
+
+    python -m src.game.assets          # build the atlas now and report timings
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import struct
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import pygame
+
+HERO = "hero.png"
+MONSTER = "monstre.png"
+
+
+@dataclass(frozen=True)
+class SpriteSpec:
+    """A sprite file and the hitbox size it is drawn at."""
+
+    name: str
+    size: Tuple[int, int]
+
+
+# Every sprite the game draws; entities asking for anything else get it built on demand.
+SPRITES = (SpriteSpec(HERO, (40, 60)), SpriteSpec(MONSTER, (40, 50)))
+
+ATLAS_WIDTH = 1024  # pixels per row of the atlas before starting a new shelf
+CACHE_MAGIC = b"ADAT"
+CACHE_VERSION = 1
+# magic, version, atlas width, atlas height, index length
+CACHE_HEADER = struct.Struct("<4sHHHI")
+
+SpriteKey = Tuple[str, Tuple[int, int], bool]  # name, size, flipped
+
+
+def default_assets_dir() -> Path:
+    """Return the directory containing runtime assets (sprites, etc.)."""
+
+    return Path(__file__).resolve().parents[2] / "assets"
+
+
+def default_cache_dir() -> Path:
+    """Per-user cache directory, ``$XDG_CACHE_HOME/adventure-platformer`` by default."""
+
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "adventure-platformer"
+
+
+def pack_shelves(sizes: Sequence[Tuple[int, int]], width: int = ATLAS_WIDTH) -> Tuple[List[pygame.Rect], int]:
+    """Place ``sizes`` left to right on shelves of the tallest first; return the rects and the total height."""
+
+    order = sorted(range(len(sizes)), key=lambda index: -sizes[index][1])
+    rects: List[pygame.Rect] = [pygame.Rect(0, 0, 0, 0)] * len(sizes)
+    x = y = shelf_height = 0
+    for index in order:
+        w, h = sizes[index]
+        if x + w > width and x > 0:
+            x, y, shelf_height = 0, y + shelf_height, 0
+        rects[index] = pygame.Rect(x, y, w, h)
+        x += w
+        shelf_height = max(shelf_height, h)
+    return rects, y + shelf_height
+
+
+class AssetManager:
+    """Scaled and flipped sprites cut from one atlas, loaded from the disk cache when possible.
+
+    :meth:`warm` (or :meth:`warm_in_background`) prepares every sprite of
+    ``specs``; :meth:`sprite` then only looks them up. Missing or unreadable
+    images have no sprite, and entities fall back to plain rectangles.
+    """
+
+    def __init__(
+        self,
+        assets_dir: Optional[Path] = None,
+        cache_dir: Optional[Path] = None,
+        specs: Sequence[SpriteSpec] = SPRITES,
+    ) -> None:
+        self.assets_dir = assets_dir or default_assets_dir()
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.specs = tuple(specs)
+        self.cache_hit: Optional[bool] = None  # whether the last warm-up read the disk cache
+        self._atlas: Optional[pygame.Surface] = None
+        self._layout: Dict[SpriteKey, pygame.Rect] = {}
+        self._sprites: Dict[SpriteKey, Optional[pygame.Surface]] = {}
+        self._converted = False
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def warm(self) -> None:
+        """Load or build the atlas now, unless it already is."""
+
+        with self._lock:
+            if self._atlas is None and self.cache_hit is None:
+                self._load()
+
+    def warm_in_background(self) -> threading.Thread:
+        """Start :meth:`warm` on a daemon thread; :meth:`sprite` waits for it if needed."""
+
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.warm, name="asset-warmup", daemon=True)
+            self._thread.start()
+        return self._thread
+
+    def sprite(self, name: str, size: Tuple[int, int], flipped: bool = False) -> Optional[pygame.Surface]:
+        """Return ``name`` scaled to ``size`` and mirrored horizontally if ``flipped``."""
+
+        key = (name, tuple(size), flipped)
+        surface = self._sprites.get(key, False)
+        if surface is not False:
+            return surface
+        self.warm()
+        self._convert()
+        rect = self._layout.get(key)
+        if rect is not None:
+            surface = self._atlas.subsurface(rect)
+        else:
+            # Not in the atlas: a size nobody declared in ``specs``.
+            surface = self._render(SpriteSpec(name, key[1]))
+            if surface is not None and flipped:
+                surface = pygame.transform.flip(surface, True, False)
+        self._sprites[key] = surface
+        return surface
+
+    def clear(self) -> None:
+        """Forget the loaded atlas, e.g. after the display was recreated."""
+
+        with self._lock:
+            self._atlas = None
+            self._layout.clear()
+            self._sprites.clear()
+            self._converted = False
+            self.cache_hit = None
+
+    def cache_path(self) -> Path:
+        """Cache file of the current source images and sizes."""
+
+        digest = hashlib.blake2b(digest_size=12)
+        digest.update(struct.pack("<H", CACHE_VERSION))
+        for spec in self.specs:
+            digest.update(spec.name.encode("utf-8"))
+            digest.update(struct.pack("<HH", *spec.size))
+            try:
+                digest.update((self.assets_dir / spec.name).read_bytes())
+            except OSError:
+                digest.update(b"missing")
+        return self.cache_dir / f"atlas-{digest.hexdigest()}.bin"
+
+    def _load(self) -> None:
+        path = self.cache_path()
+        loaded = self._read_cache(path)
+        self.cache_hit = loaded is not None
+        if loaded is None:
+            loaded = self._build()
+            if loaded is not None:
+                self._write_cache(path, *loaded)
+        if loaded is not None:
+            self._atlas, self._layout = loaded
+
+    def _build(self) -> Optional[Tuple[pygame.Surface, Dict[SpriteKey, pygame.Rect]]]:
+        pieces: List[Tuple[SpriteKey, pygame.Surface]] = []
+        for spec in self.specs:
+            surface = self._render(spec)
+            if surface is not None:
+                pieces.append(((spec.name, spec.size, False), surface))
+                pieces.append(((spec.name, spec.size, True), pygame.transform.flip(surface, True, False)))
+        if not pieces:
+            return None
+        rects, height = pack_shelves([surface.get_size() for _, surface in pieces])
+        width = max(rect.right for rect in rects)
+        atlas = pygame.Surface((width, height), pygame.SRCALPHA, 32)
+        layout: Dict[SpriteKey, pygame.Rect] = {}
+        for (key, surface), rect in zip(pieces, rects):
+            # Adding onto the transparent atlas copies the pixels exactly instead of blending them.
+            atlas.blit(surface, rect, special_flags=pygame.BLEND_RGBA_ADD)
+            layout[key] = rect
+        return atlas, layout
+
+    def _render(self, spec: SpriteSpec) -> Optional[pygame.Surface]:
+        path = self.assets_dir / spec.name
+        if not path.exists():
+            return None
+        try:
+            image = pygame.image.load(str(path))
+        except pygame.error:
+            return None
+        return pygame.transform.scale(image, spec.size)
+
+    def _read_cache(self, path: Path) -> Optional[Tuple[pygame.Surface, Dict[SpriteKey, pygame.Rect]]]:
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return None
+        if len(data) < CACHE_HEADER.size:
+            return None
+        magic, version, width, height, index_length = CACHE_HEADER.unpack_from(data)
+        pixels_at = CACHE_HEADER.size + index_length
+        if magic != CACHE_MAGIC or version != CACHE_VERSION or len(data) != pixels_at + 4 * width * height:
+            return None
+        index = json.loads(data[CACHE_HEADER.size : pixels_at])
+        layout = {(name, (w, h), bool(flipped)): pygame.Rect(x, y, w, h) for name, flipped, x, y, w, h in index}
+        atlas = pygame.image.frombytes(data[pixels_at:], (width, height), "RGBA")
+        return atlas, layout
+
+    def _write_cache(self, path: Path, atlas: pygame.Surface, layout: Dict[SpriteKey, pygame.Rect]) -> None:
+        index = [[name, flipped, *rect] for (name, _, flipped), rect in layout.items()]
+        index_bytes = json.dumps(index).encode("utf-8")
+        width, height = atlas.get_size()
+        header = CACHE_HEADER.pack(CACHE_MAGIC, CACHE_VERSION, width, height, len(index_bytes))
+        temporary = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temporary.write_bytes(header + index_bytes + pygame.image.tobytes(atlas, "RGBA"))
+            os.replace(temporary, path)
+        except OSError:
+            # A read-only or full disk only costs the next start a rebuild.
+            temporary.unlink(missing_ok=True)
+
+    def _convert(self) -> None:
+        # Converting needs the display, which only exists on the main thread's window.
+        if self._converted or self._atlas is None or not pygame.display.get_surface():
+            return
+        try:
+            self._atlas = self._atlas.convert_alpha()
+        except pygame.error:
+            return
+        self._sprites.clear()
+        self._converted = True
+
+
+manager = AssetManager()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.game.assets", description=__doc__.splitlines()[0])
+    parser.add_argument("--cache-dir", type=Path, help=f"atlas cache directory (default: {default_cache_dir()})")
+    parser.add_argument("--rebuild", action="store_true", help="ignore the cached atlas")
+    args = parser.parse_args(argv)
+    assets = AssetManager(cache_dir=args.cache_dir)
+    if args.rebuild:
+        assets.cache_path().unlink(missing_ok=True)
+    start = time.perf_counter()
+    assets.warm()
+    elapsed = time.perf_counter() - start
+    source = "cache" if assets.cache_hit else "sources"
+    print(f"{len(assets._layout)} sprites from {source} in {elapsed * 1000:.1f} ms: {assets.cache_path()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,295 @@
+"""Batch playtesting: many headless playthroughs of a level across every CPU core.
+
+Each run is a :class:`~src.game.sim.Simulation` driven by an input script, either
+given with ``--script`` (several scripts are used in turn) or drawn at random
+from the run's seed. Runs are independent, so they are handed to a process pool
+in chunks and their results are folded into the summary as they arrive::
+
+    python -m src.game.batch --runs 1000 --random --max-time 120 --auto-restart
+
+Run ``i`` of a batch started with ``--seed s`` always gets the same seed, so any
+run in the report can be replayed alone with ``--runs 1 --first-run i``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from . import entities, sim
+from .levels import chunked, compiled, level1
+
+# Weighted actions of the random scripts: mostly running right, with jumps and attacks.
+RANDOM_ACTIONS = (
+    ("right", 40),
+    ("right+jump", 20),
+    ("right+attack", 10),
+    ("jump", 6),
+    ("attack", 4),
+    ("left", 8),
+    ("left+jump", 4),
+    ("idle", 8),
+)
+RANDOM_SEGMENT_SECONDS = (0.05, 1.0)
+
+
+def run_seed(batch_seed: int, index: int) -> int:
+    """Seed of run ``index``: a hash of the batch seed and the index, stable across processes."""
+
+    return random.Random(f"{batch_seed}:{index}").getrandbits(63)
+
+
+def random_script(rng: random.Random, duration: float) -> sim.InputScript:
+    """Draw segments of :data:`RANDOM_ACTIONS` until the script lasts ``duration`` seconds."""
+
+    names = [name for name, _ in RANDOM_ACTIONS]
+    weights = [weight for _, weight in RANDOM_ACTIONS]
+    low, high = RANDOM_SEGMENT_SECONDS
+    segments: List[sim.ScriptSegment] = []
+    total = 0.0
+    while total < duration:
+        (name,) = rng.choices(names, weights)
+        seconds = round(rng.uniform(low, high), 3)
+        segments.append(sim.ScriptSegment(frozenset(name.split("+")), seconds))
+        total += seconds
+    return sim.InputScript(segments)
+
+
+@dataclass(frozen=True)
+class BatchConfig:
+    """Settings shared by every run of a batch."""
+
+    level_path: Optional[Path] = None
+    scripts: Sequence[sim.InputScript] = ()  # empty: random scripts
+    max_time: float = 120.0
+    dt: float = sim.DEFAULT_DT
+    auto_restart: bool = False
+    activation_radius: Optional[int] = None
+    collision_mode: str = entities.Entity.collision_mode
+
+
+@dataclass
+class RunResult:
+    index: int
+    seed: int
+    outcome: str
+    completed: bool
+    sim_time: float
+    deaths: int
+    falls: int
+    checkpoint_reached: bool
+    wall_time: float
+
+
+# Per-process state, set up once by _init_worker.
+_config: Optional[BatchConfig] = None
+_level_data: Optional[level1.LevelData] = None
+_compiled_level: Optional[compiled.CompiledLevel] = None
+_stream_path: Optional[Path] = None
+
+
+def _init_worker(config: BatchConfig) -> None:
+    global _config, _level_data, _compiled_level, _stream_path
+    _config = config
+    entities.Entity.collision_mode = config.collision_mode
+    path = config.level_path
+    if path is None:
+        _level_data = level1.load_level()
+    elif path.is_dir():
+        _stream_path = path  # each run streams its own copy
+    else:
+        _compiled_level = compiled.CompiledLevel(path)
+
+
+def run_one(index: int, seed: int) -> RunResult:
+    """Play run ``index`` in this process (after :func:`_init_worker`)."""
+
+    config = _config
+    assert config is not None, "call _init_worker first"
+    random.seed(seed)
+    if config.scripts:
+        script = config.scripts[index % len(config.scripts)]
+    else:
+        script = random_script(random.Random(seed), config.max_time)
+    stream = chunked.StreamingLevel(_stream_path) if _stream_path is not None else None
+    start = time.perf_counter()
+    simulation = sim.Simulation(
+        level_data=_level_data,
+        auto_restart=config.auto_restart,
+        stream=stream,
+        compiled_level=_compiled_level,
+        activation_radius=config.activation_radius,
+    )
+    outcome = simulation.run(script.ticks(config.dt), config.max_time, config.dt)
+    wall_time = time.perf_counter() - start
+    if stream is not None:
+        stream.close()
+    return RunResult(
+        index,
+        seed,
+        outcome if outcome != "playing" else "timeout",
+        outcome == "victory",
+        round(simulation.time, 6),
+        simulation.deaths,
+        simulation.falls,
+        simulation.checkpoint_reached,
+        wall_time,
+    )
+
+
+def _run_task(task: tuple) -> RunResult:
+    return run_one(*task)
+
+
+@dataclass
+class Summary:
+    """Statistics folded in one result at a time, whatever order results arrive in."""
+
+    runs: int = 0
+    outcomes: Dict[str, int] = field(default_factory=dict)
+    deaths: int = 0
+    falls: int = 0
+    checkpoints: int = 0
+    max_deaths: int = 0
+    finish_times: List[float] = field(default_factory=list)
+    sim_time: float = 0.0
+    run_wall_time: float = 0.0
+
+    def add(self, result: RunResult) -> None:
+        self.runs += 1
+        self.outcomes[result.outcome] = self.outcomes.get(result.outcome, 0) + 1
+        self.deaths += result.deaths
+        self.falls += result.falls
+        self.checkpoints += result.checkpoint_reached
+        self.max_deaths = max(self.max_deaths, result.deaths)
+        if result.completed:
+            self.finish_times.append(result.sim_time)
+        self.sim_time += result.sim_time
+        self.run_wall_time += result.wall_time
+
+    def report(self) -> dict:
+        runs = max(1, self.runs)
+        finish = sorted(self.finish_times)
+        report = {
+            "runs": self.runs,
+            "outcomes": dict(sorted(self.outcomes.items())),
+            "completion_rate": round(len(finish) / runs, 4),
+            "checkpoint_rate": round(self.checkpoints / runs, 4),
+            "deaths_per_run": round(self.deaths / runs, 3),
+            "max_deaths": self.max_deaths,
+            "falls_per_run": round(self.falls / runs, 3),
+            "time_to_finish": None,
+        }
+        if finish:
+            report["time_to_finish"] = {
+                "min": finish[0],
+                "median": round(statistics.median(finish), 6),
+                "mean": round(statistics.fmean(finish), 6),
+                "p90": finish[min(len(finish) - 1, math.ceil(0.9 * len(finish)) - 1)],
+                "max": finish[-1],
+            }
+        return report
+
+
+def run_batch(
+    config: BatchConfig,
+    runs: int,
+    seed: int = 0,
+    first_run: int = 0,
+    workers: Optional[int] = None,
+    chunksize: Optional[int] = None,
+    results: Optional[List[RunResult]] = None,
+) -> Summary:
+    """Play ``runs`` runs on ``workers`` processes (all cores by default) and summarize them.
+
+    Tasks are sent to the workers ``chunksize`` at a time (by default about four
+    chunks per worker) and every result is added to the summary as soon as it is
+    back. Pass a list as ``results`` to also collect the individual runs, sorted by
+    index. With one worker, runs are played in this process.
+    """
+
+    workers = workers or os.cpu_count() or 1
+    tasks = [(index, run_seed(seed, index)) for index in range(first_run, first_run + runs)]
+    summary = Summary()
+    if workers == 1:
+        _init_worker(config)
+        _collect(map(_run_task, tasks), summary, results)
+        return summary
+
+    chunksize = chunksize or max(1, math.ceil(runs / (workers * 4)))
+    with multiprocessing.Pool(workers, _init_worker, (config,)) as pool:
+        _collect(pool.imap_unordered(_run_task, tasks, chunksize), summary, results)
+    if results is not None:
+        results.sort(key=lambda result: result.index)
+    return summary
+
+
+def _collect(finished: Iterator[RunResult], summary: Summary, results: Optional[List[RunResult]]) -> None:
+    for result in finished:
+        summary.add(result)
+        if results is not None:
+            results.append(result)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.game.batch", description="Play a level many times without a window."
+    )
+    parser.add_argument("--runs", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0, help="batch seed; run i always gets the same seed from it")
+    parser.add_argument("--first-run", type=int, default=0, help="index of the first run, to replay part of a batch")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--script", action="append", help="input script or file, used by the runs in turn")
+    source.add_argument("--random", action="store_true", help="random input scripts (the default)")
+    parser.add_argument("--level", type=Path, help="chunked level directory or compiled .advl file instead of level 1")
+    parser.add_argument("--max-time", type=float, default=120.0, help="simulated seconds before a run gives up")
+    parser.add_argument("--dt", type=float, default=sim.DEFAULT_DT, help="fixed timestep in seconds")
+    parser.add_argument("--auto-restart", action="store_true", help="restart from the checkpoint after a defeat")
+    parser.add_argument("--activation-radius", type=int, help="only simulate enemies near the camera")
+    parser.add_argument("--collision", choices=entities.COLLISION_MODES, default=entities.Entity.collision_mode)
+    parser.add_argument("--workers", type=int, help="processes to use (default: one per CPU core)")
+    parser.add_argument("--chunksize", type=int, help="runs sent to a worker at a time")
+    parser.add_argument("--output", type=Path, help="also write every run to this JSON file")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    scripts = [sim.InputScript.load(script) for script in args.script or ()]
+    config = BatchConfig(
+        level_path=args.level,
+        scripts=scripts,
+        max_time=args.max_time,
+        dt=args.dt,
+        auto_restart=args.auto_restart,
+        activation_radius=args.activation_radius,
+        collision_mode=args.collision,
+    )
+    results: Optional[List[RunResult]] = [] if args.output else None
+    start = time.perf_counter()
+    summary = run_batch(config, args.runs, args.seed, args.first_run, args.workers, args.chunksize, results)
+    wall_time = time.perf_counter() - start
+
+    report = summary.report()
+    report["wall_time"] = round(wall_time, 3)
+    report["runs_per_second"] = round(summary.runs / wall_time, 2) if wall_time > 0 else None
+    report["speedup"] = round(summary.sim_time / wall_time, 1) if wall_time > 0 else None
+    print(json.dumps(report, indent=2))
+    if args.output:
+        runs = [{key: value for key, value in vars(result).items() if key != "wall_time"} for result in results]
+        args.output.write_text(json.dumps({"summary": report, "runs": runs}, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
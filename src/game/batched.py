@@ -0,0 +1,384 @@
+"""Many copies of a level stepped in lockstep with NumPy, for automated agents.
+
+:class:`BatchedGame` keeps ``n`` independent worlds built from the same level
+data in flat arrays and advances all of them with one :meth:`BatchedGame.step`
+call. A step does what :meth:`~src.game.sim.Simulation.step` does for one world:
+the attack, :meth:`Player.update` (coyote time, jump buffer, double jump),
+enemy patrols, collisions with the platforms, contact damage, energy orbs, the
+checkpoint, falls and the finish zone, with the same results. Collisions go
+through :meth:`~src.game.swarm.PlatformArrays.move_and_collide`, so the rare
+entity touching several platforms at once is resolved by the per-object code.
+
+Actions use the tick bits of :mod:`src.game.replay` (``LEFT | RIGHT | JUMP |
+ATTACK``). Worlds whose episode ends are put back at the start of the level
+within the same call, so the observations returned for them are the first of
+the next episode.
+
+NumPy is an optional dependency, as for :mod:`src.game.swarm`.
+"""
+
+from __future__ import annotations
+
+from typing import Optional, Tuple
+
+from . import main as game
+from .entities import GRAVITY, Entity
+from .levels import level1
+from .replay import ATTACK, JUMP, LEFT, RIGHT
+from .swarm import PlatformArrays
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+# Columns of the observation rows.
+OBSERVATION_FIELDS = (
+    "x",
+    "y",
+    "velocity_x",
+    "velocity_y",
+    "on_ground",
+    "health",
+    "double_jump_charges",
+    "attack_ready",
+    "checkpoint_reached",
+    "nearest_enemy_dx",  # 0 when no enemy is left
+    "nearest_enemy_dy",
+)
+
+PROGRESS_REWARD = 0.01  # per pixel moved to the right (negative when moving left)
+CHECKPOINT_REWARD = 5.0
+VICTORY_REWARD = 50.0
+DEFEAT_REWARD = -10.0
+
+# Melee attack area around the player, as in Player.attack.
+_ATTACK_INFLATE = (50, 24)
+_ATTACK_REACH = 80
+
+
+class BatchedGame:
+    """``n`` worlds of one level stepped together; per-world values are arrays of length ``n``.
+
+    ``max_steps`` ends an episode that has neither been won nor lost (0: never).
+    Entity rows hold the players first, then the enemies of world 0, world 1, ...
+    """
+
+    def __init__(
+        self, n: int, level_data: Optional[level1.LevelData] = None, dt: float = game.FIXED_DT, max_steps: int = 0
+    ) -> None:
+        if level_data is None:
+            level_data = level1.load_level()
+        player, platforms, enemies, finish_rect, world_size, checkpoint_rect, _, energy_orbs = game.load_level(
+            level_data
+        )
+        self.platforms = list(platforms)
+        self.geometry = PlatformArrays.from_platforms(self.platforms)
+        self.n = n
+        self.dt = dt
+        self.max_steps = max_steps
+        self.finish_rect = finish_rect
+        self.checkpoint_rect = checkpoint_rect
+        self.world_height = world_size[1]
+
+        # Constants of the player and of every enemy and orb, shared by all worlds.
+        self.player_template = player
+        self.enemy_count = len(enemies)
+        self.enemy_speed = np.array([enemy.speed for enemy in enemies], dtype=np.float64)
+        self.patrol_min = np.array([enemy.patrol_range[0] for enemy in enemies], dtype=np.int64)
+        self.patrol_max = np.array([enemy.patrol_range[1] for enemy in enemies], dtype=np.int64)
+        self.enemy_start = [(enemy.rect.x, enemy.rect.y, enemy.health) for enemy in enemies]
+        self.orb_rects = np.array([tuple(orb.rect) for orb in energy_orbs], dtype=np.int64).reshape(-1, 4)
+        self.orb_respawn_delay = np.array([orb.respawn_delay for orb in energy_orbs], dtype=np.float64)
+
+        rows = n * (1 + self.enemy_count)
+        self.left = np.zeros(rows, dtype=np.int64)
+        self.top = np.zeros(rows, dtype=np.int64)
+        self.width = np.empty(rows, dtype=np.int64)
+        self.height = np.empty(rows, dtype=np.int64)
+        self.width[:n], self.height[:n] = player.rect.size
+        if self.enemy_count:
+            self.width[n:] = np.tile([enemy.rect.width for enemy in enemies], n)
+            self.height[n:] = np.tile([enemy.rect.height for enemy in enemies], n)
+        self.velocity = np.zeros((rows, 2), dtype=np.float64)
+        self.remainder = np.zeros((rows, 2), dtype=np.float64)
+        self.on_ground = np.zeros(rows, dtype=bool)
+
+        self.clock = np.zeros(n, dtype=np.float64)
+        self.facing = np.zeros(n, dtype=np.int64)
+        self.health = np.zeros(n, dtype=np.int64)
+        self.double_jump_charges = np.zeros(n, dtype=np.int64)
+        self.air_jump_performed = np.zeros(n, dtype=bool)
+        self.coyote_timer = np.zeros(n, dtype=np.float64)
+        # Countdowns stored as deadlines on the player clock, like Player's _Countdown.
+        self.attack_deadline = np.zeros(n, dtype=np.float64)
+        self.invulnerability_deadline = np.zeros(n, dtype=np.float64)
+        self.jump_buffer_deadline = np.zeros(n, dtype=np.float64)
+        self.checkpoint_reached = np.zeros(n, dtype=bool)
+        self.steps = np.zeros(n, dtype=np.int64)
+
+        self.enemy_direction = np.zeros((n, self.enemy_count), dtype=np.int64)
+        self.enemy_health = np.zeros((n, self.enemy_count), dtype=np.int64)
+        self.orb_active = np.zeros((n, len(self.orb_rects)), dtype=bool)
+        self.orb_timer = np.zeros((n, len(self.orb_rects)), dtype=np.float64)
+
+        # Scratch entity used to replay rows with the per-object resolver.
+        self._scratch = Entity(0, 0, 1, 1)
+        self.reset()
+
+    def _enemies(self, array: "np.ndarray") -> "np.ndarray":
+        """View of the enemy rows of an entity array, shaped ``(n, enemies, ...)``."""
+
+        return array[self.n :].reshape((self.n, self.enemy_count) + array.shape[1:])
+
+    def reset(self, worlds: Optional["np.ndarray"] = None) -> "np.ndarray":
+        """Put ``worlds`` (a boolean mask or indices; all by default) back at the level start.
+
+        Returns the observations of every world.
+        """
+
+        n = self.n
+        if worlds is None:
+            worlds = np.arange(n)
+        worlds = np.flatnonzero(worlds) if np.asarray(worlds).dtype == bool else np.asarray(worlds)
+        player = self.player_template
+        self.left[worlds], self.top[worlds] = player.rect.topleft
+        self.velocity[worlds] = 0.0
+        self.remainder[worlds] = 0.0
+        self.on_ground[worlds] = False
+        self.clock[worlds] = 0.0
+        self.facing[worlds] = player.facing
+        self.health[worlds] = player.max_health
+        self.double_jump_charges[worlds] = 0
+        self.air_jump_performed[worlds] = False
+        self.coyote_timer[worlds] = 0.0
+        self.attack_deadline[worlds] = 0.0
+        self.invulnerability_deadline[worlds] = 0.0
+        self.jump_buffer_deadline[worlds] = 0.0
+        self.checkpoint_reached[worlds] = False
+        self.steps[worlds] = 0
+
+        if self.enemy_count:
+            rows = (n + worlds[:, None] * self.enemy_count + np.arange(self.enemy_count)).ravel()
+            start = np.array(self.enemy_start, dtype=np.int64)
+            self.left[rows] = np.tile(start[:, 0], len(worlds))
+            self.top[rows] = np.tile(start[:, 1], len(worlds))
+            self.velocity[rows] = 0.0
+            self.remainder[rows] = 0.0
+            self.on_ground[rows] = False
+            self.enemy_direction[worlds] = 1
+            self.enemy_health[worlds] = start[:, 2]
+        self.orb_active[worlds] = True
+        self.orb_timer[worlds] = 0.0
+        return self.observations()
+
+    def step(self, actions: "np.ndarray") -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+        """Advance every world by one tick; ``actions`` holds one tick bitmask per world.
+
+        Returns ``(observations, rewards, dones)``; ``observations`` has one row of
+        :data:`OBSERVATION_FIELDS` per world.
+        """
+
+        actions = np.asarray(actions)
+        dt = self.dt
+        player = self.player_template
+        n = self.n
+        x_before = self.left[:n].copy()
+
+        if self.enemy_count:
+            self._attack(actions & ATTACK != 0)
+        self._update_players(actions & LEFT != 0, actions & RIGHT != 0, actions & JUMP != 0)
+        if self.enemy_count:
+            enemy_velocity = self._enemies(self.velocity)
+            enemy_velocity[:, :, 0] = self.enemy_speed * self.enemy_direction
+            enemy_velocity[:, :, 1] += GRAVITY * dt
+        self._move_and_collide()
+        self._land_players()
+        self.clock += dt
+        if self.enemy_count:
+            self._clamp_patrols()
+            self._contact_damage()
+
+        left, top = self.left[:n], self.top[:n]
+        width, height = player.rect.size
+        reached = ~self.checkpoint_reached & self._overlaps(left, top, width, height, self.checkpoint_rect)
+        reached &= self.checkpoint_rect.width > 0 and self.checkpoint_rect.height > 0
+        self.checkpoint_reached |= reached
+        self._energy_orbs(left, top, width, height)
+        self.health[top > self.world_height] = 0
+
+        defeat = self.health <= 0
+        victory = ~defeat & self._overlaps(left, top, width, height, self.finish_rect)
+        self.steps += 1
+        rewards = (left - x_before) * PROGRESS_REWARD
+        rewards += reached * CHECKPOINT_REWARD + victory * VICTORY_REWARD + defeat * DEFEAT_REWARD
+        dones = defeat | victory
+        if self.max_steps:
+            dones |= self.steps >= self.max_steps
+        if dones.any():
+            self.reset(dones)
+        return self.observations(), rewards, dones
+
+    def _attack(self, attacking: "np.ndarray") -> None:
+        """Player.attack for the worlds attacking this tick whose cooldown is over."""
+
+        worlds = np.flatnonzero(attacking & (self.attack_deadline - self.clock <= 0))
+        if not len(worlds):
+            return
+        self.attack_deadline[worlds] = self.clock[worlds] + self.player_template.attack_cooldown
+        grow_x, grow_y = _ATTACK_INFLATE
+        left = self.left[worlds] - grow_x // 2
+        top = self.top[worlds] - grow_y // 2
+        width = self.player_template.rect.width + grow_x + _ATTACK_REACH
+        height = self.player_template.rect.height + grow_y
+        left = np.where(self.facing[worlds] >= 0, left, left - _ATTACK_REACH)
+
+        enemy_left = self._enemies(self.left)[worlds]
+        enemy_top = self._enemies(self.top)[worlds]
+        hit = (
+            (self.enemy_health[worlds] > 0)
+            & (enemy_left < (left + width)[:, None])
+            & (enemy_left + self._enemies(self.width)[worlds] > left[:, None])
+            & (enemy_top < (top + height)[:, None])
+            & (enemy_top + self._enemies(self.height)[worlds] > top[:, None])
+        )
+        self.enemy_health[worlds] -= hit
+
+    def _update_players(self, left: "np.ndarray", right: "np.ndarray", jump: "np.ndarray") -> None:
+        """The part of Player.update before moving."""
+
+        player, dt, n = self.player_template, self.dt, self.n
+        velocity, on_ground = self.velocity[:n], self.on_ground[:n]
+        velocity[:, 0] = np.where(right, player.speed, np.where(left, -player.speed, 0))
+        self.facing[velocity[:, 0] > 0] = 1
+        self.facing[velocity[:, 0] < 0] = -1
+
+        self.coyote_timer = np.where(on_ground, player.coyote_time, np.maximum(0.0, self.coyote_timer - dt))
+        self.jump_buffer_deadline[jump] = self.clock[jump] + player.jump_buffer_window
+
+        can_ground_jump = on_ground | (self.coyote_timer > 0.0)
+        ground_jump = can_ground_jump & (self.jump_buffer_deadline - self.clock > 0.0)
+        air_jump = ~ground_jump & jump & (self.double_jump_charges > 0) & ~self.air_jump_performed
+        velocity[ground_jump | air_jump, 1] = player.jump_strength
+        on_ground[ground_jump] = False
+        self.air_jump_performed[ground_jump] = False
+        self.jump_buffer_deadline[ground_jump] = self.clock[ground_jump]
+        self.coyote_timer[ground_jump] = 0.0
+        self.double_jump_charges[air_jump] = np.maximum(0, self.double_jump_charges[air_jump] - 1)
+        self.air_jump_performed[air_jump] = True
+        velocity[:, 1] += GRAVITY * dt
+
+    def _move_and_collide(self) -> None:
+        dt = self.dt
+        start = (self.left.copy(), self.top.copy(), self.velocity.copy(), self.remainder.copy())
+        replay = self.geometry.move_and_collide(
+            self.left, self.top, self.width, self.height, self.velocity, self.remainder, self.on_ground, dt
+        )
+        if Entity.collision_mode == "swept":
+            moves = np.abs(start[2] * dt + start[3])
+            replay |= (moves[:, 0] > self.width) | (moves[:, 1] > self.height)
+        for row in np.flatnonzero(replay):
+            self._replay(int(row), start)
+
+    def _replay(self, row: int, start: tuple) -> None:
+        left, top, velocity, remainder = start
+        scratch = self._scratch
+        scratch.rect.update(int(left[row]), int(top[row]), int(self.width[row]), int(self.height[row]))
+        scratch.velocity.update(*velocity[row])
+        scratch.remainder.update(*remainder[row])
+        scratch.move_and_collide(self.platforms, self.dt)
+        self.left[row], self.top[row] = scratch.rect.topleft
+        self.velocity[row] = tuple(scratch.velocity)
+        self.remainder[row] = tuple(scratch.remainder)
+        self.on_ground[row] = scratch.on_ground
+
+    def _land_players(self) -> None:
+        """The part of Player.update after moving."""
+
+        player = self.player_template
+        on_ground = self.on_ground[: self.n]
+        self.air_jump_performed[on_ground] = False
+        self.coyote_timer = np.where(on_ground, player.coyote_time, np.maximum(0.0, self.coyote_timer - self.dt))
+
+    def _clamp_patrols(self) -> None:
+        """The end of Enemy.update: turn around at the ends of the patrol range."""
+
+        left, width = self._enemies(self.left), self._enemies(self.width)
+        remainder, velocity = self._enemies(self.remainder), self._enemies(self.velocity)
+        at_min = left <= self.patrol_min
+        at_max = ~at_min & (left + width >= self.patrol_max)
+        left[:] = np.where(at_min, self.patrol_min, np.where(at_max, self.patrol_max - width, left))
+        self.enemy_direction[at_min] = 1
+        self.enemy_direction[at_max] = -1
+        remainder[at_min | at_max, 0] = 0.0
+        velocity[:, :, 0] = self.enemy_speed * self.enemy_direction
+
+    def _contact_damage(self) -> None:
+        """Player.take_damage(1) for the players touching a live enemy."""
+
+        n = self.n
+        player = self.player_template
+        left, top = self.left[:n, None], self.top[:n, None]
+        enemy_left, enemy_top = self._enemies(self.left), self._enemies(self.top)
+        touching = (
+            (self.enemy_health > 0)
+            & (enemy_left < left + player.rect.width)
+            & (enemy_left + self._enemies(self.width) > left)
+            & (enemy_top < top + player.rect.height)
+            & (enemy_top + self._enemies(self.height) > top)
+        ).any(axis=1)
+        hurt = touching & (self.invulnerability_deadline - self.clock <= 0)
+        self.health[hurt] = np.maximum(0, self.health[hurt] - 1)
+        alive = hurt & (self.health > 0)
+        self.invulnerability_deadline[alive] = self.clock[alive] + player.invulnerability_time
+
+    def _energy_orbs(self, left: "np.ndarray", top: "np.ndarray", width: int, height: int) -> None:
+        """Polled EnergyOrb.update, then pickups."""
+
+        if not len(self.orb_rects):
+            return
+        waiting = ~self.orb_active
+        self.orb_timer[waiting] += self.dt
+        respawned = waiting & (self.orb_timer >= self.orb_respawn_delay)
+        self.orb_active[respawned] = True
+        self.orb_timer[respawned] = 0.0
+
+        orb_left, orb_top = self.orb_rects[:, 0], self.orb_rects[:, 1]
+        touching = (
+            self.orb_active
+            & (left[:, None] < orb_left + self.orb_rects[:, 2])
+            & (left[:, None] + width > orb_left)
+            & (top[:, None] < orb_top + self.orb_rects[:, 3])
+            & (top[:, None] + height > orb_top)
+        )
+        picked = touching.any(axis=1)
+        self.double_jump_charges[picked] = np.minimum(1, self.double_jump_charges[picked] + 1)
+        self.orb_active[touching] = False
+        self.orb_timer[touching] = 0.0
+
+    @staticmethod
+    def _overlaps(left: "np.ndarray", top: "np.ndarray", width: int, height: int, rect) -> "np.ndarray":
+        return (left < rect.right) & (left + width > rect.left) & (top < rect.bottom) & (top + height > rect.top)
+
+    def observations(self) -> "np.ndarray":
+        n = self.n
+        observations = np.empty((n, len(OBSERVATION_FIELDS)), dtype=np.float32)
+        observations[:, 0] = self.left[:n]
+        observations[:, 1] = self.top[:n]
+        observations[:, 2:4] = self.velocity[:n]
+        observations[:, 4] = self.on_ground[:n]
+        observations[:, 5] = self.health
+        observations[:, 6] = self.double_jump_charges
+        observations[:, 7] = self.attack_deadline - self.clock <= 0
+        observations[:, 8] = self.checkpoint_reached
+        observations[:, 9:11] = 0.0
+        if self.enemy_count:
+            dx = self._enemies(self.left) - self.left[:n, None]
+            dy = self._enemies(self.top) - self.top[:n, None]
+            distance = np.where(self.enemy_health > 0, np.abs(dx) + np.abs(dy), np.iinfo(np.int64).max)
+            nearest = distance.argmin(axis=1)
+            some_alive = (self.enemy_health > 0).any(axis=1)
+            worlds = np.arange(n)
+            observations[:, 9] = np.where(some_alive, dx[worlds, nearest], 0)
+            observations[:, 10] = np.where(some_alive, dy[worlds, nearest], 0)
+        return observations
@@ -2,22 +2,24 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from pathlib import Path
-from typing import Iterable, List, Optional, Sequence, Tuple
+import sys
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional, Sequence, Tuple
 
 import pygame
 
-GRAVITY = 1200  # pixels per second squared
+from . import assets
 
+if TYPE_CHECKING:
+    from .timers import Scheduler, Timer
 
-def _assets_dir() -> Path:
-    """Return the directory containing runtime assets (sprites, etc.)."""
+GRAVITY = 1200  # pixels per second squared
 
-    return Path(__file__).resolve().parents[2] / "assets"
+# Slotted dataclasses (no per-instance __dict__) where the interpreter supports them.
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class Platform:
     """Static ground element the player and enemies can stand on."""
 
@@ -28,7 +30,7 @@ class Platform:
         return cls(pygame.Rect(x, y, width, height))
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class EnergyOrb:
     """Collectible granting a temporary double-jump charge."""
 
@@ -36,6 +38,8 @@ class EnergyOrb:
     respawn_delay: float = 5.0
     active: bool = True
     timer: float = 0.0
+    # Pending respawn when collected with a scheduler.
+    respawn_timer: Optional["Timer"] = field(default=None, repr=False, compare=False)
 
     @classmethod
     def from_center(cls, x: int, y: int, diameter: int = 28) -> "EnergyOrb":
@@ -43,9 +47,18 @@ class EnergyOrb:
         rect.center = (x, y)
         return cls(rect)
 
-    def collect(self) -> None:
+    def collect(self, scheduler: Optional["Scheduler"] = None) -> None:
+        """Deactivate the orb; with a ``scheduler`` its respawn is scheduled instead of polled by ``update``."""
+
         self.active = False
         self.timer = 0.0
+        if scheduler is not None:
+            self.respawn_timer = scheduler.schedule(self.respawn_delay, self.respawn)
+
+    def respawn(self) -> None:
+        self.active = True
+        self.timer = 0.0
+        self.respawn_timer = None
 
     def update(self, dt: float) -> None:
         if self.active:
@@ -56,34 +69,87 @@ class EnergyOrb:
             self.timer = 0.0
 
 
+COLLISION_MODES = ("discrete", "swept")
+
+
 class Entity:
     """Base entity with position and size."""
 
+    # "discrete" moves then resolves overlaps; "swept" also stops the entity at the
+    # first platform it would cross, so large steps cannot tunnel through geometry.
+    collision_mode = "discrete"
+
+    __slots__ = ("rect", "velocity", "remainder", "previous_position", "on_ground")
+
     def __init__(self, x: int, y: int, width: int, height: int) -> None:
         self.rect = pygame.Rect(x, y, width, height)
         self.velocity = pygame.Vector2(0, 0)
+        # Sub-pixel movement not yet applied to the integer rect.
+        self.remainder = pygame.Vector2(0, 0)
+        # Position at the start of the last simulation step, used to interpolate rendering.
+        self.previous_position = pygame.Vector2(x, y)
         self.on_ground = False
 
+    def store_previous_position(self) -> None:
+        """Remember the current position before running a simulation step."""
+
+        self.previous_position.update(self.rect.x, self.rect.y)
+
+    def interpolated_rect(self, alpha: float) -> pygame.Rect:
+        """Return the rect blended between the previous and current step."""
+
+        if alpha >= 1.0:
+            return self.rect.copy()
+        previous = self.previous_position
+        x = previous.x + (self.rect.x - previous.x) * alpha
+        y = previous.y + (self.rect.y - previous.y) * alpha
+        return pygame.Rect(round(x), round(y), self.rect.width, self.rect.height)
+
     def apply_gravity(self, dt: float) -> None:
         self.velocity.y += GRAVITY * dt
 
     def move_and_collide(self, platforms: Sequence[Platform], dt: float) -> None:
-        """Move entity and resolve collisions with the provided platforms."""
+        """Move entity and resolve collisions with the provided platforms.
+
+        When ``platforms`` offers a broadphase ``query`` (see
+        :class:`~src.game.spatial.PlatformIndex`), only nearby platforms are tested.
+        In ``"swept"`` mode, a move longer than the entity itself (the only case where
+        it could skip over a platform) is first clipped at the time of impact.
+        """
+
+        swept = self.collision_mode == "swept"
 
         # Horizontal movement
-        self.rect.x += int(self.velocity.x * dt)
-        for platform in platforms:
+        start = self.rect.copy()
+        dx = self._take_whole_pixels(0, self.velocity.x * dt)
+        blocked = False
+        if swept and abs(dx) > self.rect.width:
+            dx, blocked = _sweep(platforms, self.rect, 0, dx)
+        self.rect.x += dx
+        if blocked:
+            self.velocity.x = 0
+            self.remainder.x = 0
+        for platform in _candidates(platforms, start.union(self.rect), self.rect):
             if self.rect.colliderect(platform.rect):
                 if self.velocity.x > 0:
                     self.rect.right = platform.rect.left
                 elif self.velocity.x < 0:
                     self.rect.left = platform.rect.right
                 self.velocity.x = 0
+                self.remainder.x = 0
 
         # Vertical movement
-        self.rect.y += int(self.velocity.y * dt)
-        self.on_ground = False
-        for platform in platforms:
+        start = self.rect.copy()
+        dy = self._take_whole_pixels(1, self.velocity.y * dt)
+        blocked = False
+        if swept and abs(dy) > self.rect.height:
+            dy, blocked = _sweep(platforms, self.rect, 1, dy)
+        self.rect.y += dy
+        self.on_ground = blocked and self.velocity.y > 0
+        if blocked:
+            self.velocity.y = 0
+            self.remainder.y = 0
+        for platform in _candidates(platforms, start.union(self.rect), self.rect):
             if self.rect.colliderect(platform.rect):
                 if self.velocity.y > 0:
                     self.rect.bottom = platform.rect.top
@@ -91,16 +157,124 @@ class Entity:
                 elif self.velocity.y < 0:
                     self.rect.top = platform.rect.bottom
                 self.velocity.y = 0
+                self.remainder.y = 0
+
+    def _take_whole_pixels(self, axis: int, distance: float) -> int:
+        """Add ``distance`` to the sub-pixel remainder and return the whole pixels."""
+
+        total = self.remainder[axis] + distance
+        pixels = int(total)
+        self.remainder[axis] = total - pixels
+        return pixels
+
+
+def _sweep(platforms: Sequence[Platform], rect: pygame.Rect, axis: int, distance: int) -> Tuple[int, bool]:
+    """Clip a move of ``distance`` pixels along ``axis`` at the first platform hit.
+
+    Returns the allowed distance and whether a platform was hit. Platforms that
+    already overlap ``rect`` are left to the regular overlap resolution.
+    """
+
+    moved = rect.move((distance, 0) if axis == 0 else (0, distance))
+    allowed = distance
+    hit = False
+    for platform in _candidates(platforms, rect.union(moved), rect):
+        other = platform.rect
+        if rect.colliderect(other):
+            continue
+        if axis == 0:
+            if not (other.top < rect.bottom and other.bottom > rect.top):
+                continue
+            gap = other.left - rect.right if distance > 0 else rect.left - other.right
+        else:
+            if not (other.left < rect.right and other.right > rect.left):
+                continue
+            gap = other.top - rect.bottom if distance > 0 else rect.top - other.bottom
+        if 0 <= gap < abs(allowed):
+            allowed = gap if distance > 0 else -gap
+            hit = True
+    return allowed, hit
+
+
+def _candidates(platforms: Sequence[Platform], area: pygame.Rect, rect: pygame.Rect) -> Iterator[Platform]:
+    """Yield the platforms to test against ``rect``, in list order.
+
+    Without a broadphase every platform is yielded. With one, only the platforms
+    near ``area`` are; should a resolution push ``rect`` outside of ``area`` (an
+    entity spawned inside a platform, for instance), the query is widened and the
+    remaining platforms are picked up so the outcome matches a full scan.
+    """
+
+    query = getattr(platforms, "query", None)
+    if query is None:
+        yield from platforms
+        return
+
+    area = area.copy()
+    indices = query(area)
+    position = 0
+    while position < len(indices):
+        current = indices[position]
+        yield platforms[current]
+        position += 1
+        if not area.contains(rect):
+            area.union_ip(rect)
+            indices = [index for index in query(area) if index > current]
+            position = 0
+
+
+class _Countdown:
+    """Player timer stored as a deadline on the player's clock.
+
+    Reading it gives the time left (never negative) and assigning it starts a new
+    countdown, so an idle timer costs nothing per step.
+    """
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.deadline = f"_{name}_deadline"
+
+    def __get__(self, player: Optional["Player"], owner: Optional[type] = None):
+        if player is None:
+            return self
+        return max(0.0, getattr(player, self.deadline) - player.clock)
+
+    def __set__(self, player: "Player", seconds: float) -> None:
+        setattr(player, self.deadline, player.clock + seconds)
 
 
 class Player(Entity):
     """Player controlled character."""
 
-    _sprite_surface: Optional[pygame.Surface] = None
-    _sprite_surface_flipped: Optional[pygame.Surface] = None
+    attack_timer = _Countdown()
+    attack_indicator_timer = _Countdown()
+    invulnerability_timer = _Countdown()
+    jump_buffer_timer = _Countdown()
+
+    __slots__ = (
+        "clock",
+        "speed",
+        "jump_strength",
+        "attack_cooldown",
+        "attack_indicator_duration",
+        "last_attack_rect",
+        "max_health",
+        "health",
+        "invulnerability_time",
+        "facing",
+        "double_jump_charges",
+        "air_jump_performed",
+        "jump_buffer_window",
+        "coyote_time",
+        "coyote_timer",
+        "_attack_timer_deadline",
+        "_attack_indicator_timer_deadline",
+        "_invulnerability_timer_deadline",
+        "_jump_buffer_timer_deadline",
+    )
 
     def __init__(self, x: int, y: int) -> None:
         super().__init__(x, y, 40, 60)
+        self.clock = 0.0  # simulation time seen by this player, advanced by update
         self.speed = 220  # pixels per second
         self.jump_strength = -500
         self.attack_cooldown = 0.4
@@ -119,7 +293,6 @@ class Player(Entity):
         self.jump_buffer_timer = 0.0
         self.coyote_time = 0.12
         self.coyote_timer = 0.0
-        self._ensure_sprite()
 
     def update(
         self,
@@ -170,15 +343,8 @@ class Player(Entity):
         else:
             self.coyote_timer = max(0.0, self.coyote_timer - dt)
 
-        if self.jump_buffer_timer > 0.0:
-            self.jump_buffer_timer = max(0.0, self.jump_buffer_timer - dt)
-
-        if self.attack_timer > 0:
-            self.attack_timer = max(0.0, self.attack_timer - dt)
-        if self.attack_indicator_timer > 0:
-            self.attack_indicator_timer = max(0.0, self.attack_indicator_timer - dt)
-        if self.invulnerability_timer > 0:
-            self.invulnerability_timer = max(0.0, self.invulnerability_timer - dt)
+        # Moves every countdown timer (jump buffer, attack, invulnerability) forward at once.
+        self.clock += dt
 
     def attack(self, enemies: Iterable["Enemy"]) -> List["Enemy"]:
         """Perform a melee attack and return the enemies that were defeated."""
@@ -196,8 +362,10 @@ class Player(Entity):
             attack_rect.width += reach
         self.last_attack_rect = attack_rect.copy()
         self.attack_indicator_timer = self.attack_indicator_duration
+        # Enemy lists backed by a spatial index (see ActorIndex) only yield nearby enemies.
+        query = getattr(enemies, "query", None)
         defeated: List[Enemy] = []
-        for enemy in enemies:
+        for enemy in query(attack_rect) if query else enemies:
             if enemy.rect.colliderect(attack_rect):
                 if enemy.take_damage(1):
                     defeated.append(enemy)
@@ -232,7 +400,9 @@ class Player(Entity):
 
     def respawn(self, position: Tuple[int, int]) -> None:
         self.rect.topleft = position
+        self.previous_position.update(position)
         self.velocity.update(0, 0)
+        self.remainder.update(0, 0)
         self.health = self.max_health
         self.invulnerability_timer = 0.0
         self.attack_timer = 0.0
@@ -243,51 +413,16 @@ class Player(Entity):
         self.jump_buffer_timer = 0.0
         self.coyote_timer = 0.0
 
-    def _ensure_sprite(self) -> Optional[pygame.Surface]:
-        """Load and cache the hero sprite if the asset is available."""
-
-        cls = type(self)
-        if cls._sprite_surface is not None:
-            return cls._sprite_surface
-
-        sprite_path = _assets_dir() / "hero.png"
-        if not sprite_path.exists():
-            return None
-
-        try:
-            image = pygame.image.load(str(sprite_path))
-        except pygame.error:
-            return None
-
-        if pygame.display.get_surface():
-            try:
-                image = image.convert_alpha()
-            except pygame.error:
-                pass
-
-        cls._sprite_surface = pygame.transform.scale(image, self.rect.size)
-        cls._sprite_surface_flipped = None
-        return cls._sprite_surface
-
     def get_oriented_sprite(self) -> Optional[pygame.Surface]:
         """Return the sprite oriented based on facing direction, if available."""
 
-        base = self._sprite_surface or self._ensure_sprite()
-        if base is None:
-            return None
-        if self.facing >= 0:
-            return base
-        cls = type(self)
-        if cls._sprite_surface_flipped is None:
-            cls._sprite_surface_flipped = pygame.transform.flip(base, True, False)
-        return cls._sprite_surface_flipped
+        return assets.manager.sprite(assets.HERO, self.rect.size, self.facing < 0)
 
 
 class Enemy(Entity):
     """A basic enemy with a patrol pattern and multiple hit points."""
 
-    _sprite_surface: Optional[pygame.Surface] = None
-    _sprite_surface_flipped: Optional[pygame.Surface] = None
+    __slots__ = ("patrol_range", "speed", "direction", "facing", "health")
 
     def __init__(self, x: int, y: int, patrol_range: tuple[int, int], speed: int = 120, health: int = 3) -> None:
         super().__init__(x, y, 40, 50)
@@ -309,54 +444,49 @@ class Enemy(Entity):
         if self.rect.left <= self.patrol_range[0]:
             self.rect.left = self.patrol_range[0]
             self.direction = 1
+            self.remainder.x = 0
         elif self.rect.right >= self.patrol_range[1]:
             self.rect.right = self.patrol_range[1]
             self.direction = -1
+            self.remainder.x = 0
 
         self.facing = self.direction
         self.velocity.x = self.speed * self.direction
 
+    def fast_forward(self, elapsed: float) -> None:
+        """Advance the patrol by ``elapsed`` seconds in closed form.
+
+        The enemy walks back and forth between the ends of ``patrol_range`` at
+        ``speed``, so its position is a triangle wave of time. This assumes the
+        enemy stays on the ground and nothing blocks its route, which is what
+        ``update`` would do on such a route (up to sub-pixel rounding).
+        """
+
+        low, high = self.patrol_range[0], self.patrol_range[1] - self.rect.width
+        span = high - low
+        if span <= 0 or self.speed <= 0 or elapsed <= 0:
+            return
+        offset = min(span, max(0, self.rect.left - low))
+        # Distance travelled along one back-and-forth cycle of length 2 * span.
+        travelled = offset if self.direction > 0 else 2 * span - offset
+        travelled = (travelled + self.speed * elapsed) % (2 * span)
+        if travelled < span:
+            self.rect.left = low + round(travelled)
+            self.direction = 1
+        else:
+            self.rect.left = low + round(2 * span - travelled)
+            self.direction = -1
+        self.remainder.x = 0
+        self.facing = self.direction
+        self.velocity.x = self.speed * self.direction
+
     def take_damage(self, amount: int) -> bool:
         """Deal damage to the enemy. Returns True when the enemy is defeated."""
 
         self.health -= amount
         return self.health <= 0
 
-    def _ensure_sprite(self) -> Optional[pygame.Surface]:
-        """Load the enemy sprite from disk if available."""
-
-        cls = type(self)
-        if cls._sprite_surface is not None:
-            return cls._sprite_surface
-
-        sprite_path = _assets_dir() / "monstre.png"
-        if not sprite_path.exists():
-            return None
-
-        try:
-            image = pygame.image.load(str(sprite_path))
-        except pygame.error:
-            return None
-
-        if pygame.display.get_surface():
-            try:
-                image = image.convert_alpha()
-            except pygame.error:
-                pass
-
-        cls._sprite_surface = pygame.transform.scale(image, self.rect.size)
-        cls._sprite_surface_flipped = None
-        return cls._sprite_surface
-
     def get_oriented_sprite(self) -> Optional[pygame.Surface]:
         """Return the sprite oriented based on patrol direction, if present."""
 
-        base = self._sprite_surface or self._ensure_sprite()
-        if base is None:
-            return None
-        if self.facing >= 0:
-            return base
-        cls = type(self)
-        if cls._sprite_surface_flipped is None:
-            cls._sprite_surface_flipped = pygame.transform.flip(base, True, False)
-        return cls._sprite_surface_flipped
+        return assets.manager.sprite(assets.MONSTER, self.rect.size, self.facing < 0)
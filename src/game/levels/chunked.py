@@ -0,0 +1,285 @@
+"""Chunked level format and streaming loader for very large worlds.
+
+A chunked level is a directory holding ``manifest.json`` (world size, player
+start, checkpoint, finish zone and per-chunk object counts) and one JSON file
+per vertical slice of the world, ``chunk_width`` pixels wide. A platform is
+stored in every chunk it overlaps; enemies and energy orbs live in the chunk
+containing their spawn point. Every object keeps its index in the source level
+so the resident platforms can be kept in their original order.
+
+:class:`StreamingLevel` keeps only the chunks around a focus rect (the player)
+instantiated, parses the next chunks on a background thread and evicts the most
+distant ones past a resident-chunk budget, so startup time and memory do not
+depend on the world size. Write a level with::
+
+    python -m src.game.levels.chunked OUTPUT_DIR
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import pygame
+
+from .. import entities, spatial
+from . import level1
+
+FORMAT_VERSION = 1
+CHUNK_WIDTH = 4096  # pixels per chunk
+LOAD_MARGIN = 1440  # pixels kept loaded on each side of the focus rect (1.5 screens)
+PREFETCH_CHUNKS = 1  # chunks parsed ahead of need on each side
+MAX_RESIDENT_CHUNKS = 6  # instantiated chunks kept before evicting the farthest
+
+MANIFEST_NAME = "manifest.json"
+
+
+def _chunk_name(index: int) -> str:
+    return f"chunk_{index:05d}.json"
+
+
+def write_chunked(data: level1.LevelData, directory: Path, chunk_width: int = CHUNK_WIDTH) -> Path:
+    """Split ``load_level()``-style data into a chunked level directory."""
+
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    world_size = tuple(data.get("world_size", (960, 640)))
+    chunk_count = max(1, -(-world_size[0] // chunk_width))
+    chunks: List[Dict[str, list]] = [
+        {"platforms": [], "enemies": [], "energy_orbs": []} for _ in range(chunk_count)
+    ]
+
+    def home(x: int) -> int:
+        return min(chunk_count - 1, max(0, x // chunk_width))
+
+    for index, (x, y, width, height) in enumerate(data["platforms"]):
+        for chunk in range(home(x), home(x + width - 1) + 1):
+            chunks[chunk]["platforms"].append([index, x, y, width, height])
+    for index, enemy in enumerate(data["enemies"]):
+        chunks[home(enemy["x"])]["enemies"].append({**enemy, "id": index})
+    for index, orb in enumerate(data.get("energy_orbs", [])):
+        chunks[home(orb["x"])]["energy_orbs"].append({**orb, "id": index})
+
+    for index, chunk in enumerate(chunks):
+        (directory / _chunk_name(index)).write_text(json.dumps(chunk, separators=(",", ":")), encoding="utf-8")
+
+    checkpoint = data.get("checkpoint")
+    manifest = {
+        "format": FORMAT_VERSION,
+        "chunk_width": chunk_width,
+        "world_size": list(world_size),
+        "player_start": list(data["player_start"]),
+        "finish_zone": list(data["finish_zone"]),
+        "checkpoint": checkpoint and {"zone": list(checkpoint["zone"]), "respawn": list(checkpoint["respawn"])},
+        "chunks": [
+            {
+                "file": _chunk_name(index),
+                "platforms": len(chunk["platforms"]),
+                "enemies": len(chunk["enemies"]),
+                "energy_orbs": len(chunk["energy_orbs"]),
+            }
+            for index, chunk in enumerate(chunks)
+        ],
+    }
+    path = directory / MANIFEST_NAME
+    path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return path
+
+
+def _read_chunk(path: Path) -> dict:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+class _ResidentChunk:
+    """Objects instantiated from one chunk file."""
+
+    def __init__(self) -> None:
+        self.platform_ids: List[int] = []
+        self.enemies: List[Tuple[int, entities.Enemy]] = []
+        self.energy_orbs: List[entities.EnergyOrb] = []
+
+
+class StreamingLevel:
+    """Level whose objects are instantiated chunk by chunk around a focus rect.
+
+    ``platforms`` (a :class:`~src.game.spatial.PlatformIndex`) is replaced when
+    the resident chunks change, so callers should read it again after each
+    :meth:`update`. ``enemies`` and ``energy_orbs`` are updated in place; enemies
+    removed from ``enemies`` (defeated) do not come back when their chunk reloads.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        load_margin: int = LOAD_MARGIN,
+        prefetch_chunks: int = PREFETCH_CHUNKS,
+        max_resident_chunks: int = MAX_RESIDENT_CHUNKS,
+        background: bool = True,
+    ) -> None:
+        self.directory = Path(directory)
+        manifest = json.loads((self.directory / MANIFEST_NAME).read_text(encoding="utf-8"))
+        if manifest.get("format") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported chunked level format: {manifest.get('format')!r}")
+        self.chunk_width: int = manifest["chunk_width"]
+        self.chunk_files: List[str] = [chunk["file"] for chunk in manifest["chunks"]]
+        self.world_size: Tuple[int, int] = tuple(manifest["world_size"])
+        self.player_start: Tuple[int, int] = tuple(manifest["player_start"])
+        self.finish_rect = pygame.Rect(*manifest["finish_zone"])
+        checkpoint = manifest.get("checkpoint")
+        self.checkpoint_rect = pygame.Rect(*checkpoint["zone"]) if checkpoint else pygame.Rect(0, 0, 0, 0)
+        self.checkpoint_respawn: Tuple[int, int] = tuple(checkpoint["respawn"]) if checkpoint else self.player_start
+
+        self.load_margin = load_margin
+        self.prefetch_chunks = prefetch_chunks
+        self.max_resident_chunks = max_resident_chunks
+        self._executor: Optional[ThreadPoolExecutor] = (
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix="level-prefetch") if background else None
+        )
+
+        self.platforms = spatial.PlatformIndex([])
+        self.enemies: spatial.ActorIndex[entities.Enemy] = spatial.ActorIndex()
+        self.energy_orbs: spatial.ActorIndex[entities.EnergyOrb] = spatial.ActorIndex()
+        self._resident: Dict[int, _ResidentChunk] = {}
+        self._pending: Dict[int, Future] = {}
+        self._platforms: Dict[int, entities.Platform] = {}
+        self._platform_refs: Dict[int, int] = {}
+        self._defeated: Set[int] = set()
+        self.loads = 0
+        self.evictions = 0
+
+    def close(self) -> None:
+        """Stop the prefetch thread."""
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def reset(self) -> None:
+        """Forget every resident chunk and defeated enemy, as when restarting the level."""
+
+        for chunk in list(self._resident):
+            self._evict(chunk)
+        self._defeated.clear()
+        self._rebuild_platforms()
+
+    def _chunk_range(self, left: int, right: int) -> range:
+        last = len(self.chunk_files) - 1
+        first = min(last, max(0, left // self.chunk_width))
+        return range(first, min(last, max(0, (right - 1) // self.chunk_width)) + 1)
+
+    def update(self, focus: pygame.Rect) -> bool:
+        """Load the chunks near ``focus`` and evict distant ones.
+
+        Returns ``True`` when the resident platforms changed.
+        """
+
+        needed = self._chunk_range(focus.left - self.load_margin, focus.right + self.load_margin)
+        changed = False
+        for chunk in needed:
+            if chunk not in self._resident:
+                self._instantiate(chunk, self._take(chunk))
+                changed = True
+
+        first = max(0, needed.start - self.prefetch_chunks)
+        last = min(len(self.chunk_files), needed.stop + self.prefetch_chunks)
+        for chunk in range(first, last):
+            if chunk not in self._resident and chunk not in self._pending:
+                self._pending[chunk] = self._submit(chunk)
+
+        if len(self._resident) > self.max_resident_chunks:
+            center = focus.centerx // self.chunk_width
+            distant = sorted(
+                (chunk for chunk in self._resident if chunk not in needed),
+                key=lambda chunk: abs(chunk - center),
+                reverse=True,
+            )
+            for chunk in distant[: len(self._resident) - self.max_resident_chunks]:
+                self._evict(chunk)
+                changed = True
+        for chunk in [chunk for chunk in self._pending if not first <= chunk < last]:
+            self._pending.pop(chunk).cancel()
+
+        if changed:
+            self._rebuild_platforms()
+        return changed
+
+    def _submit(self, chunk: int) -> Future:
+        path = self.directory / self.chunk_files[chunk]
+        if self._executor is None:
+            future: Future = Future()
+            future.set_result(_read_chunk(path))
+            return future
+        return self._executor.submit(_read_chunk, path)
+
+    def _take(self, chunk: int) -> dict:
+        future = self._pending.pop(chunk, None)
+        if future is None or future.cancelled():
+            return _read_chunk(self.directory / self.chunk_files[chunk])
+        return future.result()
+
+    def _instantiate(self, chunk: int, data: dict) -> None:
+        resident = _ResidentChunk()
+        for platform_id, x, y, width, height in data["platforms"]:
+            resident.platform_ids.append(platform_id)
+            if platform_id not in self._platforms:
+                self._platforms[platform_id] = entities.Platform.from_dimensions(x, y, width, height)
+            self._platform_refs[platform_id] = self._platform_refs.get(platform_id, 0) + 1
+        for enemy in data["enemies"]:
+            if enemy["id"] in self._defeated:
+                continue
+            instance = entities.Enemy(
+                enemy["x"], enemy["y"], (enemy["min_x"], enemy["max_x"]), enemy.get("speed", 120), enemy.get("health", 3)
+            )
+            resident.enemies.append((enemy["id"], instance))
+            self.enemies.append(instance)
+        for orb in data["energy_orbs"]:
+            instance = entities.EnergyOrb.from_center(orb["x"], orb["y"], orb.get("diameter", 28))
+            resident.energy_orbs.append(instance)
+            self.energy_orbs.append(instance)
+        self._resident[chunk] = resident
+        self.loads += 1
+
+    def _evict(self, chunk: int) -> None:
+        resident = self._resident.pop(chunk)
+        for platform_id in resident.platform_ids:
+            self._platform_refs[platform_id] -= 1
+            if self._platform_refs[platform_id] == 0:
+                del self._platform_refs[platform_id]
+                del self._platforms[platform_id]
+        alive = {id(enemy) for enemy in self.enemies}
+        leaving = set()
+        for enemy_id, enemy in resident.enemies:
+            if id(enemy) in alive:
+                leaving.add(id(enemy))
+            else:
+                self._defeated.add(enemy_id)
+        if leaving:
+            self.enemies[:] = [enemy for enemy in self.enemies if id(enemy) not in leaving]
+        if resident.energy_orbs:
+            orbs = {id(orb) for orb in resident.energy_orbs}
+            self.energy_orbs[:] = [orb for orb in self.energy_orbs if id(orb) not in orbs]
+        self.evictions += 1
+
+    def _rebuild_platforms(self) -> None:
+        self.platforms = spatial.PlatformIndex([self._platforms[key] for key in sorted(self._platforms)])
+
+    @property
+    def resident_chunks(self) -> List[int]:
+        return sorted(self._resident)
+
+
+def main(argv: Optional[Iterable[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.game.levels.chunked", description="Write level 1 in the chunked level format."
+    )
+    parser.add_argument("output", type=Path, help="directory receiving the manifest and chunk files")
+    parser.add_argument("--chunk-width", type=int, default=CHUNK_WIDTH)
+    args = parser.parse_args(argv)
+    print(write_chunked(level1.load_level(), args.output, args.chunk_width))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""Collision geometry: a level's platforms merged into fewer solid boxes.
+
+Levels are authored as many small rectangles, and neighbouring ones often
+touch: ground segments laid end to end, columns stacked on each other, tiles
+of a generated level. Each is tested on its own when an entity moves, so
+:func:`merge_platform_rects` joins a rect to the one listed just before it
+when they share the same rows (or columns) and the second starts exactly where
+the first ends, alternating rows and columns until nothing changes. The solid
+area is exactly the same; only the number of boxes drops. Rects that overlap,
+leave a gap or are listed apart are kept as they are, and every box stays at
+the place of its first piece in the list.
+
+An entity pushes out of the first platform it overlaps in list order (see
+:meth:`~src.game.entities.Entity.move_and_collide`), so keeping the order and
+only merging pieces that follow each other makes collisions resolve exactly as
+against the original rects, provided no entity starts a move overlapping a
+platform or moves, in one step, further than the thickness of the piece it
+runs into. The original rects are kept for rendering (see
+:attr:`~src.game.spatial.PlatformIndex.render`)::
+
+    python -m src.game.levels.collision [LEVEL.advl]   # report the reduction
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from . import level1
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+Rect = Tuple[int, int, int, int]
+
+
+@dataclass
+class CollisionGeometry:
+    """Merged collision boxes with the size of the reduction."""
+
+    rects: Sequence[Sequence[int]]  # (x, y, width, height) rows; an (n, 4) array if built from one
+    source_count: int
+    seconds: float
+
+    def report(self) -> Dict[str, object]:
+        boxes = len(self.rects)
+        return {
+            "platforms": self.source_count,
+            "collision_boxes": boxes,
+            "reduction": round(1 - boxes / self.source_count, 4) if self.source_count else 0.0,
+            "merge_ms": round(self.seconds * 1000, 3),
+        }
+
+
+def build(rects: Sequence[Sequence[int]]) -> CollisionGeometry:
+    """Time :func:`merge_platform_rects` on ``rects``."""
+
+    start = time.perf_counter()
+    merged = merge_platform_rects(rects)
+    return CollisionGeometry(merged, len(rects), time.perf_counter() - start)
+
+
+def merge_platform_rects(rects: Sequence[Sequence[int]]):
+    """Merge consecutive ``(x, y, width, height)`` rects laid end to end, until none are left.
+
+    Rows and columns are merged in turn until a pass changes nothing. An
+    ``(n, 4)`` array gives an ``int32`` array back, other sequences a list of
+    tuples; both come out in the order of the source rects whether or not NumPy
+    is installed. Empty rects are dropped.
+    """
+
+    if np is not None:
+        merged = _merge_arrays(np.asarray(rects, dtype=np.int64).reshape(-1, 4))
+        if isinstance(rects, np.ndarray):
+            return merged.astype(np.int32)
+        return [tuple(row) for row in merged.tolist()]
+    return _merge_lists([tuple(rect) for rect in rects])
+
+
+def _merge_arrays(rects: "np.ndarray") -> "np.ndarray":
+    rects = rects[(rects[:, 2] > 0) & (rects[:, 3] > 0)]
+    while True:
+        count = len(rects)
+        # Rows: same y and height, joined along x; then columns: same x and width, along y.
+        rects = _merge_runs(rects, 0)
+        rects = _merge_runs(rects, 1)
+        if len(rects) == count:
+            return rects
+
+
+def _merge_runs(rects: "np.ndarray", axis: int) -> "np.ndarray":
+    """Join runs of consecutive rects sharing their extent across ``axis``, each starting where the last ends."""
+
+    if len(rects) < 2:
+        return rects
+    other = 1 - axis
+    position = rects[:, axis]
+    end = position + rects[:, axis + 2]
+    key, extent = rects[:, other], rects[:, other + 2]
+    joins = (key[1:] == key[:-1]) & (extent[1:] == extent[:-1]) & (position[1:] == end[:-1])
+    if not joins.any():
+        return rects
+    first = np.flatnonzero(np.concatenate(([True], ~joins)))
+    last = np.append(first[1:], len(rects)) - 1
+    merged = rects[first]
+    merged[:, axis + 2] = end[last] - position[first]
+    return merged
+
+
+def _merge_lists(rects: List[Rect]) -> List[Rect]:
+    rects = [rect for rect in rects if rect[2] > 0 and rect[3] > 0]
+    while True:
+        count = len(rects)
+        rects = _merge_runs_list(rects, 0)
+        rects = _merge_runs_list(rects, 1)
+        if len(rects) == count:
+            return rects
+
+
+def _merge_runs_list(rects: List[Rect], axis: int) -> List[Rect]:
+    other = 1 - axis
+    merged: List[Rect] = []
+    for rect in rects:
+        if merged:
+            last = merged[-1]
+            start, end = last[axis], last[axis] + last[axis + 2]
+            if last[other] == rect[other] and last[other + 2] == rect[other + 2] and rect[axis] == end:
+                merged[-1] = _rect(axis, start, rect[axis] + rect[axis + 2], (rect[other], rect[other + 2]))
+                continue
+        merged.append(rect)
+    return merged
+
+
+def _rect(axis: int, start: int, end: int, group: Tuple[int, int]) -> Rect:
+    if axis == 0:
+        return (start, group[0], end - start, group[1])
+    return (group[0], start, group[1], end - start)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.game.levels.collision", description="Report how far a level's platforms merge."
+    )
+    parser.add_argument("level", type=Path, nargs="?", help="compiled .advl file (default: level 1)")
+    args = parser.parse_args(argv)
+    if args.level is None:
+        rects = level1.load_level()["platforms"]
+    else:
+        from .compiled import CompiledLevel
+
+        rects = CompiledLevel(args.level).platforms
+    print(json.dumps(build(rects).report(), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,297 @@
+"""Compact binary level format loaded through a memory map.
+
+A compiled level (``.advl``) is a fixed-size little-endian header followed by
+three tables of fixed-width ``int32`` records:
+
+* platforms: ``x, y, width, height``
+* enemies: ``x, y, min_x, max_x, speed, health``
+* energy orbs: ``center_x, center_y, diameter``
+
+The header holds the world size, player start, finish zone and checkpoint zone
+and respawn, plus the record counts. :class:`CompiledLevel` maps the file and
+exposes each table as a zero-copy NumPy view, so collision structures are built
+from the buffer without parsing records one by one. Compile a level with::
+
+    python -m src.game.levels.compiled OUTPUT.advl
+"""
+
+from __future__ import annotations
+
+import argparse
+import mmap
+import struct
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import pygame
+
+from ..entities import Platform
+from ..spatial import CELL_SIZE
+from ..swarm import PlatformArrays
+from . import collision, level1
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+MAGIC = b"ADVL"
+FORMAT_VERSION = 1
+# magic, version, flags, world (2), player start (2), finish (4), checkpoint zone (4),
+# checkpoint respawn (2), platform / enemy / orb counts.
+HEADER = struct.Struct("<4sHH2i2i4i4i2i3Q")
+HAS_CHECKPOINT = 1
+
+PLATFORM_FIELDS = 4
+ENEMY_FIELDS = 6
+ORB_FIELDS = 3
+RECORD_ITEM = 4  # bytes per int32 field
+BATCH_RECORDS = 65536  # records buffered before each write while compiling
+PLATFORMS, ENEMIES, ENERGY_ORBS = range(3)  # table order in the file
+
+
+def _write_table(handle, rows: Iterable[Sequence[int]], fields: int) -> int:
+    """Stream ``rows`` to ``handle`` as int32 records and return how many were written."""
+
+    count = 0
+    batch = array("i")
+    for row in rows:
+        if len(row) != fields:
+            raise ValueError(f"Expected {fields} fields per record, got {len(row)}: {row!r}")
+        batch.extend(row)
+        count += 1
+        if count % BATCH_RECORDS == 0:
+            _write_little_endian(handle, batch)
+            batch = array("i")
+    _write_little_endian(handle, batch)
+    return count
+
+
+def _write_little_endian(handle, values: array) -> None:
+    if values and struct.pack("=i", 1) != struct.pack("<i", 1):
+        values.byteswap()
+    handle.write(values.tobytes())
+
+
+def compile_level(data: level1.LevelData, path: Path) -> Path:
+    """Write ``load_level()``-style data to ``path`` in the compiled format.
+
+    Platforms, enemies and orbs are consumed as iterables, so generated levels can
+    be compiled without materializing them.
+    """
+
+    path = Path(path)
+    checkpoint = data.get("checkpoint")
+    with path.open("wb") as handle:
+        handle.write(bytes(HEADER.size))
+        platforms = _write_table(handle, data["platforms"], PLATFORM_FIELDS)
+        enemies = _write_table(
+            handle,
+            (
+                (enemy["x"], enemy["y"], enemy["min_x"], enemy["max_x"], enemy.get("speed", 120), enemy.get("health", 3))
+                for enemy in data["enemies"]
+            ),
+            ENEMY_FIELDS,
+        )
+        orbs = _write_table(
+            handle,
+            ((orb["x"], orb["y"], orb.get("diameter", 28)) for orb in data.get("energy_orbs", [])),
+            ORB_FIELDS,
+        )
+        handle.seek(0)
+        handle.write(
+            HEADER.pack(
+                MAGIC,
+                FORMAT_VERSION,
+                HAS_CHECKPOINT if checkpoint else 0,
+                *data.get("world_size", (960, 640)),
+                *data["player_start"],
+                *data["finish_zone"],
+                *(checkpoint["zone"] if checkpoint else (0, 0, 0, 0)),
+                *(checkpoint["respawn"] if checkpoint else data["player_start"]),
+                platforms,
+                enemies,
+                orbs,
+            )
+        )
+    return path
+
+
+class MappedPlatformIndex(Sequence[Platform]):
+    """Platform broadphase backed by a :class:`~src.game.swarm.PlatformArrays` grid.
+
+    Drop-in replacement for :class:`~src.game.spatial.PlatformIndex` on compiled
+    levels. Grid cells and :class:`Platform` objects are only turned into Python
+    objects the first time they are looked up, so opening a level with millions of
+    platforms costs a few array operations. As there, :attr:`render` holds the
+    platforms to draw.
+    """
+
+    def __init__(
+        self, rects: "np.ndarray", cell_size: int = CELL_SIZE, render: Optional[Sequence[Platform]] = None
+    ) -> None:
+        self.render: Sequence[Platform] = render if render is not None else self
+        self._rects = rects
+        self._arrays = PlatformArrays(rects, cell_size)
+        self.cell_size = cell_size
+        self._cells: Dict[Tuple[int, int], List[int]] = {}
+        self._platforms: Dict[int, Platform] = {}
+
+    def _cell(self, cell: Tuple[int, int]) -> List[int]:
+        bucket = self._cells.get(cell)
+        if bucket is None:
+            bucket = self._cells[cell] = self._arrays.cell(*cell).tolist()
+        return bucket
+
+    def query(self, area: pygame.Rect) -> List[int]:
+        """Return sorted indices of the platforms that may overlap ``area``."""
+
+        size = self.cell_size
+        found: set[int] = set()
+        for cx in range(area.left // size, (area.right - 1) // size + 1):
+            for cy in range(area.top // size, (area.bottom - 1) // size + 1):
+                found.update(self._cell((cx, cy)))
+        return sorted(found)
+
+    def __len__(self) -> int:
+        return len(self._rects)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        platform = self._platforms.get(index)
+        if platform is None:
+            if not 0 <= index < len(self):
+                raise IndexError("platform index out of range")
+            platform = self._platforms[index] = Platform.from_dimensions(*self._rects[index].tolist())
+        return platform
+
+    def __iter__(self) -> Iterator[Platform]:
+        for index in range(len(self)):
+            yield self[index]
+
+
+class CompiledLevel:
+    """Memory-mapped compiled level.
+
+    ``platforms``, ``enemies`` and ``energy_orbs`` are read-only ``int32`` NumPy
+    views of shape ``(count, fields)`` over the mapped file (NumPy required).
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        with self.path.open("rb") as handle:
+            self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        fields = HEADER.unpack_from(self._map, 0)
+        magic, version, flags = fields[:3]
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self._map.close()
+            raise ValueError(f"{self.path} is not a compiled level (version {FORMAT_VERSION})")
+        values = fields[3:]
+        self.world_size: Tuple[int, int] = tuple(values[0:2])
+        self.player_start: Tuple[int, int] = tuple(values[2:4])
+        self.finish_zone: Tuple[int, int, int, int] = tuple(values[4:8])
+        self.checkpoint_zone: Optional[Tuple[int, int, int, int]] = (
+            tuple(values[8:12]) if flags & HAS_CHECKPOINT else None
+        )
+        self.checkpoint_respawn: Tuple[int, int] = tuple(values[12:14])
+        self.counts: Tuple[int, int, int] = tuple(values[14:17])
+
+        self._platform_index: Optional[MappedPlatformIndex] = None
+        offset = HEADER.size
+        self._tables: List[Tuple[int, int, int]] = []
+        for count, width in zip(self.counts, (PLATFORM_FIELDS, ENEMY_FIELDS, ORB_FIELDS)):
+            self._tables.append((offset, count, width))
+            offset += count * width * RECORD_ITEM
+        if offset > len(self._map):
+            self._map.close()
+            raise ValueError(f"{self.path} is truncated")
+
+    def close(self) -> None:
+        try:
+            self._map.close()
+        except BufferError:
+            # NumPy views still reference the mapping; it is released with them.
+            pass
+
+    def __enter__(self) -> "CompiledLevel":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _table(self, index: int) -> "np.ndarray":
+        if np is None:
+            raise ImportError("Array access to compiled levels requires numpy (pip install numpy).")
+        offset, count, width = self._tables[index]
+        return np.frombuffer(self._map, dtype="<i4", count=count * width, offset=offset).reshape(count, width)
+
+    @property
+    def platforms(self) -> "np.ndarray":
+        return self._table(PLATFORMS)
+
+    @property
+    def enemies(self) -> "np.ndarray":
+        return self._table(ENEMIES)
+
+    @property
+    def energy_orbs(self) -> "np.ndarray":
+        return self._table(ENERGY_ORBS)
+
+    def platform_arrays(self) -> PlatformArrays:
+        """Build the array collision grid straight from the mapped platform table."""
+
+        return PlatformArrays(self.platforms)
+
+    def platform_index(self) -> MappedPlatformIndex:
+        """Return the broadphase used by the game loop, built once from the mapped table.
+
+        It holds the merged collision boxes; the mapped platforms are its ``render`` geometry.
+        """
+
+        if self._platform_index is None:
+            render = MappedPlatformIndex(self.platforms)
+            self._platform_index = MappedPlatformIndex(collision.merge_platform_rects(self.platforms), render=render)
+        return self._platform_index
+
+    def rows(self, table: int) -> Iterable[Tuple[int, ...]]:
+        """Iterate over the records of ``table`` (``PLATFORMS``, ``ENEMIES`` or ``ENERGY_ORBS``) as tuples."""
+
+        offset, count, width = self._tables[table]
+        record = struct.Struct(f"<{width}i")
+        return struct.iter_unpack(record.format, self._map[offset : offset + count * record.size])
+
+    def level_data(self) -> level1.LevelData:
+        """Return the level as a ``load_level()`` dictionary (parses every record)."""
+
+        enemies = [
+            {"x": x, "y": y, "min_x": min_x, "max_x": max_x, "speed": speed, "health": health}
+            for x, y, min_x, max_x, speed, health in self.rows(ENEMIES)
+        ]
+        data: level1.LevelData = {
+            "player_start": self.player_start,
+            "platforms": list(self.rows(PLATFORMS)),
+            "enemies": enemies,
+            "finish_zone": self.finish_zone,
+            "world_size": self.world_size,
+            "energy_orbs": [{"x": x, "y": y, "diameter": diameter} for x, y, diameter in self.rows(ENERGY_ORBS)],
+        }
+        if self.checkpoint_zone is not None:
+            data["checkpoint"] = {"zone": self.checkpoint_zone, "respawn": self.checkpoint_respawn}
+        return data
+
+
+def main(argv: Optional[Iterable[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.game.levels.compiled", description="Compile level 1 to the binary level format."
+    )
+    parser.add_argument("output", type=Path, help="file to write, conventionally with the .advl suffix")
+    args = parser.parse_args(argv)
+    print(compile_level(level1.load_level(), args.output))
+
+
+if __name__ == "__main__":
+    main()
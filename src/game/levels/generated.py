@@ -0,0 +1,266 @@
+"""Seeded procedural levels of any size, generated section by section.
+
+A generated level is a row of :data:`SECTION_WIDTH`-pixel sections. Each one
+starts and ends on the ground, so sections are independent: section ``i`` of
+seed ``s`` is always drawn from the same random stream and can be produced on
+its own, without the sections before it. Between its ends a section lays out a
+*course* of ground pieces, solid ledges and floating slabs, each reachable from
+the previous one with the :class:`~src.game.entities.Player`'s run and jump
+(see :class:`JumpEnvelope`), then adds patrolling enemies, energy orbs and
+bonus platforms that never stand in the course's way.
+
+:class:`GeneratedLevel` yields platforms, enemies and orbs one section at a
+time instead of building lists, so a level of millions of objects can be
+compiled with :func:`~src.game.levels.compiled.compile_level` in constant
+memory::
+
+    python -m src.game.levels.generated OUTPUT.advl --seed 7 --sections 100000
+    python -m src.game.main --level OUTPUT.advl
+
+:func:`load_level` returns a small level as lists, like
+:func:`~src.game.levels.level1.load_level`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import random
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .. import entities
+from . import chunked, compiled, level1
+
+Rect = Tuple[int, int, int, int]
+
+SECTION_WIDTH = 2400  # pixels per section; about 6 platforms, 1 enemy and 2 orbs each
+WORLD_HEIGHT = 640
+GROUND_HEIGHT = 90
+GROUND_Y = WORLD_HEIGHT - GROUND_HEIGHT
+SLAB_THICKNESS = 26
+MAX_ALTITUDE = 240  # highest course surface above the ground
+SURFACE_WIDTH = (160, 520)  # course surfaces, wide enough to take a run-up from
+END_WIDTH = 280  # first and last ground piece of a section (start, checkpoint, finish)
+CLEARANCE = 16  # pixels the feet clear a ledge's corner by on the tightest jump
+GAP_SAFETY = 0.8  # fraction of the widest crossable gap actually used
+BONUS_RISE = (90, 100)  # bonus platforms above a surface, leaving headroom to walk under
+ENEMY_CHANCE = 0.35
+ORB_CHANCE = 0.3
+MAX_COORDINATE = 2**31 - 1  # pygame rects and compiled levels hold 32-bit coordinates
+
+
+@dataclass(frozen=True)
+class JumpEnvelope:
+    """How far and how high the player can jump, from its run speed, jump speed and gravity."""
+
+    run_speed: float
+    jump_speed: float
+    gravity: float
+
+    @classmethod
+    def of_player(cls) -> "JumpEnvelope":
+        player = entities.Player(0, 0)
+        return cls(player.speed, -player.jump_strength, entities.GRAVITY)
+
+    @property
+    def height(self) -> float:
+        """Height of the apex of a jump from standing ground."""
+
+        return self.jump_speed**2 / (2 * self.gravity)
+
+    @property
+    def apex_distance(self) -> float:
+        """Distance run while rising to the apex."""
+
+        return self.run_speed * self.jump_speed / self.gravity
+
+    @property
+    def max_rise(self) -> int:
+        """Highest ledge climbed with :data:`CLEARANCE` to spare."""
+
+        return int(self.height - CLEARANCE)
+
+    def max_gap(self, rise: int) -> float:
+        """Widest gap crossed onto a ledge ``rise`` pixels higher (lower if negative).
+
+        The feet must still be :data:`CLEARANCE` above the far ledge when the
+        player reaches its edge. Gaps narrower than :attr:`apex_distance` are
+        crossed by jumping earlier, which the surfaces' minimum width allows.
+        """
+
+        lift = rise + CLEARANCE
+        if lift > self.height:
+            return 0.0
+        airborne = (self.jump_speed + math.sqrt(self.jump_speed**2 - 2 * self.gravity * lift)) / self.gravity
+        return self.run_speed * airborne
+
+
+@dataclass
+class Section:
+    """Objects of one section; ``course`` lists the platforms forming its path, left to right."""
+
+    course: List[Rect] = field(default_factory=list)
+    platforms: List[Rect] = field(default_factory=list)
+    enemies: List[Dict[str, int]] = field(default_factory=list)
+    energy_orbs: List[Dict[str, int]] = field(default_factory=list)
+
+
+class _Regenerated:
+    """Iterable producing its items again from the seed each time it is iterated."""
+
+    def __init__(self, produce: Callable[[], Iterator]) -> None:
+        self._produce = produce
+
+    def __iter__(self) -> Iterator:
+        return self._produce()
+
+
+class GeneratedLevel:
+    """Level ``seed`` made of ``sections`` sections, produced on demand.
+
+    The world size, player start, checkpoint (at the start of the middle
+    section) and finish zone (at the end of the last one) are known without
+    generating anything; :meth:`platforms`, :meth:`enemies` and
+    :meth:`energy_orbs` generate the sections in order as they are consumed.
+    """
+
+    def __init__(self, seed: int = 0, sections: int = 16, envelope: Optional[JumpEnvelope] = None) -> None:
+        if sections < 1:
+            raise ValueError("A generated level needs at least one section")
+        if sections * SECTION_WIDTH > MAX_COORDINATE:
+            raise ValueError(f"At most {MAX_COORDINATE // SECTION_WIDTH} sections fit in 32-bit coordinates")
+        self.seed = seed
+        self.sections = sections
+        self.envelope = envelope or JumpEnvelope.of_player()
+
+    @property
+    def world_size(self) -> Tuple[int, int]:
+        return (self.sections * SECTION_WIDTH, WORLD_HEIGHT)
+
+    @property
+    def player_start(self) -> Tuple[int, int]:
+        return (50, GROUND_Y - 60)
+
+    @property
+    def finish_zone(self) -> Rect:
+        return (self.world_size[0] - 160, GROUND_Y - 120, 120, 120)
+
+    @property
+    def checkpoint(self) -> Dict[str, tuple]:
+        left = (self.sections // 2) * SECTION_WIDTH
+        return {"zone": (left + 20, GROUND_Y - 200, 220, 200), "respawn": (left + 60, GROUND_Y - 60)}
+
+    def section(self, index: int) -> Section:
+        """Generate section ``index`` alone."""
+
+        rng = random.Random(f"{self.seed}:{index}")
+        envelope = self.envelope
+        left = index * SECTION_WIDTH
+        right = left + SECTION_WIDTH
+        section = Section()
+        # Room to get back down to the ground from any altitude before the section ends.
+        reserve = int(envelope.max_gap(-MAX_ALTITUDE) * GAP_SAFETY) + END_WIDTH
+
+        x, altitude = left + END_WIDTH, 0
+        section.course.append((left, GROUND_Y, END_WIDTH, GROUND_HEIGHT))
+        while True:
+            if rng.random() < 0.35:
+                target = 0
+            else:
+                target = rng.randint(0, min(MAX_ALTITUDE, altitude + envelope.max_rise))
+            gap = rng.randint(0, int(envelope.max_gap(target - altitude) * GAP_SAFETY))
+            if target == altitude == 0:
+                gap = max(gap, 24)  # a pit, or the two pieces would just be one
+            width = rng.randint(*SURFACE_WIDTH)
+            if x + gap + width + reserve > right:
+                break
+            section.course.append(_surface(x + gap, target, width, rng))
+            x, altitude = x + gap + width, target
+        gap = rng.randint(0, int(envelope.max_gap(-altitude) * GAP_SAFETY))
+        section.course.append((x + gap, GROUND_Y, right - x - gap, GROUND_HEIGHT))
+
+        section.platforms.extend(section.course)
+        last = len(section.course) - 1
+        for position, (sx, top, width, _) in enumerate(section.course):
+            # The section's ends hold the start, checkpoint and finish: no enemies there.
+            if 0 < position < last and width >= 240 and rng.random() < ENEMY_CHANCE:
+                enemy_x = rng.randint(sx, sx + width - 40)
+                section.enemies.append({"x": enemy_x, "y": top - 50, "min_x": sx, "max_x": sx + width, "health": 3})
+            if rng.random() < ORB_CHANCE:
+                section.energy_orbs.append({"x": rng.randint(sx + 20, sx + width - 20), "y": top - 100})
+            # Bonus platforms keep clear of both ends, where the player lands and takes off.
+            room = width - 360
+            if room >= 120 and rng.random() < 0.5:
+                bonus_width = rng.randint(120, min(200, room))
+                bonus_x = rng.randint(sx + 200, sx + 200 + room - bonus_width)
+                bonus_top = top - rng.randint(*BONUS_RISE)
+                section.platforms.append((bonus_x, bonus_top, bonus_width, SLAB_THICKNESS))
+                if rng.random() < ORB_CHANCE:
+                    section.energy_orbs.append({"x": bonus_x + bonus_width // 2, "y": bonus_top - 40})
+        return section
+
+    def iter_sections(self) -> Iterator[Section]:
+        return (self.section(index) for index in range(self.sections))
+
+    def platforms(self) -> Iterator[Rect]:
+        for section in self.iter_sections():
+            yield from section.platforms
+
+    def enemies(self) -> Iterator[Dict[str, int]]:
+        for section in self.iter_sections():
+            yield from section.enemies
+
+    def energy_orbs(self) -> Iterator[Dict[str, int]]:
+        for section in self.iter_sections():
+            yield from section.energy_orbs
+
+    def level_data(self) -> level1.LevelData:
+        """``load_level()``-style data whose object collections generate the sections when iterated."""
+
+        return {
+            "player_start": self.player_start,
+            "platforms": _Regenerated(self.platforms),
+            "enemies": _Regenerated(self.enemies),
+            "finish_zone": self.finish_zone,
+            "world_size": self.world_size,
+            "checkpoint": self.checkpoint,
+            "energy_orbs": _Regenerated(self.energy_orbs),
+        }
+
+
+def _surface(x: int, altitude: int, width: int, rng: random.Random) -> Rect:
+    top = GROUND_Y - altitude
+    if altitude == 0 or rng.random() < 0.5:
+        return (x, top, width, WORLD_HEIGHT - top)  # ground piece or solid ledge
+    return (x, top, width, SLAB_THICKNESS)  # floating over a pit
+
+
+def load_level(seed: int = 0, sections: int = 16) -> level1.LevelData:
+    """Return generated level ``seed`` as lists, for levels small enough to hold in memory."""
+
+    level = GeneratedLevel(seed, sections)
+    data = level.level_data()
+    for key in ("platforms", "enemies", "energy_orbs"):
+        data[key] = list(data[key])
+    return data
+
+
+def main(argv: Optional[Iterable[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.game.levels.generated", description="Write a generated level to disk."
+    )
+    parser.add_argument("output", type=Path, help=".advl file (written as it is generated) or chunked level directory")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sections", type=int, default=16, help=f"sections of {SECTION_WIDTH} pixels")
+    args = parser.parse_args(argv)
+    data = GeneratedLevel(args.seed, args.sections).level_data()
+    if args.output.suffix == ".advl":
+        print(compiled.compile_level(data, args.output))
+    else:
+        print(chunked.write_chunked(data, args.output))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,20 +2,31 @@
 
 from __future__ import annotations
 
-from typing import List, Optional, Tuple
+from . import startup  # first, so the startup timeline covers the imports below
+
+import argparse
+import random
+from pathlib import Path
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
 
 import pygame
 
-from . import entities
-from .levels import level1
+from . import activation, assets, entities, profiler, rendering, replay, snapshot, spatial, timers
+from .levels import chunked, collision, compiled, level1
+from .rendering import BACKGROUND_COLOR, CHECKPOINT_COLOR, FINISH_COLOR, PLATFORM_COLOR
 
-BACKGROUND_COLOR = (135, 206, 235)  # Sky blue
 SCREEN_SIZE = (960, 540)
+FRAME_RATE = 60  # frames rendered per second at most
+FIXED_DT = 1.0 / 120.0  # seconds simulated per physics step
+MAX_STEPS_PER_FRAME = 8  # physics steps allowed per rendered frame before slowing down
+REWIND_KEY = pygame.K_BACKSPACE  # held to go back in time
+HEART_SIZE = 20  # pixels per side of a health heart
+HEART_SPACING = 6
 
 
-def load_level() -> tuple[
+def load_level(data: Optional[level1.LevelData] = None) -> tuple[
     entities.Player,
-    List[entities.Platform],
+    spatial.PlatformIndex,
     List[entities.Enemy],
     pygame.Rect,
     tuple[int, int],
@@ -23,14 +34,17 @@ def load_level() -> tuple[
     Tuple[int, int],
     List[entities.EnergyOrb],
 ]:
-    """Load the first level and return the initialized objects."""
-
-    data = level1.load_level()
-    platforms = [entities.Platform.from_dimensions(*platform) for platform in data["platforms"]]
-    enemies = [
+    """Load a level (the first one by default) and return the initialized objects."""
+
+    if data is None:
+        data = level1.load_level()
+    # Collisions are tested against the merged boxes; the authored platforms are drawn.
+    render = spatial.PlatformIndex.from_rects(data["platforms"])
+    platforms = spatial.PlatformIndex.from_rects(collision.merge_platform_rects(data["platforms"]), render=render)
+    enemies = spatial.ActorIndex(
         entities.Enemy(enemy["x"], enemy["y"], (enemy["min_x"], enemy["max_x"]), enemy.get("speed", 120), enemy.get("health", 3))
         for enemy in data["enemies"]
-    ]
+    )
     player_start = data["player_start"]
     player = entities.Player(player_start[0], player_start[1])
     finish_rect = pygame.Rect(*data["finish_zone"])
@@ -38,13 +52,104 @@ def load_level() -> tuple[
     checkpoint_data = data.get("checkpoint")
     checkpoint_rect = pygame.Rect(*checkpoint_data["zone"]) if checkpoint_data else pygame.Rect(0, 0, 0, 0)
     checkpoint_respawn: Tuple[int, int] = tuple(checkpoint_data["respawn"]) if checkpoint_data else player_start
-    energy_orbs = [
+    energy_orbs = spatial.ActorIndex(
         entities.EnergyOrb.from_center(orb["x"], orb["y"], orb.get("diameter", 28))
         for orb in data.get("energy_orbs", [])
-    ]
+    )
     return player, platforms, enemies, finish_rect, world_size, checkpoint_rect, checkpoint_respawn, energy_orbs
 
 
+def load_streamed_level(stream: chunked.StreamingLevel) -> tuple[
+    entities.Player,
+    spatial.PlatformIndex,
+    List[entities.Enemy],
+    pygame.Rect,
+    Tuple[int, int],
+    pygame.Rect,
+    Tuple[int, int],
+    List[entities.EnergyOrb],
+]:
+    """Start a streamed level and return the same objects as :func:`load_level`.
+
+    Only the chunks around the player are instantiated; call ``stream.update``
+    as the player moves and read ``stream.platforms`` again when it returns ``True``.
+    """
+
+    stream.reset()
+    player = entities.Player(*stream.player_start)
+    stream.update(player.rect)
+    return (
+        player,
+        stream.platforms,
+        stream.enemies,
+        stream.finish_rect,
+        stream.world_size,
+        stream.checkpoint_rect,
+        stream.checkpoint_respawn,
+        stream.energy_orbs,
+    )
+
+
+def load_compiled_level(level: compiled.CompiledLevel) -> tuple[
+    entities.Player,
+    compiled.MappedPlatformIndex,
+    List[entities.Enemy],
+    pygame.Rect,
+    Tuple[int, int],
+    pygame.Rect,
+    Tuple[int, int],
+    List[entities.EnergyOrb],
+]:
+    """Start a compiled level and return the same objects as :func:`load_level`.
+
+    Platforms stay in the memory-mapped file; only enemies and energy orbs are
+    instantiated.
+    """
+
+    player = entities.Player(*level.player_start)
+    enemies = spatial.ActorIndex(
+        entities.Enemy(x, y, (min_x, max_x), speed, health)
+        for x, y, min_x, max_x, speed, health in level.rows(compiled.ENEMIES)
+    )
+    energy_orbs = spatial.ActorIndex(
+        entities.EnergyOrb.from_center(x, y, diameter) for x, y, diameter in level.rows(compiled.ENERGY_ORBS)
+    )
+    checkpoint_rect = pygame.Rect(*level.checkpoint_zone) if level.checkpoint_zone else pygame.Rect(0, 0, 0, 0)
+    return (
+        player,
+        level.platform_index(),
+        enemies,
+        pygame.Rect(*level.finish_zone),
+        level.world_size,
+        checkpoint_rect,
+        level.checkpoint_respawn,
+        energy_orbs,
+    )
+
+
+def build_static_layer(
+    world_size: Tuple[int, int],
+    platforms: Sequence[entities.Platform],
+    checkpoint_rect: pygame.Rect,
+    finish_rect: pygame.Rect,
+    prerender: bool = True,
+) -> rendering.StaticLayer:
+    """Pre-render the level geometry that never moves (on first use if not ``prerender``)."""
+
+    layer = rendering.StaticLayer(world_size, platforms, checkpoint_rect, finish_rect)
+    if prerender:
+        layer.prerender()
+    return layer
+
+
+def draw_loading_screen(screen: pygame.Surface, font: pygame.font.Font) -> None:
+    """Fill the window while the level is being built."""
+
+    screen.fill(BACKGROUND_COLOR)
+    text = font.render("Chargement…", True, (20, 20, 20))
+    screen.blit(text, text.get_rect(center=screen.get_rect().center))
+
+
 def compute_camera(
     target: pygame.Rect, world_size: tuple[int, int], screen_size: tuple[int, int]
 ) -> pygame.Vector2:
@@ -66,12 +171,13 @@ def handle_events(
     player: entities.Player,
     enemies: List[entities.Enemy],
     state: str,
-) -> tuple[bool, str, bool, bool]:
-    """Process events, returning (running, current_state, restart_requested, jump_pressed)."""
+) -> tuple[bool, str, bool, bool, bool]:
+    """Process events, returning (running, current_state, restart_requested, jump_pressed, attacked)."""
 
     restart_requested = False
     running = True
     jump_pressed = False
+    attacked = False
 
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
@@ -82,18 +188,25 @@ def handle_events(
             elif event.key in (pygame.K_UP, pygame.K_w):
                 jump_pressed = True
             elif event.key == pygame.K_SPACE and state == "playing":
-                defeated = player.attack(enemies)
-                for enemy in defeated:
-                    enemies.remove(enemy)
+                perform_attack(player, enemies)
+                attacked = True
             elif event.key == pygame.K_r and state == "game_over":
                 restart_requested = True
-    return running, state, restart_requested, jump_pressed
+    return running, state, restart_requested, jump_pressed, attacked
+
+
+def perform_attack(player: entities.Player, enemies: List[entities.Enemy]) -> None:
+    """Let the player attack and remove the defeated enemies from the level."""
+
+    defeated = player.attack(enemies)
+    for enemy in defeated:
+        enemies.remove(enemy)
 
 
 def draw(
     screen: pygame.Surface,
     player: entities.Player,
-    platforms: List[entities.Platform],
+    platforms: Sequence[entities.Platform],
     enemies: List[entities.Enemy],
     finish_rect: pygame.Rect,
     camera: pygame.Vector2,
@@ -101,21 +214,59 @@ def draw(
     font: pygame.font.Font,
     energy_orbs: List[entities.EnergyOrb],
     checkpoint_rect: pygame.Rect,
-) -> None:
-    """Render the current game state to the screen."""
-
-    screen.fill(BACKGROUND_COLOR)
-
-    # Draw ground/platforms
-    for platform in platforms:
-        offset_rect = platform.rect.move(-camera.x, -camera.y)
-        pygame.draw.rect(screen, (46, 139, 87), offset_rect)
+    alpha: float = 1.0,
+    static_layer: Optional[rendering.StaticLayer] = None,
+    cache: Optional[rendering.ResourceCache] = None,
+    area: Optional[pygame.Rect] = None,
+) -> rendering.FrameStats:
+    """Render the current game state to the screen.
+
+    Moving entities are drawn ``alpha`` of the way between their previous and
+    current simulation step. With a ``static_layer``, the background, platforms,
+    checkpoint and finish zone are blitted from its pre-rendered chunks. Objects
+    outside the camera view are skipped; the returned stats count them. Text and
+    overlay surfaces come from ``cache`` when given and are rebuilt otherwise.
+    The caller presents the frame with ``pygame.display.flip()``.
+
+    With ``area`` (screen coordinates), only that part of the screen is repainted
+    and only the objects overlapping it are drawn; see :func:`draw_regions`.
+    """
+
+    if cache is None:
+        cache = rendering.ResourceCache(max_entries=0)
+    misses_before = cache.misses
+    stats = rendering.FrameStats()
+    if area is None:
+        view = rendering.cull_rect(camera, screen.get_size())
+    else:
+        screen.set_clip(area)
+        view = rendering.cull_rect(camera + pygame.Vector2(area.topleft), area.size)
 
-    if checkpoint_rect.width > 0 and checkpoint_rect.height > 0:
-        checkpoint_draw = checkpoint_rect.move(-camera.x, -camera.y)
-        pygame.draw.rect(screen, (173, 216, 230), checkpoint_draw, 2)
+    if static_layer is not None:
+        stats.chunks = static_layer.draw(screen, camera, area)
+    else:
+        screen.fill(BACKGROUND_COLOR)
+
+        # Draw ground/platforms
+        for platform in rendering.visible_platforms(platforms, view):
+            offset_rect = platform.rect.move(-camera.x, -camera.y)
+            pygame.draw.rect(screen, PLATFORM_COLOR, offset_rect)
+            stats.drawn += 1
+        stats.culled += len(rendering.render_geometry(platforms)) - stats.drawn
+
+        if checkpoint_rect.width > 0 and checkpoint_rect.height > 0:
+            if view.colliderect(checkpoint_rect):
+                checkpoint_draw = checkpoint_rect.move(-camera.x, -camera.y)
+                pygame.draw.rect(screen, CHECKPOINT_COLOR, checkpoint_draw, 2)
+                stats.drawn += 1
+            else:
+                stats.culled += 1
 
     for orb in energy_orbs:
+        if not view.colliderect(orb.rect):
+            stats.culled += 1
+            continue
+        stats.drawn += 1
         orb_rect = orb.rect.move(-camera.x, -camera.y)
         if orb.active:
             pygame.draw.ellipse(screen, (255, 255, 0), orb_rect)
@@ -126,55 +277,45 @@ def draw(
             pygame.draw.ellipse(screen, (180, 180, 180), faded, 2)
 
     # Finish zone
-    pygame.draw.rect(screen, (255, 215, 0), finish_rect.move(-camera.x, -camera.y))
+    if static_layer is None:
+        if view.colliderect(finish_rect):
+            pygame.draw.rect(screen, FINISH_COLOR, finish_rect.move(-camera.x, -camera.y))
+            stats.drawn += 1
+        else:
+            stats.culled += 1
 
     # Draw enemies and player
     for enemy in enemies:
-        enemy_rect = enemy.rect.move(-camera.x, -camera.y)
+        if not view.colliderect(enemy.rect):
+            stats.culled += 1
+            continue
+        stats.drawn += 1
+        enemy_rect = enemy.interpolated_rect(alpha).move(-camera.x, -camera.y)
         sprite = enemy.get_oriented_sprite()
         if sprite is not None:
             screen.blit(sprite, enemy_rect.topleft)
         else:
             pygame.draw.rect(screen, (220, 20, 60), enemy_rect)
-    player_rect = player.rect.move(-camera.x, -camera.y)
+    player_rect = player.interpolated_rect(alpha).move(-camera.x, -camera.y)
+    stats.drawn += 1
     sprite = player.get_oriented_sprite()
     if sprite is not None:
         screen.blit(sprite, player_rect.topleft)
     else:
         pygame.draw.rect(screen, (65, 105, 225), player_rect)
 
-    if player.is_attacking:
+    if player.is_attacking and view.colliderect(player.last_attack_rect):
         attack_rect = player.get_attack_hitbox().move(-camera.x, -camera.y)
-        overlay = pygame.Surface(attack_rect.size, pygame.SRCALPHA)
         duration = max(0.001, player.attack_indicator_duration)
         progress = 1.0 - (player.attack_indicator_timer / duration)
-        core_color = (255, 215, 0, int(200 - 120 * progress))
-        accent_color = (255, 255, 255, int(220 - 160 * progress))
-        pygame.draw.rect(overlay, core_color, overlay.get_rect(), border_radius=12)
-        width, height = overlay.get_size()
-        if width > 0 and height > 0:
-            if player.facing >= 0:
-                slash_points = [
-                    (width * 0.15, height * 0.2),
-                    (width * 0.95, height * 0.5),
-                    (width * 0.15, height * 0.8),
-                ]
-            else:
-                slash_points = [
-                    (width * 0.85, height * 0.2),
-                    (width * 0.05, height * 0.5),
-                    (width * 0.85, height * 0.8),
-                ]
-            pygame.draw.polygon(overlay, accent_color, slash_points)
+        overlay = cache.attack_overlay(attack_rect.size, player.facing, progress)
         screen.blit(overlay, attack_rect.topleft)
         pygame.draw.rect(screen, (255, 255, 255), player_rect.inflate(6, 6), 2)
 
     # Draw health (three hearts)
-    heart_size = 20
-    spacing = 6
     for index in range(player.max_health):
-        x = 20 + index * (heart_size + spacing)
-        heart_rect = pygame.Rect(x, 20, heart_size, heart_size)
+        x = 20 + index * (HEART_SIZE + HEART_SPACING)
+        heart_rect = pygame.Rect(x, 20, HEART_SIZE, HEART_SIZE)
         color = (220, 20, 60) if index < player.health else (169, 169, 169)
         pygame.draw.rect(screen, color, heart_rect, border_radius=4)
 
@@ -183,32 +324,109 @@ def draw(
         "Saut : ↑ ou W (double saut après une boule d'énergie)",
         "Attaque : barre d'espace",
         "R : Rejouer au dernier checkpoint",
+        "Retour arrière (maintenu) : remonter le temps",
     ]
     for idx, line in enumerate(instructions):
-        text_surface = font.render(line, True, (20, 20, 20))
+        text_surface = cache.text(font, line, (20, 20, 20))
         screen.blit(text_surface, (20, 60 + idx * 24))
 
     if state == "game_over":
-        overlay = pygame.Surface(screen.get_size(), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 150))
+        overlay = cache.overlay(screen.get_size(), (0, 0, 0, 150))
         screen.blit(overlay, (0, 0))
-        text = font.render("Vous êtes vaincu ! Appuyez sur R pour rejouer", True, (255, 255, 255))
+        text = cache.text(font, "Vous êtes vaincu ! Appuyez sur R pour rejouer", (255, 255, 255))
         text_rect = text.get_rect(center=(screen.get_width() // 2, screen.get_height() // 2))
         screen.blit(text, text_rect)
     elif state == "victory":
-        overlay = pygame.Surface(screen.get_size(), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 120))
+        overlay = cache.overlay(screen.get_size(), (0, 0, 0, 120))
         screen.blit(overlay, (0, 0))
-        text = font.render("Bravo ! Appuyez sur Échap pour quitter", True, (255, 255, 255))
+        text = cache.text(font, "Bravo ! Appuyez sur Échap pour quitter", (255, 255, 255))
         text_rect = text.get_rect(center=(screen.get_width() // 2, screen.get_height() // 2))
         screen.blit(text, text_rect)
 
-    pygame.display.flip()
+    if area is not None:
+        screen.set_clip(None)
+    stats.surfaces_allocated = cache.misses - misses_before
+    return stats
+
+
+def sprite_regions(
+    player: entities.Player,
+    enemies: List[entities.Enemy],
+    energy_orbs: List[entities.EnergyOrb],
+    camera: pygame.Vector2,
+    screen_size: Tuple[int, int],
+    alpha: float = 1.0,
+) -> Dict[Hashable, rendering.Sprite]:
+    """List what :func:`draw` paints over the static level, for :class:`rendering.DirtyRegions`.
+
+    Each entry covers every pixel its object touches, keyed by object identity.
+    """
+
+    view = rendering.cull_rect(camera, screen_size)
+    offset = (-camera.x, -camera.y)
+    sprites: Dict[Hashable, rendering.Sprite] = {}
+    for orb in spatial.overlapping(energy_orbs, view):
+        sprites[id(orb)] = (orb.rect.move(offset), orb.active)
+    for enemy in spatial.overlapping(enemies, view):
+        sprites[id(enemy)] = (enemy.interpolated_rect(alpha).move(offset), enemy.facing >= 0)
+    # Inflated to cover the outline drawn while attacking.
+    player_rect = player.interpolated_rect(alpha).move(offset).inflate(6, 6)
+    sprites["player"] = (player_rect, (player.facing >= 0, player.is_attacking))
+    if player.is_attacking and view.colliderect(player.last_attack_rect):
+        duration = max(0.001, player.attack_indicator_duration)
+        step = rendering.attack_fade_step(1.0 - player.attack_indicator_timer / duration)
+        sprites["attack"] = (player.get_attack_hitbox().move(offset), (player.facing >= 0, step))
+    hearts = pygame.Rect(20, 20, player.max_health * (HEART_SIZE + HEART_SPACING) - HEART_SPACING, HEART_SIZE)
+    sprites["hearts"] = (hearts, (player.health, player.max_health))
+    return sprites
+
+
+def draw_regions(
+    regions: Sequence[pygame.Rect],
+    screen: pygame.Surface,
+    player: entities.Player,
+    platforms: Sequence[entities.Platform],
+    enemies: List[entities.Enemy],
+    finish_rect: pygame.Rect,
+    camera: pygame.Vector2,
+    state: str,
+    font: pygame.font.Font,
+    energy_orbs: List[entities.EnergyOrb],
+    checkpoint_rect: pygame.Rect,
+    alpha: float = 1.0,
+    static_layer: Optional[rendering.StaticLayer] = None,
+    cache: Optional[rendering.ResourceCache] = None,
+) -> None:
+    """Repaint ``regions`` of the screen with :func:`draw`, leaving the rest untouched.
+
+    The caller presents them with ``pygame.display.update(regions)``.
+    """
+
+    view = rendering.cull_rect(camera, screen.get_size())
+    enemies = spatial.overlapping(enemies, view)
+    energy_orbs = spatial.overlapping(energy_orbs, view)
+    for area in regions:
+        draw(
+            screen,
+            player,
+            platforms,
+            enemies,
+            finish_rect,
+            camera,
+            state,
+            font,
+            energy_orbs,
+            checkpoint_rect,
+            alpha,
+            static_layer,
+            cache,
+            area,
+        )
 
 
 def update_game(
     player: entities.Player,
-    platforms: List[entities.Platform],
+    platforms: Sequence[entities.Platform],
     enemies: List[entities.Enemy],
     world_size: Tuple[int, int],
     dt: float,
@@ -217,19 +435,41 @@ def update_game(
     checkpoint_rect: pygame.Rect,
     checkpoint_reached: bool,
     checkpoint_respawn: Tuple[int, int],
+    pressed_keys: Optional[Sequence[bool]] = None,
+    activation_manager: Optional[activation.ActivationManager] = None,
+    scheduler: Optional[timers.Scheduler] = None,
 ) -> Tuple[bool, Optional[Tuple[int, int]]]:
-    """Update all game entities. Returns checkpoint status and optional respawn."""
-
-    pressed_keys = pygame.key.get_pressed()
+    """Update all game entities. Returns checkpoint status and optional respawn.
+
+    ``pressed_keys`` defaults to the live keyboard state; headless callers pass
+    their own key state instead. With an ``activation_manager``, only the enemies
+    near the camera are updated and checked against the player. With a
+    ``scheduler``, collected energy orbs respawn through it instead of every orb
+    being polled each step.
+    """
+
+    if pressed_keys is None:
+        pressed_keys = pygame.key.get_pressed()
+    if scheduler is not None:
+        scheduler.advance(dt)
+    active_enemies = enemies
+    if activation_manager is not None:
+        view = pygame.Rect(compute_camera(player.rect, world_size, SCREEN_SIZE), SCREEN_SIZE)
+        active_enemies = activation_manager.update(enemies, view, platforms, dt)
+    player.store_previous_position()
+    for enemy in active_enemies:
+        enemy.store_previous_position()
     player.update(pressed_keys, jump_pressed, platforms, dt)
 
-    for enemy in list(enemies):
+    relocate = getattr(enemies, "relocate", None)
+    for enemy in list(active_enemies):
         enemy.update(platforms, dt)
         if enemy.health <= 0:
             enemies.remove(enemy)
-
-        if player.rect.colliderect(enemy.rect):
-            player.take_damage(1)
+        elif relocate is not None:
+            relocate(enemy)
+    if spatial.overlapping(enemies, player.rect):
+        player.take_damage(1)
 
     new_respawn_point: Optional[Tuple[int, int]] = None
     if checkpoint_rect.width > 0 and checkpoint_rect.height > 0 and not checkpoint_reached:
@@ -237,11 +477,13 @@ def update_game(
             checkpoint_reached = True
             new_respawn_point = checkpoint_respawn
 
-    for orb in energy_orbs:
-        orb.update(dt)
-        if orb.active and player.rect.colliderect(orb.rect):
+    if scheduler is None:
+        for orb in energy_orbs:
+            orb.update(dt)
+    for orb in spatial.overlapping(energy_orbs, player.rect):
+        if orb.active:
             player.add_double_jump_charge()
-            orb.collect()
+            orb.collect(scheduler)
 
     # Falling off the world defeats the player immediately.
     if player.rect.top > world_size[1]:
@@ -250,18 +492,71 @@ def update_game(
     return checkpoint_reached, new_respawn_point
 
 
-def run() -> None:
-    """Initialize the Pygame window and run the main loop."""
-
-    pygame.init()
+def run(
+    profile: bool = False,
+    trace_path: Optional[Path] = None,
+    level_path: Optional[Path] = None,
+    record_path: Optional[Path] = None,
+    dirty_rects: bool = False,
+    startup_report: bool = False,
+) -> None:
+    """Initialize the Pygame window and run the main loop.
+
+    With ``profile``, per-phase frame timings are recorded and graphed over the
+    HUD, and written as a Chrome trace to ``trace_path`` (if given) on exit.
+    ``level_path`` selects a chunked level directory, streamed around the player,
+    or a compiled ``.advl`` file. With ``record_path``, the input of every physics
+    step is written there for :mod:`src.game.replay`. With ``dirty_rects``, frames
+    where the camera stays still only repaint and present what moved (see
+    :class:`rendering.DirtyRegions`); a scrolling camera still redraws everything.
+
+    The window shows a loading screen before the level is built. With
+    ``startup_report``, the time taken by each startup phase (see
+    :mod:`src.game.startup`) is printed once the first frame of play is shown.
+
+    Levels loaded in full are snapshotted when loaded (see :mod:`src.game.snapshot`):
+    restarting restores that snapshot, and every frame is kept for rewinding while
+    the rewind key is held.
+    """
+
+    timeline = startup.timeline
+    timeline.run_started()
+    # Only the subsystems the game uses: pygame.init() would also start audio and joysticks.
+    pygame.display.init()
+    pygame.font.init()
     pygame.display.set_caption("Adventure Platformer")
     screen = pygame.display.set_mode(SCREEN_SIZE)
-    clock = pygame.time.Clock()
-    font = pygame.font.SysFont(None, 32)
+    timeline.mark("display")
+    # Sprites are decoded (or read from the atlas cache) while the level loads.
+    assets.manager.warm_in_background()
+    # pygame's bundled font: SysFont would scan the system fonts to find the same one.
+    font = pygame.font.Font(None, 32)
+    timeline.mark("font")
+    draw_loading_screen(screen, font)
+    pygame.display.flip()
+    timeline.mark("first_frame")
+
+    render_cache = rendering.ResourceCache()
+    dirty_regions = rendering.DirtyRegions() if dirty_rects else None
+    frame_profiler = profiler.create(profile or trace_path is not None)
+    activation_manager = activation.ActivationManager()
+    scheduler = timers.Scheduler()
+    stream = chunked.StreamingLevel(level_path) if level_path is not None and level_path.is_dir() else None
+    compiled_level = compiled.CompiledLevel(level_path) if level_path is not None and stream is None else None
+    seed = random.randrange(1 << 32)
+    random.seed(seed)
+    recorder = (
+        replay.Recorder(record_path, FIXED_DT, seed, level_path, activation_manager.radius)
+        if record_path is not None
+        else None
+    )
+    world: Optional[snapshot.WorldState] = None
+    start_state = None
+    history: Optional[snapshot.RewindBuffer] = None
 
     def reset_level() -> tuple[
         entities.Player,
-        List[entities.Platform],
+        spatial.PlatformIndex,
         List[entities.Enemy],
         pygame.Rect,
         Tuple[int, int],
@@ -269,7 +564,21 @@ def run() -> None:
         Tuple[int, int],
         List[entities.EnergyOrb],
     ]:
-        return load_level()
+        if stream is not None:
+            level = load_streamed_level(stream)
+        elif compiled_level is not None:
+            level = load_compiled_level(compiled_level)
+        else:
+            level = load_level()
+        activation_manager.sync(level[2])
+        scheduler.clear()
+        if stream is None:
+            nonlocal world, start_state, history
+            world = snapshot.WorldState(level[0], level[2], level[7], scheduler, activation_manager)
+            start_state = world.buffer()
+            world.capture(start_state, False, level[0].rect.topleft)
+            history = snapshot.RewindBuffer(world)
+        return level
 
     (
         player,
@@ -281,21 +590,43 @@ def run() -> None:
         checkpoint_respawn,
         energy_orbs,
     ) = reset_level()
+    timeline.mark("level")
+    # Chunks off screen are rendered once the first frame of play is shown.
+    static_layer = build_static_layer(world_size, platforms, checkpoint_rect, finish_rect, prerender=False)
     state = "playing"
     checkpoint_reached = False
     current_respawn = tuple(player.rect.topleft)
+    first_frame = True
+    clock = pygame.time.Clock()
+
+    accumulator = 0.0
+    alpha = 1.0
+    jump_pending = False
+    # Only kept for the recorder: attacks and restarts happen when the event arrives.
+    attack_pending = False
+    restart_pending = False
 
     running = True
     while running:
-        dt = clock.tick(60) / 1000.0
-        running, state, restart, jump_pressed = handle_events(player, enemies, state)
+        frame_time = clock.tick(FRAME_RATE) / 1000.0
+        frame_profiler.begin(profiler.HANDLE_EVENTS)
+        running, state, restart, jump_pressed, attacked = handle_events(player, enemies, state)
+        frame_profiler.end(profiler.HANDLE_EVENTS)
         if not running:
             break
+        # A jump pressed on a frame without physics steps is applied on the next step.
+        jump_pending = jump_pending or jump_pressed
+        attack_pending = attack_pending or attacked
 
         if restart:
+            if history is not None:
+                history.clear()
             if checkpoint_reached:
                 player.respawn(current_respawn)
                 state = "playing"
+            elif world is not None:
+                checkpoint_reached, current_respawn = world.restore(start_state)
+                state = "playing"
             else:
                 (
                     player,
@@ -307,53 +638,149 @@ def run() -> None:
                     checkpoint_respawn,
                     energy_orbs,
                 ) = reset_level()
+                # A streamed level only has the chunks around the player: nothing else to prerender.
+                static_layer = build_static_layer(
+                    world_size, platforms, checkpoint_rect, finish_rect, prerender=stream is None
+                )
+                if dirty_regions is not None:
+                    dirty_regions.invalidate()
                 checkpoint_reached = False
                 current_respawn = tuple(player.rect.topleft)
                 state = "playing"
+            accumulator = 0.0
+            alpha = 1.0
+            jump_pending = False
+            restart_pending = True
+            frame_profiler.end_frame()
             continue
 
-        if state == "playing":
-            checkpoint_reached, new_respawn = update_game(
-                player,
-                platforms,
-                enemies,
-                world_size,
-                dt,
-                jump_pressed,
-                energy_orbs,
-                checkpoint_rect,
-                checkpoint_reached,
-                checkpoint_respawn,
-            )
-            if new_respawn:
-                current_respawn = new_respawn
-
-            if player.is_dead:
-                state = "game_over"
-            elif player.rect.colliderect(finish_rect):
-                state = "victory"
-
-        camera = compute_camera(player.rect, world_size, screen.get_size())
-        draw(
-            screen,
-            player,
-            platforms,
-            enemies,
-            finish_rect,
-            camera,
-            state,
-            font,
-            energy_orbs,
-            checkpoint_rect,
-        )
-
+        rewinding = history is not None and pygame.key.get_pressed()[REWIND_KEY]
+        if rewinding:
+            restored = history.rewind()
+            if restored is not None:
+                checkpoint_reached, current_respawn = restored
+                state = "playing"
+            if recorder is not None:
+                recorder.record(pygame.key.get_pressed(), False, False, restart_pending, rewind=True)
+            accumulator = 0.0
+            alpha = 1.0
+            jump_pending = attack_pending = restart_pending = False
+        elif state == "playing":
+            frame_profiler.begin(profiler.UPDATE_GAME)
+            if stream is not None and stream.update(player.rect):
+                platforms = static_layer.platforms = stream.platforms
+                activation_manager.sync(enemies)
+                if dirty_regions is not None:
+                    dirty_regions.invalidate()
+            accumulator += frame_time
+            pressed_keys = pygame.key.get_pressed()
+            steps = 0
+            while accumulator >= FIXED_DT and state == "playing":
+                if steps == MAX_STEPS_PER_FRAME:
+                    # Too far behind: drop the backlog instead of spiralling.
+                    accumulator = 0.0
+                    break
+                if recorder is not None:
+                    recorder.record(pressed_keys, jump_pending, attack_pending, restart_pending, steps == 0)
+                attack_pending = restart_pending = False
+                checkpoint_reached, new_respawn = update_game(
+                    player,
+                    platforms,
+                    enemies,
+                    world_size,
+                    FIXED_DT,
+                    jump_pending,
+                    energy_orbs,
+                    checkpoint_rect,
+                    checkpoint_reached,
+                    checkpoint_respawn,
+                    pressed_keys=pressed_keys,
+                    activation_manager=activation_manager,
+                    scheduler=scheduler,
+                )
+                jump_pending = False
+                accumulator -= FIXED_DT
+                steps += 1
+                if new_respawn:
+                    current_respawn = new_respawn
+
+                if player.is_dead:
+                    state = "game_over"
+                elif player.rect.colliderect(finish_rect):
+                    state = "victory"
+            if history is not None and steps:
+                history.push(checkpoint_reached, current_respawn)
+            alpha = accumulator / FIXED_DT if state == "playing" else 1.0
+            frame_profiler.end(profiler.UPDATE_GAME)
+
+        frame_profiler.begin(profiler.COMPUTE_CAMERA)
+        camera = compute_camera(player.interpolated_rect(alpha), world_size, screen.get_size())
+        frame_profiler.end(profiler.COMPUTE_CAMERA)
+        frame_profiler.begin(profiler.DRAW)
+        regions = None
+        if dirty_regions is not None:
+            sprites = sprite_regions(player, enemies, energy_orbs, camera, screen.get_size(), alpha)
+            regions = dirty_regions.update(screen.get_size(), camera, state, sprites)
+        scene = (player, platforms, enemies, finish_rect, camera, state, font, energy_orbs, checkpoint_rect, alpha)
+        if regions is None:
+            draw(screen, *scene, static_layer, render_cache)
+        else:
+            draw_regions(regions, screen, *scene, static_layer, render_cache)
+        overlay = frame_profiler.draw_overlay(screen)
+        frame_profiler.end(profiler.DRAW)
+        frame_profiler.begin(profiler.FLIP)
+        if regions is None:
+            pygame.display.flip()
+        else:
+            if overlay is not None:
+                regions.append(overlay)
+            pygame.display.update(regions)
+        frame_profiler.end(profiler.FLIP)
+        frame_profiler.end_frame()
+        if first_frame:
+            first_frame = False
+            timeline.first_game_frame()
+            if startup_report:
+                print(timeline.format(), flush=True)
+            if stream is None:
+                static_layer.prerender()
+
+    if trace_path is not None:
+        frame_profiler.write_trace(trace_path)
+    if recorder is not None:
+        recorder.close()
+    if stream is not None:
+        stream.close()
+    if compiled_level is not None:
+        compiled_level.close()
     pygame.quit()
 
 
-def main() -> None:
+def main(argv: Optional[List[str]] = None) -> None:
     """Allow running with ``python -m src.game.main``."""
 
-    run()
+    parser = argparse.ArgumentParser(prog="python -m src.game.main", description="Adventure platformer.")
+    parser.add_argument("--profile", action="store_true", help="show per-phase frame timings over the HUD")
+    parser.add_argument("--trace", type=Path, help="write a Chrome trace of the profiled frames on exit")
+    parser.add_argument(
+        "--level", type=Path, help="chunked level directory or compiled .advl file to play instead of level 1"
+    )
+    parser.add_argument("--record", type=Path, help="record the input of the session to replay it later")
+    parser.add_argument(
+        "--dirty-rects", action="store_true", help="only repaint what moved while the camera stays still"
+    )
+    parser.add_argument(
+        "--startup-report", action="store_true", help="print how long each startup phase took once the game is shown"
+    )
+    args = parser.parse_args(argv)
+    run(
+        profile=args.profile,
+        trace_path=args.trace,
+        level_path=args.level,
+        record_path=args.record,
+        dirty_rects=args.dirty_rects,
+        startup_report=args.startup_report,
+    )
 
 
 if __name__ == "__main__":
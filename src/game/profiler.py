@@ -0,0 +1,198 @@
+"""Opt-in frame profiler for the main loop.
+
+:class:`FrameProfiler` records how long each phase of a frame takes into
+preallocated ring buffers, draws a frame-time graph with percentiles over the
+HUD and can dump the recorded frames as a Chrome trace (``chrome://tracing`` or
+https://ui.perfetto.dev). The loop has a single writer, so the buffers need no
+locking: readers only ever see whole frames behind the write index.
+
+When profiling is off, :data:`NULL_PROFILER` stands in with empty methods so the
+instrumented loop costs a few no-op calls per frame.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pygame
+
+PHASES = ("handle_events", "update_game", "compute_camera", "draw", "flip")
+HANDLE_EVENTS, UPDATE_GAME, COMPUTE_CAMERA, DRAW, FLIP = range(len(PHASES))
+FRAME_CAPACITY = 3600  # one minute of frames at 60 FPS
+
+GRAPH_SIZE = (240, 80)
+READOUT_FONT_SIZE = 18
+READOUT_LINE_HEIGHT = 14
+GRAPH_BUDGET_MS = 1000.0 / 60.0  # horizontal line drawn at the 60 FPS budget
+GRAPH_SCALE_MS = 2 * GRAPH_BUDGET_MS  # frame time mapped to the top of the graph
+READOUT_REFRESH = 30  # frames between two refreshes of the text readout
+
+
+class NullProfiler:
+    """Profiler interface that records nothing."""
+
+    enabled = False
+
+    def begin(self, phase: int) -> None:
+        pass
+
+    def end(self, phase: int) -> None:
+        pass
+
+    def end_frame(self) -> None:
+        pass
+
+    def draw_overlay(self, screen: pygame.Surface) -> Optional[pygame.Rect]:
+        return None
+
+    def write_trace(self, path: Path) -> None:
+        pass
+
+
+NULL_PROFILER = NullProfiler()
+
+
+class FrameProfiler(NullProfiler):
+    """Per-phase frame timings stored in fixed-size ring buffers.
+
+    Phases are referred to by their index in :data:`PHASES` to keep ``begin`` and
+    ``end`` free of dictionary lookups.
+    """
+
+    enabled = True
+
+    def __init__(self, capacity: int = FRAME_CAPACITY) -> None:
+        self.capacity = capacity
+        phase_count = len(PHASES)
+        # Start offsets and durations (seconds) of every phase, frame-major.
+        self._starts = array("d", bytes(8 * capacity * phase_count))
+        self._durations = array("d", bytes(8 * capacity * phase_count))
+        self._frame_starts = array("d", bytes(8 * capacity))
+        self._frame_times = array("d", bytes(8 * capacity))
+        self._phase_begin = array("d", bytes(8 * phase_count))
+        self.frames = 0  # total frames recorded; the write slot is frames % capacity
+        self._origin = time.perf_counter()
+        self._frame_start = self._origin
+        self._readout: List[pygame.Surface] = []
+        self._font: Optional[pygame.font.Font] = None
+
+    def begin(self, phase: int) -> None:
+        self._phase_begin[phase] = time.perf_counter()
+
+    def end(self, phase: int) -> None:
+        now = time.perf_counter()
+        slot = (self.frames % self.capacity) * len(PHASES) + phase
+        began = self._phase_begin[phase]
+        self._starts[slot] = began - self._origin
+        self._durations[slot] = now - began
+
+    def end_frame(self) -> None:
+        now = time.perf_counter()
+        slot = self.frames % self.capacity
+        self._frame_starts[slot] = self._frame_start - self._origin
+        self._frame_times[slot] = now - self._frame_start
+        self._frame_start = now
+        self.frames += 1
+        # Clear the next slot so phases skipped next frame (e.g. no update while paused) read as zero.
+        base = (self.frames % self.capacity) * len(PHASES)
+        for offset in range(len(PHASES)):
+            self._durations[base + offset] = 0.0
+
+    def _recent_slots(self) -> List[int]:
+        count = min(self.frames, self.capacity)
+        first = self.frames - count
+        return [(first + index) % self.capacity for index in range(count)]
+
+    def frame_times_ms(self) -> List[float]:
+        """Return recorded frame times in milliseconds, oldest first."""
+
+        return [self._frame_times[slot] * 1000.0 for slot in self._recent_slots()]
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Return p50/p95/p99/max in milliseconds for the frame and every phase."""
+
+        slots = self._recent_slots()
+        series: Dict[str, List[float]] = {"frame": [self._frame_times[slot] * 1000.0 for slot in slots]}
+        for phase, name in enumerate(PHASES):
+            series[name] = [self._durations[slot * len(PHASES) + phase] * 1000.0 for slot in slots]
+        return {name: _percentiles(values) for name, values in series.items()}
+
+    def draw_overlay(self, screen: pygame.Surface) -> Optional[pygame.Rect]:
+        """Draw a rolling frame-time graph and percentile readout in the top-right corner.
+
+        Returns the screen area covered, for partial display updates.
+        """
+
+        width, height = GRAPH_SIZE
+        panel = pygame.Rect(screen.get_width() - width - 20, 20, width, height)
+        text_height = 8 + READOUT_LINE_HEIGHT * (len(PHASES) + 1)
+        background = panel.inflate(8, 8).union(panel.move(0, text_height))
+        pygame.draw.rect(screen, (20, 20, 20), background)
+
+        times = self.frame_times_ms()[-width:]
+        for index, frame_ms in enumerate(times):
+            bar = min(height, int(frame_ms / GRAPH_SCALE_MS * height))
+            color = (90, 200, 90) if frame_ms <= GRAPH_BUDGET_MS else (230, 70, 70)
+            x = panel.right - len(times) + index
+            pygame.draw.line(screen, color, (x, panel.bottom - 1), (x, panel.bottom - bar))
+        budget_y = panel.bottom - int(GRAPH_BUDGET_MS / GRAPH_SCALE_MS * height)
+        pygame.draw.line(screen, (240, 240, 240), (panel.left, budget_y), (panel.right - 1, budget_y))
+
+        if not self._readout or self.frames % READOUT_REFRESH == 0:
+            self._readout = self._render_readout()
+        for index, surface in enumerate(self._readout):
+            screen.blit(surface, (panel.left, panel.bottom + 6 + index * READOUT_LINE_HEIGHT))
+        return background
+
+    def _render_readout(self) -> List[pygame.Surface]:
+        if self._font is None:
+            self._font = pygame.font.Font(None, READOUT_FONT_SIZE)
+        summary = self.summary()
+        frame = summary["frame"]
+        lines = [f"frame  p50 {frame['p50']:.1f} ms  p99 {frame['p99']:.1f} ms"]
+        lines.extend(f"{name}  p50 {summary[name]['p50']:.2f}  p99 {summary[name]['p99']:.2f}" for name in PHASES)
+        return [self._font.render(line, True, (240, 240, 240)) for line in lines]
+
+    def trace_events(self) -> List[dict]:
+        """Return the recorded frames as Chrome trace "complete" events."""
+
+        events: List[dict] = []
+        for slot in self._recent_slots():
+            events.append(_trace_event("frame", self._frame_starts[slot], self._frame_times[slot], 0))
+            for phase, name in enumerate(PHASES):
+                index = slot * len(PHASES) + phase
+                if self._durations[index] > 0.0:
+                    events.append(_trace_event(name, self._starts[index], self._durations[index], 1))
+        return events
+
+    def write_trace(self, path: Path) -> None:
+        """Write the recorded frames to ``path`` in Chrome's trace event format."""
+
+        trace = {"traceEvents": self.trace_events(), "displayTimeUnit": "ms"}
+        Path(path).write_text(json.dumps(trace), encoding="utf-8")
+
+
+def _trace_event(name: str, start: float, duration: float, thread: int) -> dict:
+    return {"name": name, "ph": "X", "ts": start * 1e6, "dur": duration * 1e6, "pid": 1, "tid": thread}
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    ordered = sorted(values)
+    last = len(ordered) - 1
+
+    def pick(fraction: float) -> float:
+        return ordered[min(last, round(fraction * last))]
+
+    return {"p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99), "max": ordered[-1]}
+
+
+def create(enabled: bool, capacity: int = FRAME_CAPACITY) -> NullProfiler:
+    """Return a recording profiler when ``enabled``, the shared no-op one otherwise."""
+
+    return FrameProfiler(capacity) if enabled else NULL_PROFILER
@@ -0,0 +1,324 @@
+"""Rendering helpers for the Adventure platformer."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import pygame
+
+from .entities import Platform
+
+BACKGROUND_COLOR = (135, 206, 235)  # Sky blue
+PLATFORM_COLOR = (46, 139, 87)
+CHECKPOINT_COLOR = (173, 216, 230)
+FINISH_COLOR = (255, 215, 0)
+
+CHUNK_SIZE = 512  # pixels per side of a pre-rendered chunk
+MAX_CACHED_CHUNKS = 96  # about 100 MB of 32-bit chunk surfaces
+CULL_MARGIN = 32  # pixels kept around the view so interpolated sprites never pop
+MAX_CACHED_RESOURCES = 128  # text and overlay surfaces kept by ResourceCache
+ATTACK_FADE_STEPS = 12  # distinct fade levels of the attack overlay
+
+Chunk = Tuple[int, int]
+# Screen rect of something drawn over the static layer, and a value that changes when its look does.
+Sprite = Tuple[pygame.Rect, Hashable]
+
+
+@dataclass
+class FrameStats:
+    """Per-frame render counters returned by ``draw``."""
+
+    drawn: int = 0
+    culled: int = 0
+    chunks: int = 0
+    surfaces_allocated: int = 0
+
+
+class ResourceCache:
+    """Bounded LRU cache of rendered text and overlay surfaces.
+
+    Entries are keyed by their content and size. ``misses`` counts the surfaces
+    built so far, which lets callers check that steady-state frames allocate none.
+    A cache with ``max_entries=0`` keeps nothing and rebuilds every request.
+    """
+
+    def __init__(self, max_entries: int = MAX_CACHED_RESOURCES) -> None:
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, pygame.Surface]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, build: Callable[[], pygame.Surface]) -> pygame.Surface:
+        """Return the surface stored under ``key``, building it on a miss."""
+
+        surface = self._entries.get(key)
+        if surface is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return surface
+        self.misses += 1
+        surface = build()
+        if self.max_entries > 0:
+            self._entries[key] = surface
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return surface
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def text(self, font: pygame.font.Font, text: str, color: Tuple[int, int, int]) -> pygame.Surface:
+        """Antialiased ``font.render`` output."""
+
+        return self.get(("text", font, text, color), lambda: font.render(text, True, color))
+
+    def overlay(self, size: Tuple[int, int], color: Tuple[int, int, int, int]) -> pygame.Surface:
+        """Translucent surface of ``size`` filled with ``color``."""
+
+        def build() -> pygame.Surface:
+            surface = pygame.Surface(size, pygame.SRCALPHA)
+            surface.fill(color)
+            return surface
+
+        return self.get(("overlay", tuple(size), color), build)
+
+    def attack_overlay(self, size: Tuple[int, int], facing: int, progress: float) -> pygame.Surface:
+        """Fading slash drawn over the attack hitbox; ``progress`` goes from 0 to 1."""
+
+        step = attack_fade_step(progress)
+        direction = 1 if facing >= 0 else -1
+        return self.get(
+            ("attack", tuple(size), direction, step),
+            lambda: render_attack_overlay(size, direction, step / ATTACK_FADE_STEPS),
+        )
+
+
+def attack_fade_step(progress: float) -> int:
+    """Fade level of the attack overlay, from 0 to :data:`ATTACK_FADE_STEPS`."""
+
+    return min(ATTACK_FADE_STEPS, max(0, int(progress * ATTACK_FADE_STEPS)))
+
+
+def render_attack_overlay(size: Tuple[int, int], facing: int, progress: float) -> pygame.Surface:
+    """Draw the attack indicator: a rounded glow with a slash pointing forward."""
+
+    overlay = pygame.Surface(size, pygame.SRCALPHA)
+    core_color = (255, 215, 0, int(200 - 120 * progress))
+    accent_color = (255, 255, 255, int(220 - 160 * progress))
+    pygame.draw.rect(overlay, core_color, overlay.get_rect(), border_radius=12)
+    width, height = overlay.get_size()
+    if width > 0 and height > 0:
+        if facing >= 0:
+            slash_points = [
+                (width * 0.15, height * 0.2),
+                (width * 0.95, height * 0.5),
+                (width * 0.15, height * 0.8),
+            ]
+        else:
+            slash_points = [
+                (width * 0.85, height * 0.2),
+                (width * 0.05, height * 0.5),
+                (width * 0.85, height * 0.8),
+            ]
+        pygame.draw.polygon(overlay, accent_color, slash_points)
+    return overlay
+
+
+def cull_rect(camera: pygame.Vector2, screen_size: Tuple[int, int]) -> pygame.Rect:
+    """Return the world-space area whose objects are worth drawing."""
+
+    view = pygame.Rect(int(camera.x), int(camera.y), screen_size[0], screen_size[1])
+    return view.inflate(2 * CULL_MARGIN, 2 * CULL_MARGIN)
+
+
+def render_geometry(platforms: Sequence[Platform]) -> Sequence[Platform]:
+    """Return the platforms to draw for ``platforms``, which may be merged collision boxes."""
+
+    return getattr(platforms, "render", platforms)
+
+
+def visible_platforms(platforms: Sequence[Platform], view: pygame.Rect) -> Iterator[Platform]:
+    """Yield the drawn platforms overlapping ``view``, using the broadphase when present."""
+
+    platforms = render_geometry(platforms)
+    query = getattr(platforms, "query", None)
+    candidates = (platforms[index] for index in query(view)) if query else iter(platforms)
+    for platform in candidates:
+        if platform.rect.colliderect(view):
+            yield platform
+
+
+class StaticLayer:
+    """Level geometry pre-rendered into square chunks of the world.
+
+    The background, platforms, checkpoint outline and finish zone never move, so
+    they are drawn once per chunk and each frame only blits the chunks visible
+    through the camera. Chunks are rendered on first use and kept in a bounded
+    LRU cache; :meth:`prerender` renders the whole world up front when it fits.
+    Assigning different :attr:`platforms` (a streamed level loading chunks)
+    drops the rendered chunks.
+    """
+
+    def __init__(
+        self,
+        world_size: Tuple[int, int],
+        platforms: Sequence[Platform],
+        checkpoint_rect: pygame.Rect,
+        finish_rect: pygame.Rect,
+        chunk_size: int = CHUNK_SIZE,
+        max_chunks: int = MAX_CACHED_CHUNKS,
+    ) -> None:
+        self.world_rect = pygame.Rect((0, 0), world_size)
+        self._platforms = platforms
+        self.checkpoint_rect = checkpoint_rect
+        self.finish_rect = finish_rect
+        self.chunk_size = chunk_size
+        self.max_chunks = max_chunks
+        self._chunks: "OrderedDict[Chunk, pygame.Surface]" = OrderedDict()
+
+    @property
+    def platforms(self) -> Sequence[Platform]:
+        return self._platforms
+
+    @platforms.setter
+    def platforms(self, platforms: Sequence[Platform]) -> None:
+        if platforms is not self._platforms:
+            self._platforms = platforms
+            self.invalidate()
+
+    def invalidate(self) -> None:
+        """Forget the rendered chunks; they are rendered again on next use."""
+
+        self._chunks.clear()
+
+    def prerender(self) -> None:
+        """Render every chunk of the world if they all fit in the cache."""
+
+        chunks = list(self._chunks_in(self.world_rect))
+        if len(chunks) > self.max_chunks:
+            return
+        for chunk in chunks:
+            self._get_chunk(chunk)
+
+    def draw(self, screen: pygame.Surface, camera: pygame.Vector2, area: Optional[pygame.Rect] = None) -> int:
+        """Blit the chunks intersecting the view and return how many were drawn.
+
+        With ``area`` (screen coordinates), only the chunks under it are blitted.
+        """
+
+        view = pygame.Rect(int(camera.x), int(camera.y), screen.get_width(), screen.get_height())
+        region = view if area is None else area.move(view.topleft)
+        if not self.world_rect.contains(region):
+            screen.fill(BACKGROUND_COLOR, region.move(-view.x, -view.y))
+        drawn = 0
+        for chunk in self._chunks_in(region.clip(self.world_rect)):
+            surface = self._get_chunk(chunk)
+            screen.blit(surface, (chunk[0] * self.chunk_size - view.x, chunk[1] * self.chunk_size - view.y))
+            drawn += 1
+        return drawn
+
+    def _chunks_in(self, area: pygame.Rect) -> Iterable[Chunk]:
+        if area.width <= 0 or area.height <= 0:
+            return
+        size = self.chunk_size
+        for cy in range(area.top // size, (area.bottom - 1) // size + 1):
+            for cx in range(area.left // size, (area.right - 1) // size + 1):
+                yield cx, cy
+
+    def _get_chunk(self, chunk: Chunk) -> pygame.Surface:
+        surface = self._chunks.get(chunk)
+        if surface is not None:
+            self._chunks.move_to_end(chunk)
+            return surface
+        surface = self._render_chunk(chunk)
+        self._chunks[chunk] = surface
+        if len(self._chunks) > self.max_chunks:
+            self._chunks.popitem(last=False)
+        return surface
+
+    def _render_chunk(self, chunk: Chunk) -> pygame.Surface:
+        size = self.chunk_size
+        area = pygame.Rect(chunk[0] * size, chunk[1] * size, size, size).clip(self.world_rect)
+        surface = pygame.Surface(area.size)
+        if pygame.display.get_surface():
+            surface = surface.convert()
+        surface.fill(BACKGROUND_COLOR)
+        offset = (-area.x, -area.y)
+
+        for platform in visible_platforms(self.platforms, area):
+            pygame.draw.rect(surface, PLATFORM_COLOR, platform.rect.move(offset))
+
+        if self.checkpoint_rect.width > 0 and self.checkpoint_rect.height > 0:
+            pygame.draw.rect(surface, CHECKPOINT_COLOR, self.checkpoint_rect.move(offset), 2)
+        pygame.draw.rect(surface, FINISH_COLOR, self.finish_rect.move(offset))
+        return surface
+
+
+def merge_rects(rects: Iterable[pygame.Rect]) -> List[pygame.Rect]:
+    """Union overlapping rects until no two overlap, dropping empty ones."""
+
+    merged: List[pygame.Rect] = []
+    for rect in rects:
+        if rect.width <= 0 or rect.height <= 0:
+            continue
+        rect = rect.copy()
+        index = rect.collidelist(merged)
+        while index != -1:
+            rect.union_ip(merged.pop(index))
+            index = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
+
+
+class DirtyRegions:
+    """Tracks what moved on screen between frames, to repaint and present only that.
+
+    Each frame the caller lists what it draws over the static level as
+    ``key -> (screen rect, look)``. An entry that appeared, disappeared, moved or
+    changed look is dirty, and both its old and new rects need repainting; the
+    rest of the previous frame is still correct on screen. A different camera
+    position, game state or screen size makes the whole frame dirty, as does
+    :meth:`invalidate` when something under the sprites changed.
+    """
+
+    def __init__(self) -> None:
+        self._view: Optional[Tuple[float, float, int, int]] = None
+        self._state: Optional[str] = None
+        self._sprites: Dict[Hashable, Sprite] = {}
+        self.full_frames = 0
+        self.partial_frames = 0
+
+    def invalidate(self) -> None:
+        """Repaint the whole screen next frame."""
+
+        self._view = None
+
+    def update(
+        self, screen_size: Tuple[int, int], camera: pygame.Vector2, state: str, sprites: Dict[Hashable, Sprite]
+    ) -> Optional[List[pygame.Rect]]:
+        """Record this frame's sprites and return the rects to repaint, or ``None`` for the whole screen."""
+
+        previous, self._sprites = self._sprites, sprites
+        view = (camera.x, camera.y, *screen_size)
+        if view != self._view or state != self._state:
+            self._view, self._state = view, state
+            self.full_frames += 1
+            return None
+
+        dirty: List[pygame.Rect] = []
+        for key, sprite in sprites.items():
+            old = previous.pop(key, None)
+            if old is None:
+                dirty.append(sprite[0])
+            elif old != sprite:
+                dirty.append(old[0])
+                dirty.append(sprite[0])
+        dirty.extend(rect for rect, _ in previous.values())
+        screen_rect = pygame.Rect((0, 0), screen_size)
+        self.partial_frames += 1
+        return merge_rects(rect.clip(screen_rect) for rect in dirty)
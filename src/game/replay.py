@@ -0,0 +1,326 @@
+"""Recording and replaying the player's input, one byte per simulation tick.
+
+A recording starts with a small header (timestep, random seed, level path,
+activation radius and collision mode) followed by a bitmask per fixed step
+giving the input that step saw: left and right held, jump, attack and restart
+presses, and whether the step was the first of a rendered frame. Frames spent
+rewinding are recorded as ticks of their own, which do not step. Replaying it
+through :class:`~src.game.sim.Simulation` reproduces the session exactly::
+
+    python -m src.game.main --record session.adrp
+    python -m src.game.replay session.adrp                 # watch it again
+    python -m src.game.replay session.adrp --fast-forward  # no rendering, JSON report
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import struct
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Iterator, List, Optional, Sequence, Tuple
+
+import pygame
+
+from . import entities
+
+if TYPE_CHECKING:
+    from .sim import Simulation, TickInput
+
+MAGIC = b"ADRP"
+VERSION = 1
+# magic, version, dt, seed, activation radius (-1: every enemy), collision mode, level path length
+HEADER = struct.Struct("<4sHdQiBH")
+
+# Bits of a tick.
+LEFT = 1 << 0
+RIGHT = 1 << 1
+JUMP = 1 << 2
+ATTACK = 1 << 3
+RESTART = 1 << 4  # restart from the checkpoint (or the start) before stepping
+FRAME_START = 1 << 5  # first step of a rendered frame
+REWIND = 1 << 6  # a frame spent rewinding instead of stepping
+
+
+def encode_tick(
+    pressed_keys: Sequence[bool],
+    jump: bool,
+    attack: bool,
+    restart: bool = False,
+    frame_start: bool = False,
+    rewind: bool = False,
+) -> int:
+    """Pack the input of one step into a tick bitmask."""
+
+    mask = 0
+    if pressed_keys[pygame.K_LEFT] or pressed_keys[pygame.K_a]:
+        mask |= LEFT
+    if pressed_keys[pygame.K_RIGHT] or pressed_keys[pygame.K_d]:
+        mask |= RIGHT
+    if jump:
+        mask |= JUMP
+    if attack:
+        mask |= ATTACK
+    if restart:
+        mask |= RESTART
+    if frame_start:
+        mask |= FRAME_START
+    if rewind:
+        mask |= REWIND
+    return mask
+
+
+@dataclass
+class Recording:
+    """A decoded recording: the session settings and one bitmask per tick."""
+
+    dt: float
+    seed: int
+    level_path: Optional[Path]
+    activation_radius: Optional[int]
+    collision_mode: str
+    ticks: bytes
+
+    @classmethod
+    def load(cls, path: Path) -> "Recording":
+        data = Path(path).read_bytes()
+        if len(data) < HEADER.size:
+            raise ValueError(f"{path} is too short to be a recording")
+        magic, version, dt, seed, radius, mode, path_length = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a recording")
+        if version != VERSION:
+            raise ValueError(f"{path} uses recording version {version}, expected {VERSION}")
+        level = data[HEADER.size : HEADER.size + path_length].decode("utf-8")
+        return cls(
+            dt,
+            seed,
+            Path(level) if level else None,
+            radius if radius >= 0 else None,
+            entities.COLLISION_MODES[mode],
+            data[HEADER.size + path_length :],
+        )
+
+    @property
+    def duration(self) -> float:
+        return len(self.ticks) * self.dt
+
+    def inputs(self) -> Iterator[Tuple["TickInput", int]]:
+        """Yield the simulation input of every tick with its bitmask."""
+
+        from .sim import KeyState, TickInput
+
+        # Only 128 masks are possible, so the inputs are built once and shared.
+        decoded: List[Optional[TickInput]] = [None] * (REWIND << 1)
+        for mask in self.ticks:
+            tick = decoded[mask]
+            if tick is None:
+                held = frozenset(key for bit, key in ((LEFT, pygame.K_LEFT), (RIGHT, pygame.K_RIGHT)) if mask & bit)
+                tick = decoded[mask] = TickInput(KeyState(held), bool(mask & JUMP), bool(mask & ATTACK))
+            yield tick, mask
+
+
+class Recorder:
+    """Write a recording as the game runs; one :meth:`record` call per fixed step."""
+
+    def __init__(
+        self,
+        path: Path,
+        dt: float,
+        seed: int,
+        level_path: Optional[Path] = None,
+        activation_radius: Optional[int] = None,
+        collision_mode: Optional[str] = None,
+    ) -> None:
+        level = str(level_path).encode("utf-8") if level_path is not None else b""
+        mode = entities.COLLISION_MODES.index(collision_mode or entities.Entity.collision_mode)
+        radius = activation_radius if activation_radius is not None else -1
+        self._file: BinaryIO = open(path, "wb")
+        self._file.write(HEADER.pack(MAGIC, VERSION, dt, seed, radius, mode, len(level)))
+        self._file.write(level)
+        self.ticks = 0
+
+    def record(
+        self,
+        pressed_keys: Sequence[bool],
+        jump: bool,
+        attack: bool,
+        restart: bool = False,
+        frame_start: bool = False,
+        rewind: bool = False,
+    ) -> None:
+        self._file.write(bytes((encode_tick(pressed_keys, jump, attack, restart, frame_start, rewind),)))
+        self.ticks += 1
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "Recorder":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+def open_simulation(recording: Recording) -> "Simulation":
+    """Create the simulation a recording was made against, seeded the same way."""
+
+    from . import snapshot
+    from .levels import chunked, compiled
+    from .sim import Simulation
+
+    entities.Entity.collision_mode = recording.collision_mode
+    random.seed(recording.seed)
+    level = recording.level_path
+    stream = chunked.StreamingLevel(level) if level is not None and level.is_dir() else None
+    compiled_level = compiled.CompiledLevel(level) if level is not None and stream is None else None
+    return Simulation(
+        stream=stream,
+        compiled_level=compiled_level,
+        activation_radius=recording.activation_radius,
+        rewind_frames=snapshot.REWIND_FRAMES,
+    )
+
+
+def close_simulation(simulation: "Simulation") -> None:
+    if simulation.stream is not None:
+        simulation.stream.close()
+    if simulation.compiled_level is not None:
+        simulation.compiled_level.close()
+
+
+class Playback:
+    """Feed the ticks of a recording to its simulation, one :meth:`apply` call per tick."""
+
+    def __init__(self, recording: Recording) -> None:
+        self.recording = recording
+        self.simulation = open_simulation(recording)
+        self._frame_stepped = False
+
+    def apply(self, tick: "TickInput", mask: int) -> None:
+        simulation = self.simulation
+        if mask & (FRAME_START | REWIND) and self._frame_stepped:
+            # The game saves a frame for rewinding once its steps are done.
+            simulation.save_frame()
+            self._frame_stepped = False
+        if mask & RESTART:
+            simulation.restart()
+        if mask & REWIND:
+            simulation.rewind()
+            return
+        if mask & FRAME_START:
+            simulation.begin_frame()
+        simulation.step(tick, self.recording.dt)
+        self._frame_stepped = True
+
+
+def fast_forward(recording: Recording) -> "Simulation":
+    """Run every tick of ``recording`` without rendering and return the simulation."""
+
+    playback = Playback(recording)
+    for tick, mask in recording.inputs():
+        playback.apply(tick, mask)
+    return playback.simulation
+
+
+def watch(recording: Recording, speed: float = 1.0) -> None:
+    """Play ``recording`` back in a window, one drawn frame per recorded frame."""
+
+    from . import assets, rendering
+    from . import main as game
+
+    pygame.display.init()
+    pygame.font.init()
+    pygame.display.set_caption("Adventure Platformer - replay")
+    # Created before importing the simulation, which selects the dummy video driver if none is set.
+    screen = pygame.display.set_mode(game.SCREEN_SIZE)
+    assets.manager.warm_in_background()
+    playback = Playback(recording)
+    simulation = playback.simulation
+    clock = pygame.time.Clock()
+    font = pygame.font.Font(None, 32)
+    render_cache = rendering.ResourceCache()
+    static_layer = None
+    frame_rate = game.FRAME_RATE * speed
+
+    def show() -> bool:
+        nonlocal static_layer
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                return False
+        if static_layer is None or static_layer.finish_rect is not simulation.finish_rect:
+            static_layer = game.build_static_layer(
+                simulation.world_size,
+                simulation.platforms,
+                simulation.checkpoint_rect,
+                simulation.finish_rect,
+                prerender=simulation.stream is None,
+            )
+        static_layer.platforms = simulation.platforms
+        camera = game.compute_camera(simulation.player.rect, simulation.world_size, screen.get_size())
+        game.draw(
+            screen,
+            simulation.player,
+            simulation.platforms,
+            simulation.enemies,
+            simulation.finish_rect,
+            camera,
+            simulation.state,
+            font,
+            simulation.energy_orbs,
+            simulation.checkpoint_rect,
+            1.0,
+            static_layer,
+            render_cache,
+        )
+        pygame.display.flip()
+        clock.tick(frame_rate)
+        return True
+
+    running = True
+    for tick, mask in recording.inputs():
+        if mask & (FRAME_START | REWIND) and simulation.ticks:
+            running = show()
+            if not running:
+                break
+        playback.apply(tick, mask)
+    while running and show():
+        pass
+    close_simulation(simulation)
+    pygame.quit()
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m src.game.replay", description="Replay a recorded session.")
+    parser.add_argument("recording", type=Path, help="file written by python -m src.game.main --record")
+    parser.add_argument(
+        "--fast-forward", action="store_true", help="simulate without rendering and print a JSON report"
+    )
+    parser.add_argument("--speed", type=float, default=1.0, help="playback speed when watching")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    recording = Recording.load(args.recording)
+    if not args.fast_forward:
+        watch(recording, args.speed)
+        return 0
+
+    start = time.perf_counter()
+    simulation = fast_forward(recording)
+    wall_time = time.perf_counter() - start
+    close_simulation(simulation)
+    report = simulation.report()
+    report["wall_time"] = round(wall_time, 6)
+    report["speedup"] = round(simulation.time / wall_time, 1) if wall_time > 0 else None
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,351 @@
+"""Headless simulation of the Adventure platformer.
+
+Steps :func:`~src.game.main.update_game` at a fixed ``dt`` from a scripted input
+source, without opening a window, loading a font or capping the frame rate::
+
+    python -m src.game.sim --script "right:1.2,right+jump:0.2,right:6" --max-time 30
+
+The run ends on victory, on defeat (unless ``--auto-restart`` is given) or after
+``--max-time`` simulated seconds, and prints a JSON report. ``--expect`` turns the
+outcome into an exit status for CI.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import FrozenSet, Iterator, List, Optional, Tuple
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame  # noqa: E402
+
+from . import activation, entities, snapshot, timers  # noqa: E402
+from . import main as game  # noqa: E402
+from .levels import chunked, compiled, level1  # noqa: E402
+
+DEFAULT_DT = game.FIXED_DT
+
+# Actions understood by the input scripts and the keys they hold down.
+ACTION_KEYS = {
+    "left": (pygame.K_LEFT,),
+    "right": (pygame.K_RIGHT,),
+}
+TRIGGER_ACTIONS = ("jump", "attack")
+IDLE_ACTION = "idle"
+
+
+class KeyState:
+    """Minimal stand-in for ``pygame.key.get_pressed()`` backed by a set of keys."""
+
+    __slots__ = ("held",)
+
+    def __init__(self, held: FrozenSet[int] = frozenset()) -> None:
+        self.held = held
+
+    def __getitem__(self, key: int) -> bool:
+        return key in self.held
+
+
+@dataclass(frozen=True)
+class TickInput:
+    """Input applied during one simulation tick."""
+
+    keys: KeyState
+    jump: bool = False
+    attack: bool = False
+
+
+@dataclass(frozen=True)
+class ScriptSegment:
+    actions: FrozenSet[str]
+    duration: float
+
+
+class InputScript:
+    """Scripted input source made of ``action[+action]:seconds`` segments.
+
+    ``left`` and ``right`` are held for the whole segment, ``jump`` and ``attack``
+    fire on its first tick (like a key press), ``idle`` does nothing. Segments are
+    separated by commas or newlines; a segment without a duration lasts one tick.
+    """
+
+    def __init__(self, segments: List[ScriptSegment]) -> None:
+        self.segments = segments
+
+    @classmethod
+    def parse(cls, text: str) -> "InputScript":
+        segments: List[ScriptSegment] = []
+        for raw in text.replace("\n", ",").split(","):
+            raw = raw.split("#", 1)[0].strip()
+            if not raw:
+                continue
+            names, _, duration = raw.partition(":")
+            actions = frozenset(name.strip().lower() for name in names.split("+") if name.strip())
+            unknown = actions - set(ACTION_KEYS) - set(TRIGGER_ACTIONS) - {IDLE_ACTION}
+            if unknown:
+                raise ValueError(f"Unknown action(s) in input script: {', '.join(sorted(unknown))}")
+            segments.append(ScriptSegment(actions, float(duration) if duration else 0.0))
+        return cls(segments)
+
+    @classmethod
+    def load(cls, value: str) -> "InputScript":
+        """Parse ``value``, or the file it names if it is the path of one."""
+
+        path = Path(value)
+        if path.suffix and path.is_file():
+            value = path.read_text(encoding="utf-8")
+        return cls.parse(value)
+
+    @property
+    def duration(self) -> float:
+        return sum(segment.duration for segment in self.segments)
+
+    def ticks(self, dt: float) -> Iterator[TickInput]:
+        """Yield the input for every tick of the script, then idle forever."""
+
+        for segment in self.segments:
+            held = frozenset(key for action in segment.actions for key in ACTION_KEYS.get(action, ()))
+            keys = KeyState(held)
+            count = max(1, round(segment.duration / dt))
+            yield TickInput(keys, "jump" in segment.actions, "attack" in segment.actions)
+            hold = TickInput(keys)
+            for _ in range(count - 1):
+                yield hold
+        idle = TickInput(KeyState())
+        while True:
+            yield idle
+
+
+class Simulation:
+    """Game state driven by explicit inputs instead of pygame events."""
+
+    def __init__(
+        self,
+        level_data: Optional[level1.LevelData] = None,
+        auto_restart: bool = False,
+        stream: Optional[chunked.StreamingLevel] = None,
+        compiled_level: Optional[compiled.CompiledLevel] = None,
+        activation_radius: Optional[int] = None,
+        rewind_frames: int = 0,
+    ) -> None:
+        self.level_data = level_data
+        self.auto_restart = auto_restart
+        self.stream = stream
+        self.compiled_level = compiled_level
+        # Without a radius every enemy is simulated; the game window uses ACTIVATION_RADIUS.
+        self.activation_manager = (
+            activation.ActivationManager(activation_radius) if activation_radius is not None else None
+        )
+        self.scheduler = timers.Scheduler()
+        self.rewind_frames = rewind_frames
+        self.world: Optional[snapshot.WorldState] = None
+        self.history: Optional[snapshot.RewindBuffer] = None
+        self.time = 0.0
+        self.ticks = 0
+        self.deaths = 0
+        self.falls = 0
+        self._reset_level()
+
+    def _reset_level(self) -> None:
+        if self.stream is not None:
+            level = game.load_streamed_level(self.stream)
+        elif self.compiled_level is not None:
+            level = game.load_compiled_level(self.compiled_level)
+        else:
+            level = game.load_level(self.level_data)
+        (
+            self.player,
+            self.platforms,
+            self.enemies,
+            self.finish_rect,
+            self.world_size,
+            self.checkpoint_rect,
+            self.checkpoint_respawn,
+            self.energy_orbs,
+        ) = level
+        if self.activation_manager is not None:
+            self.activation_manager.sync(self.enemies)
+        self.scheduler.clear()
+        self.state = "playing"
+        self.checkpoint_reached = False
+        self.current_respawn: Tuple[int, int] = tuple(self.player.rect.topleft)
+        if self.stream is None:
+            # Restarting restores this snapshot instead of loading the level again.
+            self.world = snapshot.WorldState(
+                self.player, self.enemies, self.energy_orbs, self.scheduler, self.activation_manager
+            )
+            self._start_state = self.world.buffer()
+            self.world.capture(self._start_state, False, self.current_respawn)
+            if self.rewind_frames:
+                self.history = snapshot.RewindBuffer(self.world, self.rewind_frames)
+
+    def restart(self) -> None:
+        """Restart from the last checkpoint, like pressing ``R`` after a defeat."""
+
+        if self.history is not None:
+            self.history.clear()
+        if self.checkpoint_reached:
+            self.player.respawn(self.current_respawn)
+            self.state = "playing"
+        elif self.world is not None:
+            self.checkpoint_reached, self.current_respawn = self.world.restore(self._start_state)
+            self.state = "playing"
+        else:
+            self._reset_level()
+
+    def save_frame(self) -> None:
+        """Add the current state to the rewind history (needs ``rewind_frames``)."""
+
+        if self.history is not None:
+            self.history.push(self.checkpoint_reached, self.current_respawn)
+
+    def rewind(self) -> bool:
+        """Go back one saved frame, like holding the rewind key; return whether there was one."""
+
+        restored = self.history.rewind() if self.history is not None else None
+        if restored is None:
+            return False
+        self.checkpoint_reached, self.current_respawn = restored
+        self.state = "playing"
+        return True
+
+    def begin_frame(self) -> None:
+        """Load the chunks around the player, as the game does before the steps of each rendered frame."""
+
+        if self.state != "playing" or self.stream is None:
+            return
+        if self.stream.update(self.player.rect):
+            self.platforms = self.stream.platforms
+            if self.activation_manager is not None:
+                self.activation_manager.sync(self.enemies)
+
+    def step(self, tick: TickInput, dt: float = DEFAULT_DT) -> str:
+        """Advance the simulation by one tick and return the game state."""
+
+        if self.state != "playing":
+            return self.state
+
+        if tick.attack:
+            game.perform_attack(self.player, self.enemies)
+
+        self.checkpoint_reached, new_respawn = game.update_game(
+            self.player,
+            self.platforms,
+            self.enemies,
+            self.world_size,
+            dt,
+            tick.jump,
+            self.energy_orbs,
+            self.checkpoint_rect,
+            self.checkpoint_reached,
+            self.checkpoint_respawn,
+            pressed_keys=tick.keys,
+            activation_manager=self.activation_manager,
+            scheduler=self.scheduler,
+        )
+        if new_respawn:
+            self.current_respawn = new_respawn
+        self.time += dt
+        self.ticks += 1
+
+        if self.player.is_dead:
+            self.deaths += 1
+            if self.player.rect.top > self.world_size[1]:
+                self.falls += 1
+            self.state = "game_over"
+            if self.auto_restart:
+                self.restart()
+        elif self.player.rect.colliderect(self.finish_rect):
+            self.state = "victory"
+        return self.state
+
+    def run(self, inputs: Iterator[TickInput], max_time: float, dt: float = DEFAULT_DT) -> str:
+        """Step until victory, defeat (without auto restart) or ``max_time`` elapses.
+
+        Without a window every step is a frame of its own, so :meth:`begin_frame` runs before each one.
+        """
+
+        max_ticks = int(round(max_time / dt))
+        while self.ticks < max_ticks and self.state == "playing":
+            self.begin_frame()
+            self.step(next(inputs), dt)
+        return self.state
+
+    def report(self) -> dict:
+        outcome = self.state if self.state != "playing" else "timeout"
+        return {
+            "outcome": outcome,
+            "sim_time": round(self.time, 6),
+            "ticks": self.ticks,
+            "deaths": self.deaths,
+            "falls": self.falls,
+            "checkpoint_reached": self.checkpoint_reached,
+            "player": list(self.player.rect.topleft),
+            "health": self.player.health,
+            "enemies_remaining": len(self.enemies),
+        }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m src.game.sim", description="Run the game without a window.")
+    parser.add_argument("--script", default="right:60", help="input script, or path to a file containing one")
+    parser.add_argument("--level", type=Path, help="chunked level directory or compiled .advl file instead of level 1")
+    parser.add_argument("--dt", type=float, default=DEFAULT_DT, help="fixed timestep in seconds")
+    parser.add_argument("--max-time", type=float, default=None, help="simulated seconds before giving up")
+    parser.add_argument(
+        "--collision",
+        choices=entities.COLLISION_MODES,
+        default=entities.Entity.collision_mode,
+        help="collision engine; use 'swept' with large --dt values",
+    )
+    parser.add_argument(
+        "--activation-radius",
+        type=int,
+        help="only simulate enemies within this many pixels of the camera view (the game uses %d)"
+        % activation.ACTIVATION_RADIUS,
+    )
+    parser.add_argument("--auto-restart", action="store_true", help="restart from the checkpoint after a defeat")
+    parser.add_argument("--expect", choices=("victory", "game_over", "timeout"), help="exit with status 1 otherwise")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    entities.Entity.collision_mode = args.collision
+    script = InputScript.load(args.script)
+    max_time = args.max_time if args.max_time is not None else max(script.duration, args.dt)
+
+    stream = chunked.StreamingLevel(args.level) if args.level is not None and args.level.is_dir() else None
+    compiled_level = compiled.CompiledLevel(args.level) if args.level is not None and stream is None else None
+    simulation = Simulation(
+        auto_restart=args.auto_restart,
+        stream=stream,
+        compiled_level=compiled_level,
+        activation_radius=args.activation_radius,
+    )
+    start = time.perf_counter()
+    simulation.run(script.ticks(args.dt), max_time, args.dt)
+    wall_time = time.perf_counter() - start
+    if stream is not None:
+        stream.close()
+    if compiled_level is not None:
+        compiled_level.close()
+
+    report = simulation.report()
+    report["wall_time"] = round(wall_time, 6)
+    report["speedup"] = round(simulation.time / wall_time, 1) if wall_time > 0 else None
+    print(json.dumps(report, indent=2))
+    if args.expect and report["outcome"] != args.expect:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
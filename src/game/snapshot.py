@@ -0,0 +1,321 @@
+"""Saving and restoring the mutable state of a level in flat float buffers.
+
+A loaded level is mostly immutable (platforms, zones, sizes); what changes while
+playing is the player, the enemies, the energy orbs, the scheduler and
+activation clocks, and the checkpoint progress. :class:`WorldState` lays that
+state out at fixed offsets so a snapshot is a slice of an ``array('d')``:
+capturing writes the objects' fields into it and restoring writes them back into
+the same objects, without reloading the level. Restarting a level is then a
+restore of the snapshot taken when it was loaded, and :class:`RewindBuffer`
+keeps the last few seconds of frames in one preallocated buffer.
+
+Streamed levels load and drop enemies as the player moves, so they cannot be
+captured and keep reloading on restart.
+"""
+
+from __future__ import annotations
+
+import struct
+from array import array
+from typing import List, Optional, Tuple
+
+import pygame
+
+from .activation import ActivationManager
+from .entities import Enemy, EnergyOrb, Player
+from .timers import Scheduler, Timer
+
+REWIND_FRAMES = 300  # frames kept for rewinding, five seconds at 60 images per second
+REWIND_MEMORY = 64 * 1024 * 1024  # bytes at most for the rewind frames; huge levels keep fewer
+
+# scheduler clock, activation clock, checkpoint reached, respawn point, camera
+_GLOBALS = struct.Struct("<7d")
+# rect, velocity, remainder, previous position, on ground, clock, facing, health,
+# double jump charges, air jump performed, coyote timer, the four countdown
+# deadlines and the last attack rect
+_PLAYER = struct.Struct("<23d")
+# rect, velocity, remainder, previous position, on ground, direction, facing,
+# health and the time it fell asleep (negative while awake)
+_ENEMY = struct.Struct("<13d")
+# active, polled respawn timer, scheduled respawn time (negative if none)
+_ORB = struct.Struct("<3d")
+
+
+class WorldState:
+    """Fixed layout of a level's mutable state, captured into and restored from buffers.
+
+    The enemies and orbs are those of the level when it is built; enemies later
+    defeated are put back into ``enemies`` by :meth:`restore` if they were alive in
+    the snapshot. A snapshot takes :attr:`size` floats. Restoring reuses the same
+    objects every time (one respawn timer per orb, scratch lists), so holding the
+    rewind key does not allocate as it goes.
+    """
+
+    def __init__(
+        self,
+        player: Player,
+        enemies: List[Enemy],
+        energy_orbs: List[EnergyOrb],
+        scheduler: Optional[Scheduler] = None,
+        activation_manager: Optional[ActivationManager] = None,
+    ) -> None:
+        self.player = player
+        self.enemies = enemies
+        self.scheduler = scheduler
+        self.activation_manager = activation_manager
+        self._roster = list(enemies)
+        self._orbs = list(energy_orbs)
+        self._timers = [Timer(0.0, orb.respawn) for orb in self._orbs]
+        # Scratch space for restore: when each enemy fell asleep, moved enemies, orb timers to schedule.
+        self._since = array("d", [-1.0]) * len(self._roster)
+        self._moved: List[Enemy] = []
+        self._waiting: List[Timer] = []
+        self._enemies_offset = _GLOBALS.size + _PLAYER.size
+        self._orbs_offset = self._enemies_offset + _ENEMY.size * len(self._roster)
+        self.size = (self._orbs_offset + _ORB.size * len(self._orbs)) // 8
+
+    def buffer(self, count: int = 1) -> array:
+        """Allocate room for ``count`` snapshots."""
+
+        return array("d", bytes(8 * self.size * count))
+
+    def capture(
+        self,
+        buffer: array,
+        checkpoint_reached: bool,
+        respawn: Tuple[int, int],
+        camera: Optional[pygame.Vector2] = None,
+        index: int = 0,
+    ) -> None:
+        """Write the current state into snapshot ``index`` of ``buffer``."""
+
+        base = index * self.size * 8
+        scheduler, manager = self.scheduler, self.activation_manager
+        camera_x, camera_y = camera if camera is not None else (0.0, 0.0)
+        _GLOBALS.pack_into(
+            buffer,
+            base,
+            scheduler.now if scheduler is not None else 0.0,
+            manager.time if manager is not None else 0.0,
+            checkpoint_reached,
+            respawn[0],
+            respawn[1],
+            camera_x,
+            camera_y,
+        )
+
+        player = self.player
+        rect, attack = player.rect, player.last_attack_rect
+        _PLAYER.pack_into(
+            buffer,
+            base + _GLOBALS.size,
+            rect.x,
+            rect.y,
+            *player.velocity,
+            *player.remainder,
+            *player.previous_position,
+            player.on_ground,
+            player.clock,
+            player.facing,
+            player.health,
+            player.double_jump_charges,
+            player.air_jump_performed,
+            player.coyote_timer,
+            player._attack_timer_deadline,
+            player._attack_indicator_timer_deadline,
+            player._invulnerability_timer_deadline,
+            player._jump_buffer_timer_deadline,
+            attack.x,
+            attack.y,
+            attack.width,
+            attack.height,
+        )
+
+        offset = base + self._enemies_offset
+        pack = _ENEMY.pack_into
+        asleep_since = manager.asleep_since if manager is not None else None
+        for enemy in self._roster:
+            since = asleep_since(enemy) if asleep_since is not None else None
+            rect = enemy.rect
+            pack(
+                buffer,
+                offset,
+                rect.x,
+                rect.y,
+                *enemy.velocity,
+                *enemy.remainder,
+                *enemy.previous_position,
+                enemy.on_ground,
+                enemy.direction,
+                enemy.facing,
+                enemy.health,
+                since if since is not None else -1.0,
+            )
+            offset += _ENEMY.size
+
+        pack = _ORB.pack_into
+        for orb in self._orbs:
+            timer = orb.respawn_timer
+            pack(buffer, offset, orb.active, orb.timer, timer.due if timer is not None and timer.pending else -1.0)
+            offset += _ORB.size
+
+    def restore(
+        self, buffer: array, camera: Optional[pygame.Vector2] = None, index: int = 0
+    ) -> Tuple[bool, Tuple[int, int]]:
+        """Write snapshot ``index`` of ``buffer`` back into the level's objects.
+
+        Returns whether the checkpoint was reached and the respawn point; ``camera``
+        is moved to the saved camera position if given.
+        """
+
+        base = index * self.size * 8
+        scheduler, manager = self.scheduler, self.activation_manager
+        now, time, checkpoint_reached, respawn_x, respawn_y, camera_x, camera_y = _GLOBALS.unpack_from(buffer, base)
+        if camera is not None:
+            camera.update(camera_x, camera_y)
+
+        player = self.player
+        (
+            x,
+            y,
+            player.velocity.x,
+            player.velocity.y,
+            player.remainder.x,
+            player.remainder.y,
+            previous_x,
+            previous_y,
+            on_ground,
+            player.clock,
+            facing,
+            health,
+            charges,
+            air_jump,
+            player.coyote_timer,
+            player._attack_timer_deadline,
+            player._attack_indicator_timer_deadline,
+            player._invulnerability_timer_deadline,
+            player._jump_buffer_timer_deadline,
+            attack_x,
+            attack_y,
+            attack_width,
+            attack_height,
+        ) = _PLAYER.unpack_from(buffer, base + _GLOBALS.size)
+        player.rect.topleft = (int(x), int(y))
+        player.previous_position.update(previous_x, previous_y)
+        player.on_ground = bool(on_ground)
+        player.facing = int(facing)
+        player.health = int(health)
+        player.double_jump_charges = int(charges)
+        player.air_jump_performed = bool(air_jump)
+        player.last_attack_rect.update(int(attack_x), int(attack_y), int(attack_width), int(attack_height))
+
+        offset = base + self._enemies_offset
+        unpack = _ENEMY.unpack_from
+        membership_changed = False
+        moved, asleep_since = self._moved, self._since
+        moved.clear()
+        for position, enemy in enumerate(self._roster):
+            was_alive = enemy.health > 0
+            (
+                x,
+                y,
+                enemy.velocity.x,
+                enemy.velocity.y,
+                enemy.remainder.x,
+                enemy.remainder.y,
+                previous_x,
+                previous_y,
+                on_ground,
+                direction,
+                facing,
+                health,
+                since,
+            ) = unpack(buffer, offset)
+            offset += _ENEMY.size
+            rect = enemy.rect
+            if rect.x != x or rect.y != y:
+                rect.topleft = (int(x), int(y))
+                moved.append(enemy)
+            enemy.previous_position.update(previous_x, previous_y)
+            enemy.on_ground = bool(on_ground)
+            enemy.direction = int(direction)
+            enemy.facing = int(facing)
+            enemy.health = int(health)
+            membership_changed = membership_changed or was_alive != (enemy.health > 0)
+            asleep_since[position] = since
+
+        enemies = self.enemies
+        if membership_changed:
+            enemies.clear()
+            enemies.extend(enemy for enemy in self._roster if enemy.health > 0)
+        else:
+            relocate = getattr(enemies, "relocate", None)
+            if relocate is not None:
+                for enemy in moved:
+                    relocate(enemy)
+        moved.clear()
+        if manager is not None:
+            manager.restore(enemies, time, self._roster, asleep_since)
+
+        unpack = _ORB.unpack_from
+        waiting = self._waiting
+        waiting.clear()
+        for orb, timer in zip(self._orbs, self._timers):
+            active, orb.timer, due = unpack(buffer, offset)
+            offset += _ORB.size
+            orb.active = bool(active)
+            orb.respawn_timer = None
+            if due >= 0 and scheduler is not None:
+                timer.due = due
+                orb.respawn_timer = timer
+                waiting.append(timer)
+        if scheduler is not None:
+            # The orbs' timers are the scheduler's whole queue in a snapshot.
+            scheduler.restore(now, waiting)
+            waiting.clear()
+
+        return bool(checkpoint_reached), (int(respawn_x), int(respawn_y))
+
+
+class RewindBuffer:
+    """Ring of the last ``capacity`` snapshots of a :class:`WorldState`, stored in one buffer.
+
+    The capacity is lowered so the buffer stays within :data:`REWIND_MEMORY`.
+    """
+
+    def __init__(self, world: WorldState, capacity: int = REWIND_FRAMES) -> None:
+        self.world = world
+        self.capacity = max(1, min(capacity, REWIND_MEMORY // (world.size * 8)))
+        self._frames = world.buffer(self.capacity)
+        self._newest = -1
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def push(
+        self, checkpoint_reached: bool, respawn: Tuple[int, int], camera: Optional[pygame.Vector2] = None
+    ) -> None:
+        """Capture the current state, overwriting the oldest frame when full."""
+
+        self._newest = (self._newest + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+        self.world.capture(self._frames, checkpoint_reached, respawn, camera, self._newest)
+
+    def rewind(self, camera: Optional[pygame.Vector2] = None) -> Optional[Tuple[bool, Tuple[int, int]]]:
+        """Step back one frame and restore it; the oldest frame is kept once reached.
+
+        Returns what :meth:`WorldState.restore` returns, or ``None`` when empty.
+        """
+
+        if not self._count:
+            return None
+        if self._count > 1:
+            # The newest frame is the present; go back to the one before it.
+            self._newest = (self._newest - 1) % self.capacity
+            self._count -= 1
+        return self.world.restore(self._frames, camera, self._newest)
+
+    def clear(self) -> None:
+        self._newest = -1
+        self._count = 0
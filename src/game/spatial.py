@@ -0,0 +1,303 @@
+"""Spatial indexes used to speed up collision queries."""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar, overload
+
+import pygame
+
+from .entities import Platform
+
+CELL_SIZE = 128  # pixels per grid cell side
+
+Cell = Tuple[int, int]
+Span = Tuple[int, int, int, int]  # first and last covered cell on each axis
+T = TypeVar("T")
+
+
+class PlatformIndex(Sequence[Platform]):
+    """Uniform grid broadphase over static platforms.
+
+    The index behaves like the list of platforms it was built from, so it can be
+    passed anywhere a ``Sequence[Platform]`` is expected. ``query`` returns the
+    indices of the platforms whose rect touches a cell covered by the given area,
+    in the original list order so that collision resolution stays identical to a
+    linear scan.
+
+    Platforms are stored as rows of a shared ``int32`` array (:attr:`rects`) and
+    the grid as flat arrays of cells and platform indices grouped by column, so a
+    level costs a few dozen bytes per platform.
+    :class:`Platform` objects are created the first time an index is looked up
+    and reused afterwards; build the index with :meth:`from_rects` to skip
+    creating them up front.
+
+    :attr:`render` holds the platforms to draw, which are the index itself unless
+    it was built from merged collision boxes (see :mod:`src.game.levels.collision`).
+    """
+
+    def __init__(self, platforms: Iterable[Platform], cell_size: int = CELL_SIZE) -> None:
+        self.render: Sequence[Platform] = self
+        self._platforms: Dict[int, Platform] = {}
+        rects = []
+        for index, platform in enumerate(platforms):
+            self._platforms[index] = platform
+            rects.append(tuple(platform.rect))
+        self._build(rects, cell_size)
+
+    @classmethod
+    def from_rects(
+        cls, rects: Iterable[Sequence[int]], cell_size: int = CELL_SIZE, render: Optional[Sequence[Platform]] = None
+    ) -> "PlatformIndex":
+        """Build the index from ``(x, y, width, height)`` rows without creating platforms."""
+
+        index = cls.__new__(cls)
+        index.render = render if render is not None else index
+        index._platforms = {}
+        index._build(rects, cell_size)
+        return index
+
+    def _build(self, rects: Iterable[Sequence[int]], cell_size: int) -> None:
+        self.cell_size = cell_size
+        self.rects = array("i")
+        buckets: Dict[Cell, array] = {}
+        for index, (x, y, width, height) in enumerate(rects):
+            self.rects.extend((x, y, width, height))
+            # Rects are half-open, so the last covered pixel is right - 1 / bottom - 1.
+            for cx in range(x // cell_size, (x + width - 1) // cell_size + 1):
+                for cy in range(y // cell_size, (y + height - 1) // cell_size + 1):
+                    bucket = buckets.get((cx, cy))
+                    if bucket is None:
+                        bucket = buckets[(cx, cy)] = array("i")
+                    bucket.append(index)
+
+        # Compact the buckets column by column. Column c (counted from the first
+        # occupied one) owns cells columns[c]:columns[c + 1]; cell k sits at grid row
+        # rows[k] and lists the platforms items[starts[k]:starts[k + 1]].
+        cells = sorted(buckets)
+        self._first_column = cells[0][0] if cells else 0
+        column_count = cells[-1][0] - self._first_column + 1 if cells else 0
+        self._columns = array("i", bytes(4 * (column_count + 1)))
+        self._rows = array("i")
+        self._starts = array("i", [0])
+        self._items = array("i")
+        for cx, cy in cells:
+            self._columns[cx - self._first_column + 1] += 1
+            self._rows.append(cy)
+            self._items.extend(buckets[(cx, cy)])
+            self._starts.append(len(self._items))
+        for column in range(column_count):
+            self._columns[column + 1] += self._columns[column]
+
+    def query(self, area: pygame.Rect) -> List[int]:
+        """Return sorted indices of the platforms that may overlap ``area``."""
+
+        columns, rows, starts = self._columns, self._rows, self._starts
+        size = self.cell_size
+        first = self._first_column
+        y0, y1 = area.top // size, (area.bottom - 1) // size
+        found = array("i")
+        last = min(len(columns) - 2, (area.right - 1) // size - first)
+        for column in range(max(0, area.left // size - first), last + 1):
+            # The covered cells of a column are consecutive, and so are their items.
+            high = columns[column + 1]
+            low = bisect_left(rows, y0, columns[column], high)
+            end = bisect_left(rows, y1 + 1, low, high)
+            if low < end:
+                found.extend(self._items[starts[low] : starts[end]])
+        return sorted(set(found))
+
+    def __len__(self) -> int:
+        return len(self.rects) // 4
+
+    def _platform(self, index: int) -> Platform:
+        platform = self._platforms.get(index)
+        if platform is None:
+            row = 4 * index
+            platform = Platform.from_dimensions(*self.rects[row : row + 4])
+            self._platforms[index] = platform
+        return platform
+
+    @overload
+    def __getitem__(self, index: int) -> Platform: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[Platform]: ...
+
+    def __getitem__(self, index):
+        try:
+            return self._platforms[index]
+        except (KeyError, TypeError):  # not created yet, or a slice
+            pass
+        if isinstance(index, slice):
+            return [self._platform(position) for position in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("platform index out of range")
+        return self._platform(index)
+
+    def __iter__(self) -> Iterator[Platform]:
+        for index in range(len(self)):
+            yield self._platform(index)
+
+
+class ActorIndex(List[T]):
+    """List of moving objects (anything with a ``rect``) backed by a uniform grid.
+
+    The index is a regular list, kept in sync with the grid by every list
+    mutation, so it can replace the enemy or orb lists of a level. Objects that
+    move must be reported with :meth:`relocate`; it only touches the grid when the
+    object crosses into other cells. ``query`` returns the objects overlapping an
+    area in list order. An object may appear only once in the list, and is
+    identified by identity rather than equality.
+    """
+
+    def __init__(self, items: Iterable[T] = (), cell_size: int = CELL_SIZE) -> None:
+        super().__init__()
+        self.cell_size = cell_size
+        self._cells: Dict[Cell, Dict[int, T]] = {}
+        self._spans: Dict[int, Span] = {}
+        self._order: Dict[int, int] = {}
+        self._inserted = 0
+        self.extend(items)
+
+    def _span(self, rect: pygame.Rect) -> Span:
+        size = self.cell_size
+        return (
+            rect.left // size,
+            max(rect.left, rect.right - 1) // size,
+            rect.top // size,
+            max(rect.top, rect.bottom - 1) // size,
+        )
+
+    def _link(self, item: T, span: Span) -> None:
+        key = id(item)
+        self._spans[key] = span
+        for cx in range(span[0], span[1] + 1):
+            for cy in range(span[2], span[3] + 1):
+                self._cells.setdefault((cx, cy), {})[key] = item
+
+    def _unlink(self, key: int) -> None:
+        x0, x1, y0, y1 = self._spans.pop(key)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                bucket = self._cells[(cx, cy)]
+                del bucket[key]
+                if not bucket:
+                    del self._cells[(cx, cy)]
+
+    def _add(self, item: T) -> None:
+        self._order[id(item)] = self._inserted
+        self._inserted += 1
+        self._link(item, self._span(item.rect))
+
+    def _discard(self, item: T) -> None:
+        self._unlink(id(item))
+        del self._order[id(item)]
+
+    def _renumber(self) -> None:
+        # Appends number items in list order; anything placing an item elsewhere renumbers them all.
+        self._order = {id(item): position for position, item in enumerate(self)}
+        self._inserted = len(self)
+
+    def relocate(self, item: T) -> None:
+        """Update the grid after ``item.rect`` moved."""
+
+        span = self._span(item.rect)
+        if span != self._spans[id(item)]:
+            self._unlink(id(item))
+            self._link(item, span)
+
+    def query(self, area: pygame.Rect) -> List[T]:
+        """Return the objects whose rect overlaps ``area``."""
+
+        found: Dict[int, T] = {}
+        x0, x1, y0, y1 = self._span(area)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                bucket = self._cells.get((cx, cy))
+                if bucket:
+                    found.update(bucket)
+        hits = [item for item in found.values() if item.rect.colliderect(area)]
+        if len(hits) > 1:
+            hits.sort(key=lambda item: self._order[id(item)])
+        return hits
+
+    # List mutations, mirrored in the grid.
+
+    def append(self, item: T) -> None:
+        super().append(item)
+        self._add(item)
+
+    def extend(self, items: Iterable[T]) -> None:
+        items = list(items)
+        super().extend(items)
+        for item in items:
+            self._add(item)
+
+    def __iadd__(self, items: Iterable[T]) -> "ActorIndex[T]":
+        self.extend(items)
+        return self
+
+    def insert(self, index: int, item: T) -> None:
+        super().insert(index, item)
+        self._add(item)
+        self._renumber()
+
+    def remove(self, item: T) -> None:
+        # ``list.remove`` compares with ``==``, which would take an equal but different object.
+        position = next((position for position, other in enumerate(self) if other is item), None)
+        if position is None:
+            raise ValueError("ActorIndex.remove(x): x not in list")
+        self._discard(super().pop(position))
+
+    def pop(self, index: int = -1) -> T:
+        item = super().pop(index)
+        self._discard(item)
+        return item
+
+    def clear(self) -> None:
+        super().clear()
+        self._cells.clear()
+        self._spans.clear()
+        self._order.clear()
+
+    def __setitem__(self, index, value) -> None:
+        removed = super().__getitem__(index)
+        if isinstance(index, slice):
+            value = list(value)
+            super().__setitem__(index, value)
+            for item in removed:
+                self._discard(item)
+            for item in value:
+                self._add(item)
+        else:
+            super().__setitem__(index, value)
+            self._discard(removed)
+            self._add(value)
+        self._renumber()
+
+    def sort(self, *args, **kwargs) -> None:
+        super().sort(*args, **kwargs)
+        self._renumber()
+
+    def reverse(self) -> None:
+        super().reverse()
+        self._renumber()
+
+    def __delitem__(self, index) -> None:
+        removed = super().__getitem__(index)
+        super().__delitem__(index)
+        for item in removed if isinstance(index, slice) else (removed,):
+            self._discard(item)
+
+
+def overlapping(items: Sequence[T], area: pygame.Rect) -> List[T]:
+    """Return the objects of ``items`` whose rect overlaps ``area``, using the index when present."""
+
+    query = getattr(items, "query", None)
+    if query is not None:
+        return query(area)
+    return [item for item in items if item.rect.colliderect(area)]
@@ -0,0 +1,83 @@
+"""Timeline of the game's startup, from its first import to its first frames.
+
+:mod:`src.game.main` imports this module before pygame, so the timeline's
+origin is taken before any heavy import. The game marks each startup phase as
+it completes; ``python -m src.game.main --startup-report`` prints the breakdown
+once the first frame of gameplay is shown::
+
+    imports                 234.0 ms
+    display                   3.3 ms
+    font                      0.7 ms
+    first_frame               0.6 ms
+    level                     1.8 ms
+    first_game_frame         22.2 ms
+    time to first frame     262.6 ms (target 150 ms, over target)
+    total                   262.6 ms
+
+Time to first frame runs from the game's first import to the first frame of
+play, so it includes pygame's own imports, which dominate it; only the
+interpreter's startup happens before the origin. ``first_frame`` is the
+"Chargement…" screen shown before the level is built.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Dict, List, Optional, Tuple
+
+FIRST_FRAME_TARGET_MS = 150.0  # from the game's first import to the first frame of play
+
+_ORIGIN = time.perf_counter()
+
+
+class StartupTimeline:
+    """Durations of the startup phases, each measured from the end of the previous one."""
+
+    def __init__(self, origin: float = _ORIGIN) -> None:
+        self.origin = origin
+        self.phases: List[Tuple[str, float]] = []
+        self._last = origin
+        self._first_game_frame: Optional[float] = None
+
+    def mark(self, phase: str) -> None:
+        """Record that ``phase`` just finished."""
+
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+
+    def run_started(self) -> None:
+        """Close the import phase, when the game starts running."""
+
+        self.mark("imports")
+
+    def first_game_frame(self) -> None:
+        """Record the first frame of play shown, which ends the time to first frame."""
+
+        self.mark("first_game_frame")
+        self._first_game_frame = self._last
+
+    def report(self) -> Dict[str, object]:
+        phases = {name: round(seconds * 1000, 2) for name, seconds in self.phases}
+        report: Dict[str, object] = {"phases_ms": phases, "total_ms": round((self._last - self.origin) * 1000, 2)}
+        if self._first_game_frame is not None:
+            first_frame_ms = (self._first_game_frame - self.origin) * 1000
+            report["time_to_first_frame_ms"] = round(first_frame_ms, 2)
+            report["target_ms"] = FIRST_FRAME_TARGET_MS
+            report["within_target"] = first_frame_ms <= FIRST_FRAME_TARGET_MS
+        return report
+
+    def format(self) -> str:
+        lines = [f"{name:20} {seconds * 1000:8.1f} ms" for name, seconds in self.phases]
+        report = self.report()
+        if "time_to_first_frame_ms" in report:
+            verdict = "ok" if report["within_target"] else "over target"
+            lines.append(
+                f"{'time to first frame':20} {report['time_to_first_frame_ms']:8.1f} ms"
+                f" (target {FIRST_FRAME_TARGET_MS:.0f} ms, {verdict})"
+            )
+        lines.append(f"{'total':20} {report['total_ms']:8.1f} ms")
+        return "\n".join(lines)
+
+
+timeline = StartupTimeline()
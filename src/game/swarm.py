@@ -0,0 +1,334 @@
+"""Structure-of-arrays enemy backend built on NumPy.
+
+:class:`EnemySwarm` stores every patrolling enemy of a level in flat arrays and
+updates them all at once. Results match calling :meth:`Enemy.update` on each
+enemy: contacts with a single platform are resolved in bulk, and the rare
+entities touching several platforms in one step are replayed through the
+per-object code so the order-dependent resolution stays identical.
+
+NumPy is an optional dependency; importing this module works without it, but
+building a swarm raises :class:`ImportError`.
+"""
+
+from __future__ import annotations
+
+from typing import Sequence, Tuple
+
+import pygame
+
+from .entities import GRAVITY, Enemy, Entity, Platform
+from .spatial import CELL_SIZE
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+# Offsets used to pack signed cell coordinates into one sortable integer key.
+_CELL_OFFSET = 1 << 20
+_CELL_STRIDE = 1 << 21
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("The vectorized backends require numpy (pip install numpy).")
+
+
+def _cell_keys(cx: "np.ndarray", cy: "np.ndarray") -> "np.ndarray":
+    return (cx + _CELL_OFFSET) * _CELL_STRIDE + (cy + _CELL_OFFSET)
+
+
+def _expand_cells(
+    left: "np.ndarray", top: "np.ndarray", right: "np.ndarray", bottom: "np.ndarray", cell_size: int
+) -> Tuple["np.ndarray", "np.ndarray"]:
+    """Return ``(owner, key)`` pairs for every grid cell covered by each rect."""
+
+    cx0, cx1 = left // cell_size, (right - 1) // cell_size
+    cy0, cy1 = top // cell_size, (bottom - 1) // cell_size
+    nx = cx1 - cx0 + 1
+    ny = cy1 - cy0 + 1
+    counts = nx * ny
+    owner = np.repeat(np.arange(len(left)), counts)
+    local = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+    cx = cx0[owner] + local % nx[owner]
+    cy = cy0[owner] + local // nx[owner]
+    return owner, _cell_keys(cx, cy)
+
+
+class PlatformArrays:
+    """Platform rects as NumPy columns with a compressed uniform grid.
+
+    This is the array counterpart of :class:`~src.game.spatial.PlatformIndex`:
+    each occupied cell maps to a slice of ``cell_items`` listing the platforms
+    touching it, so candidate pairs for many rects are found without Python loops.
+    """
+
+    def __init__(self, rects: "np.ndarray", cell_size: int = CELL_SIZE) -> None:
+        _require_numpy()
+        rects = np.asarray(rects, dtype=np.int64).reshape(-1, 4)
+        self.cell_size = cell_size
+        self.left = rects[:, 0].copy()
+        self.top = rects[:, 1].copy()
+        self.right = self.left + rects[:, 2]
+        self.bottom = self.top + rects[:, 3]
+
+        owner, keys = _expand_cells(self.left, self.top, self.right, self.bottom, cell_size)
+        order = np.lexsort((owner, keys))
+        keys = keys[order]
+        self.cell_items = owner[order]
+        self.cell_keys, self.cell_starts, self.cell_counts = np.unique(keys, return_index=True, return_counts=True)
+
+    @classmethod
+    def from_platforms(cls, platforms: Sequence[Platform], cell_size: int = CELL_SIZE) -> "PlatformArrays":
+        rects = np.array([tuple(platform.rect) for platform in platforms], dtype=np.int64)
+        return cls(rects, cell_size)
+
+    def __len__(self) -> int:
+        return len(self.left)
+
+    def candidate_pairs(
+        self, left: "np.ndarray", top: "np.ndarray", right: "np.ndarray", bottom: "np.ndarray"
+    ) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Return ``(rect, platform)`` index pairs sharing a cell, sorted by rect then platform."""
+
+        empty = np.zeros(0, dtype=np.int64)
+        if len(left) == 0 or len(self.cell_keys) == 0:
+            return empty, empty
+        owner, keys = _expand_cells(left, top, right, bottom, self.cell_size)
+        position = np.minimum(np.searchsorted(self.cell_keys, keys), len(self.cell_keys) - 1)
+        found = self.cell_keys[position] == keys
+        owner, position = owner[found], position[found]
+        counts = self.cell_counts[position]
+        rect_index = np.repeat(owner, counts)
+        local = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+        platform_index = self.cell_items[np.repeat(self.cell_starts[position], counts) + local]
+        # Sort and drop repeats by hand: np.unique hashes large integer arrays, which is far slower here.
+        combined = np.sort(rect_index * len(self) + platform_index)
+        if len(combined):
+            combined = combined[np.concatenate(([True], combined[1:] != combined[:-1]))]
+        return combined // len(self), combined % len(self)
+
+    def cell(self, cx: int, cy: int) -> "np.ndarray":
+        """Return the sorted indices of the platforms touching grid cell ``(cx, cy)``."""
+
+        key = (cx + _CELL_OFFSET) * _CELL_STRIDE + (cy + _CELL_OFFSET)
+        position = int(np.searchsorted(self.cell_keys, key))
+        if position == len(self.cell_keys) or self.cell_keys[position] != key:
+            return self.cell_items[:0]
+        start = self.cell_starts[position]
+        return self.cell_items[start : start + self.cell_counts[position]]
+
+    def move_and_collide(
+        self,
+        left: "np.ndarray",
+        top: "np.ndarray",
+        width: "np.ndarray",
+        height: "np.ndarray",
+        velocity: "np.ndarray",
+        remainder: "np.ndarray",
+        on_ground: "np.ndarray",
+        dt: float,
+    ) -> "np.ndarray":
+        """Vectorized :meth:`Entity.move_and_collide` for the discrete resolver.
+
+        Updates the arrays in place (``velocity`` and ``remainder`` have shape
+        ``(n, 2)``) and returns a mask of the rows that touched several platforms
+        in one step; those rows must be replayed with the per-object resolver.
+        """
+
+        replay = np.zeros(len(left), dtype=bool)
+        for axis in (0, 1):
+            total = remainder[:, axis] + velocity[:, axis] * dt
+            pixels = np.trunc(total)
+            remainder[:, axis] = total - pixels
+            pixels = pixels.astype(np.int64)
+
+            start = left if axis == 0 else top
+            moved = start + pixels
+            area_low = np.minimum(start, moved)
+            if axis == 0:
+                entity, platform = self.candidate_pairs(area_low, top, area_low + np.abs(pixels) + width, top + height)
+                left[:] = moved
+            else:
+                entity, platform = self.candidate_pairs(left, area_low, left + width, area_low + np.abs(pixels) + height)
+                top[:] = moved
+                on_ground[:] = False
+
+            overlap = self._overlaps(entity, platform, left, top, width, height)
+            if not overlap.any():
+                continue
+            hit_entity, hit_platform = entity[overlap], platform[overlap]
+            first = np.ones(len(hit_entity), dtype=bool)
+            first[1:] = hit_entity[1:] != hit_entity[:-1]
+            rows, blockers = hit_entity[first], hit_platform[first]
+            speed = velocity[rows, axis]
+            if axis == 0:
+                left[rows] = np.where(speed > 0, self.left[blockers] - width[rows], left[rows])
+                left[rows] = np.where(speed < 0, self.right[blockers], left[rows])
+            else:
+                top[rows] = np.where(speed > 0, self.top[blockers] - height[rows], top[rows])
+                top[rows] = np.where(speed < 0, self.bottom[blockers], top[rows])
+                on_ground[rows] = speed > 0
+            velocity[rows, axis] = 0.0
+            remainder[rows, axis] = 0.0
+
+            # A later platform still overlapping after the first push (or a push out
+            # of the queried area) needs the sequential resolver.
+            blocker_of = np.full(len(left), -1, dtype=np.int64)
+            blocker_of[rows] = blockers
+            later = platform > blocker_of[entity]
+            later &= blocker_of[entity] >= 0
+            again = self._overlaps(entity[later], platform[later], left, top, width, height)
+            replay[entity[later][again]] = True
+            position = left if axis == 0 else top
+            escaped = (position[rows] < area_low[rows]) | (position[rows] > area_low[rows] + np.abs(pixels[rows]))
+            replay[rows[escaped]] = True
+        return replay
+
+    def _overlaps(
+        self,
+        entity: "np.ndarray",
+        platform: "np.ndarray",
+        left: "np.ndarray",
+        top: "np.ndarray",
+        width: "np.ndarray",
+        height: "np.ndarray",
+    ) -> "np.ndarray":
+        """``pygame.Rect.colliderect`` for each ``(entity, platform)`` pair."""
+
+        entity_left = left[entity]
+        entity_top = top[entity]
+        return (
+            (entity_left < self.right[platform])
+            & (entity_left + width[entity] > self.left[platform])
+            & (entity_top < self.bottom[platform])
+            & (entity_top + height[entity] > self.top[platform])
+        )
+
+
+class EnemySwarm:
+    """Patrolling enemies stored as parallel NumPy arrays.
+
+    ``platforms`` is the level geometry as given to :meth:`Enemy.update` (a list
+    or a :class:`~src.game.spatial.PlatformIndex`); it is used to build the array
+    grid and to replay the few enemies needing sequential resolution.
+    """
+
+    def __init__(self, enemies: Sequence[Enemy], platforms: Sequence[Platform]) -> None:
+        _require_numpy()
+        self.platforms = platforms
+        self.geometry = PlatformArrays.from_platforms(platforms)
+        count = len(enemies)
+        self.left = np.array([enemy.rect.x for enemy in enemies], dtype=np.int64).reshape(count)
+        self.top = np.array([enemy.rect.y for enemy in enemies], dtype=np.int64).reshape(count)
+        self.width = np.array([enemy.rect.width for enemy in enemies], dtype=np.int64).reshape(count)
+        self.height = np.array([enemy.rect.height for enemy in enemies], dtype=np.int64).reshape(count)
+        self.velocity = np.array([tuple(enemy.velocity) for enemy in enemies], dtype=np.float64).reshape(count, 2)
+        self.remainder = np.array([tuple(enemy.remainder) for enemy in enemies], dtype=np.float64).reshape(count, 2)
+        self.previous = np.array([tuple(enemy.previous_position) for enemy in enemies], dtype=np.float64).reshape(
+            count, 2
+        )
+        self.on_ground = np.array([enemy.on_ground for enemy in enemies], dtype=bool).reshape(count)
+        self.patrol_min = np.array([enemy.patrol_range[0] for enemy in enemies], dtype=np.int64).reshape(count)
+        self.patrol_max = np.array([enemy.patrol_range[1] for enemy in enemies], dtype=np.int64).reshape(count)
+        self.speed = np.array([enemy.speed for enemy in enemies], dtype=np.float64).reshape(count)
+        self.direction = np.array([enemy.direction for enemy in enemies], dtype=np.int64).reshape(count)
+        self.health = np.array([enemy.health for enemy in enemies], dtype=np.int64).reshape(count)
+        # Scratch entity used to replay rows with the per-object resolver.
+        self._scratch = Entity(0, 0, 1, 1)
+
+    def __len__(self) -> int:
+        return len(self.left)
+
+    def store_previous_positions(self) -> None:
+        self.previous[:, 0] = self.left
+        self.previous[:, 1] = self.top
+
+    def update(self, dt: float) -> None:
+        """Vectorized equivalent of :meth:`Enemy.update` for every enemy."""
+
+        self.velocity[:, 0] = self.speed * self.direction
+        self.velocity[:, 1] += GRAVITY * dt
+
+        start = (self.left.copy(), self.top.copy(), self.velocity.copy(), self.remainder.copy())
+        replay = self.geometry.move_and_collide(
+            self.left, self.top, self.width, self.height, self.velocity, self.remainder, self.on_ground, dt
+        )
+        if Entity.collision_mode == "swept":
+            moves = np.abs(start[2] * dt + start[3])
+            replay |= (moves[:, 0] > self.width) | (moves[:, 1] > self.height)
+        for row in np.flatnonzero(replay):
+            self._replay(int(row), start, dt)
+
+        at_min = self.left <= self.patrol_min
+        at_max = ~at_min & (self.left + self.width >= self.patrol_max)
+        self.left[at_min] = self.patrol_min[at_min]
+        self.left[at_max] = self.patrol_max[at_max] - self.width[at_max]
+        self.direction[at_min] = 1
+        self.direction[at_max] = -1
+        self.remainder[at_min | at_max, 0] = 0.0
+        self.velocity[:, 0] = self.speed * self.direction
+
+    def _replay(self, row: int, start: tuple, dt: float) -> None:
+        left, top, velocity, remainder = start
+        scratch = self._scratch
+        scratch.rect.update(int(left[row]), int(top[row]), int(self.width[row]), int(self.height[row]))
+        scratch.velocity.update(*velocity[row])
+        scratch.remainder.update(*remainder[row])
+        scratch.move_and_collide(self.platforms, dt)
+        self.left[row], self.top[row] = scratch.rect.topleft
+        self.velocity[row] = tuple(scratch.velocity)
+        self.remainder[row] = tuple(scratch.remainder)
+        self.on_ground[row] = scratch.on_ground
+
+    def overlapping(self, rect: pygame.Rect) -> "np.ndarray":
+        """Return the indices of the enemies whose rect collides with ``rect``."""
+
+        hits = (
+            (self.left < rect.right)
+            & (self.left + self.width > rect.left)
+            & (self.top < rect.bottom)
+            & (self.top + self.height > rect.top)
+        )
+        return np.flatnonzero(hits)
+
+    def take_damage(self, indices: "np.ndarray", amount: int) -> "np.ndarray":
+        """Damage the given enemies and return the indices of those defeated."""
+
+        self.health[indices] -= amount
+        return indices[self.health[indices] <= 0]
+
+    def remove(self, indices: "np.ndarray") -> None:
+        """Drop the given enemies from the swarm."""
+
+        keep = np.ones(len(self), dtype=bool)
+        keep[indices] = False
+        for name in (
+            "left",
+            "top",
+            "width",
+            "height",
+            "velocity",
+            "remainder",
+            "previous",
+            "on_ground",
+            "patrol_min",
+            "patrol_max",
+            "speed",
+            "direction",
+            "health",
+        ):
+            setattr(self, name, getattr(self, name)[keep])
+
+    def write_to(self, enemies: Sequence[Enemy]) -> None:
+        """Copy the swarm state back into matching :class:`Enemy` objects (for drawing)."""
+
+        for row, enemy in enumerate(enemies):
+            enemy.rect.topleft = (int(self.left[row]), int(self.top[row]))
+            enemy.velocity.update(*self.velocity[row])
+            enemy.remainder.update(*self.remainder[row])
+            enemy.previous_position.update(*self.previous[row])
+            enemy.on_ground = bool(self.on_ground[row])
+            enemy.direction = int(self.direction[row])
+            enemy.facing = enemy.direction
+            enemy.health = int(self.health[row])
@@ -0,0 +1,114 @@
+"""Heap-based scheduler for game events driven by simulation time.
+
+Instead of every object adding ``dt`` to its own timer each step, callbacks are
+registered with the time they are due (an energy orb respawning, for instance)
+and :meth:`Scheduler.advance` only pops the ones whose time has come. Waiting
+timers cost nothing per step; a step costs ``O(log n)`` per timer that fires.
+"""
+
+from __future__ import annotations
+
+import heapq
+from typing import Callable, Iterable, List
+
+# Slack when comparing due times, so rounding in the accumulated clock (a sum of
+# many ``dt``) cannot push a callback one step late.
+TIME_EPSILON = 1e-9
+
+
+class Timer:
+    """Handle returned by :meth:`Scheduler.schedule`, used to cancel a callback.
+
+    Timers are the scheduler's heap entries themselves, ordered by due time and
+    then by scheduling order.
+    """
+
+    __slots__ = ("due", "order", "callback", "pending")
+
+    def __init__(self, due: float, callback: Callable[[], object], order: int = 0) -> None:
+        self.due = due
+        self.order = order
+        self.callback = callback
+        self.pending = True  # False once fired, cancelled or cleared
+
+    def __lt__(self, other: "Timer") -> bool:
+        return self.due < other.due or (self.due == other.due and self.order < other.order)
+
+
+class Scheduler:
+    """Callbacks ordered by due time on a binary heap.
+
+    ``now`` is the simulation time, moved forward by :meth:`advance`. Callbacks
+    due at the same time fire in the order they were scheduled; cancelled timers
+    stay in the heap until they reach its top and are then dropped.
+    """
+
+    def __init__(self) -> None:
+        self.now = 0.0
+        self._queue: List[Timer] = []
+        self._scheduled = 0
+        self._cancelled = 0
+
+    def __len__(self) -> int:
+        """Number of timers still waiting to fire."""
+
+        return len(self._queue) - self._cancelled
+
+    def schedule(self, delay: float, callback: Callable[[], object]) -> Timer:
+        """Call ``callback`` once ``delay`` seconds of simulation time have passed."""
+
+        timer = Timer(self.now + delay, callback, self._scheduled)
+        heapq.heappush(self._queue, timer)
+        self._scheduled += 1
+        return timer
+
+    def cancel(self, timer: Timer) -> None:
+        if timer.pending:
+            timer.pending = False
+            self._cancelled += 1
+
+    def advance(self, dt: float) -> int:
+        """Move the clock forward by ``dt`` and run the callbacks now due; return how many ran."""
+
+        self.now += dt
+        queue = self._queue
+        fired = 0
+        while queue and queue[0].due <= self.now + TIME_EPSILON:
+            timer = heapq.heappop(queue)
+            if not timer.pending:
+                self._cancelled -= 1
+                continue
+            timer.pending = False
+            timer.callback()
+            fired += 1
+        return fired
+
+    def clear(self) -> None:
+        """Drop every pending timer and restart the clock, as when reloading a level."""
+
+        for timer in self._queue:
+            timer.pending = False
+        self.now = 0.0
+        self._queue.clear()
+        self._cancelled = 0
+
+    def restore(self, now: float, timers: Iterable[Timer]) -> None:
+        """Set the clock to ``now`` with exactly ``timers`` waiting, at their current ``due`` times.
+
+        Used when a saved world state is restored (see :mod:`src.game.snapshot`):
+        the timers are existing objects re-keyed in place and the heap is rebuilt
+        once, so nothing else queued (cancelled timers included) survives.
+        """
+
+        queue = self._queue
+        for timer in queue:
+            timer.pending = False
+        queue.clear()
+        for timer in timers:
+            timer.pending = True
+            timer.order = self._scheduled
+            self._scheduled += 1
+            queue.append(timer)
+        heapq.heapify(queue)
+        self.now = now
+        self._cancelled = 0